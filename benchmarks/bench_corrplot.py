@@ -0,0 +1,54 @@
+"""
+Render time of ds_viz.scatter_matrix_with_corr vs rows, per panel mode.
+Plain scatter is skipped above --scatter_max rows. Also checks that the saved
+correlation table matches the full-data correlation matrix.
+
+Run with: python -m benchmarks.bench_corrplot --rows 1000 10000 100000 1000000
+"""
+import argparse, json, tempfile, time
+from pathlib import Path
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+
+NUMERIC = ["time_in_hospital", "num_lab_procedures", "num_procedures", "num_medications",
+           "number_outpatient", "number_emergency", "number_inpatient", "number_diagnoses"]
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", nargs="+", type=int, default=[1_000, 10_000, 100_000, 1_000_000])
+    p.add_argument("--panels", nargs="+", default=["scatter", "sample", "hist2d", "hexbin"])
+    p.add_argument("--scatter_max", type=int, default=100_000)
+    p.add_argument("--dpi", type=int, default=300)
+    p.add_argument("--out", type=str, default=None, help="Optional JSON results path.")
+    args = p.parse_args()
+
+    from benchmarks.synth import make_uci_frame
+    from src.ds_viz import scatter_matrix_with_corr
+
+    frame = make_uci_frame(max(args.rows))[NUMERIC].astype(float)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            df = frame.iloc[:n]
+            full = df.corr()
+            for panel in args.panels:
+                if panel == "scatter" and n > args.scatter_max:
+                    continue
+                fig_path, table_path = Path(tmp) / f"m_{panel}.png", Path(tmp) / "c.csv"
+                t0 = time.perf_counter()
+                scatter_matrix_with_corr(df, panel=panel, save_fig=fig_path, save_table=table_path,
+                                         dpi=args.dpi, show=False)
+                wall = time.perf_counter() - t0
+                saved = pd.read_csv(table_path, index_col=0)
+                res = {"rows": n, "panel": panel, "wall_s": round(wall, 2),
+                       "png_kb": round(fig_path.stat().st_size / 1024, 1),
+                       "max_abs_r_diff": float(np.abs(saved.to_numpy() - full.to_numpy()).max())}
+                results.append(res)
+                print(json.dumps(res))
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Load time of the cleaned UCI frame: CSV path (presets.load_dataset) vs the
+SQLite store (proj.db). Also times a one-time ingest and an indexed lookup
+(one patient's encounters / the positive class) against load-then-filter.
+
+Run with: python -m benchmarks.bench_db --rows 1000000
+"""
+import argparse, json, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, round(time.perf_counter() - t0, 3)
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--csv_path", type=str, default=None, help="Reuse an existing UCI-shaped CSV.")
+    p.add_argument("--db", type=str, default=None, help="SQLite file (default next to the CSV).")
+    p.add_argument("--out", type=str, default=None, help="Optional JSON results path.")
+    args = p.parse_args()
+
+    import pandas as pd
+    from benchmarks.synth import write_uci_csv
+    from src.presets import load_dataset
+    from proj import db
+
+    csv_path = Path(args.csv_path) if args.csv_path else ROOT / "data" / "bench" / f"uci_{args.rows}.csv"
+    if not csv_path.exists():
+        print(f"Generating {args.rows:,} rows -> {csv_path}")
+        write_uci_csv(csv_path, args.rows)
+    db_path = Path(args.db) if args.db else csv_path.with_suffix(".db")
+    db_path.unlink(missing_ok=True)
+
+    results = {"rows": args.rows}
+    _, results["ingest_s"] = _timed(lambda: db.ingest_dataset(csv_path, db_name=db_path, chunksize=args.chunksize))
+    df, results["csv_load_s"] = _timed(lambda: load_dataset(csv_path, chunksize=args.chunksize))
+    _, results["sql_load_s"] = _timed(lambda: db.read_sql("SELECT * FROM uci_hospitals", db_name=db_path,
+                                                          chunksize=args.chunksize))
+    _, results["sql_arrow_load_s"] = _timed(lambda: sum(len(t) for t in db.iter_sql(
+        "SELECT * FROM uci_hospitals", db_name=db_path, chunksize=args.chunksize, arrow=True)))
+
+    patient = int(db.read_sql("SELECT patient_nbr FROM uci_hospitals LIMIT 1", db_name=db_path).iloc[0, 0])
+    raw_ids = pd.read_csv(csv_path, usecols=["patient_nbr"])["patient_nbr"]
+    _, results["csv_patient_lookup_s"] = _timed(lambda: load_dataset(csv_path, chunksize=args.chunksize)[
+        (raw_ids == patient).to_numpy()])
+    _, results["sql_patient_lookup_s"] = _timed(lambda: db.read_sql(
+        "SELECT * FROM uci_hospitals WHERE patient_nbr = ?", (patient,), db_name=db_path))
+    _, results["sql_positives_s"] = _timed(lambda: db.read_sql(
+        "SELECT * FROM uci_hospitals WHERE target = 1", db_name=db_path, chunksize=args.chunksize))
+    results["db_mb"] = round(db_path.stat().st_size / 2**20, 1)
+    results["csv_mb"] = round(csv_path.stat().st_size / 2**20, 1)
+    print(json.dumps(results, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare eager vs chunked presets.load_dataset: wall-clock and peak RSS.
+Each mode runs in a fresh child process so peak RSS is not shared.
+
+Run with: python -m benchmarks.bench_load --rows 10000000 --chunksize 250000
+"""
+import argparse, json, resource, subprocess, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _child(csv_path, mode, chunksize):
+    sys.path.insert(0, str(ROOT))
+    from src.presets import load_dataset, iter_dataset
+    t0 = time.perf_counter()
+    if mode == "eager":
+        df = load_dataset(csv_path)
+        rows, mem = len(df), int(df.memory_usage(deep=True).sum())
+    elif mode == "chunked":
+        df = load_dataset(csv_path, chunksize=chunksize)
+        rows, mem = len(df), int(df.memory_usage(deep=True).sum())
+    else:  # stream only: never hold more than one chunk
+        rows, mem = 0, 0
+        for chunk in iter_dataset(csv_path, chunksize=chunksize):
+            rows += len(chunk)
+            mem = max(mem, int(chunk.memory_usage(deep=True).sum()))
+    wall = time.perf_counter() - t0
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "rows": rows, "wall_s": round(wall, 3),
+                      "peak_rss_mb": round(peak_kb / 1024, 1), "frame_mb": round(mem / 2**20, 1)}))
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=10_000_000)
+    p.add_argument("--chunksize", type=int, default=250_000)
+    p.add_argument("--csv_path", type=str, default=None, help="Reuse an existing UCI-shaped CSV.")
+    p.add_argument("--modes", nargs="+", default=["eager", "chunked", "stream"])
+    p.add_argument("--out", type=str, default=None, help="Optional JSON results path.")
+    p.add_argument("--_child", nargs=3, help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args._child:
+        csv_path, mode, chunksize = args._child
+        _child(csv_path, mode, int(chunksize))
+        return
+
+    from benchmarks.synth import write_uci_csv
+    csv_path = Path(args.csv_path) if args.csv_path else ROOT / "data" / "bench" / f"uci_{args.rows}.csv"
+    if not csv_path.exists():
+        print(f"Generating {args.rows:,} rows -> {csv_path}")
+        write_uci_csv(csv_path, args.rows)
+
+    results = []
+    for mode in args.modes:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_load", "--_child",
+                              str(csv_path), mode, str(args.chunksize)],
+                             cwd=ROOT, check=True, capture_output=True, text=True)
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(res)
+        print(res)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Load generator for src.serve: fires single-encounter requests from many
+threads and reports client-side latency percentiles plus the server's /metrics.
+
+Run with: python -m benchmarks.load_gen --url http://127.0.0.1:8080 --csv data/raw/diabetes.csv
+"""
+import argparse, json, threading, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+def _post(url, body: bytes):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        resp.read()
+    return time.perf_counter() - t0
+
+def run(url, records, n_requests=2000, concurrency=32):
+    bodies = [json.dumps(r).encode() for r in records]
+    lock = threading.Lock()
+    lat, errors = [], 0
+
+    def one(i):
+        nonlocal errors
+        try:
+            s = _post(f"{url}/predict", bodies[i % len(bodies)])
+            with lock:
+                lat.append(s)
+        except Exception:
+            with lock:
+                errors += 1
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n_requests)))
+    wall = time.perf_counter() - t0
+    ms = np.array(lat) * 1000.0
+    out = {"requests": n_requests, "errors": errors, "concurrency": concurrency,
+           "wall_s": round(wall, 3), "req_per_s": round(n_requests / wall, 1)}
+    if ms.size:
+        out["client_latency_ms"] = {k: round(float(v), 3) for k, v in
+                                    zip(("p50", "p95", "p99"), np.percentile(ms, [50, 95, 99]))}
+    with urllib.request.urlopen(f"{url}/metrics", timeout=10) as resp:
+        out["server_metrics"] = json.loads(resp.read())
+    return out
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--url", type=str, default="http://127.0.0.1:8080")
+    p.add_argument("--csv", type=str, required=True, help="Raw rows to replay as requests.")
+    p.add_argument("--rows", type=int, default=1000, help="Distinct rows read from the CSV.")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=32)
+    args = p.parse_args()
+    df = pd.read_csv(args.csv, nrows=args.rows, dtype=str, keep_default_na=False)
+    records = df.drop(columns=["readmitted", "Outcome"], errors="ignore").to_dict(orient="records")
+    print(json.dumps(run(args.url, records, args.requests, args.concurrency), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark suite: wall/CPU time and memory of the pipeline's hot spots across
+dataset sizes, saved as JSON and compared against a stored baseline.
+
+Cases, run in order on one synthetic dataset per (kind, rows), each size in a
+fresh child process so peak RSS is not shared:
+    load_dataset, detect_leakage, preprocess_fit, preprocess_transform,
+    train_main, find_best_threshold, subgroup_metrics, scatter_matrix_with_corr
+
+Each case is a src.profiling span: wall_s/cpu_s (best of --repeat), RSS growth
+and the process high-water mark; --profile adds tracemalloc peaks and top
+allocators (and slows everything down). train_main also records its own
+per-stage breakdown from run_profile.json.
+
+Run with:
+    python -m benchmarks.suite --rows 10000 100000 1000000 --update_baseline
+    python -m benchmarks.suite --rows 10000 100000 1000000   # exit 1 on slowdowns
+"""
+import argparse, json, os, platform, subprocess, sys, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+CASES = ["load_dataset", "detect_leakage", "preprocess_fit", "preprocess_transform",
+         "train_main", "find_best_threshold", "subgroup_metrics", "scatter_matrix_with_corr"]
+SUBGROUP_COL = {"uci_hospitals": "race", "pima": "Pregnancies"}
+DEFAULT_BASELINE = ROOT / "data" / "bench" / "baseline.json"
+
+def dataset_path(kind, rows, data_dir=None) -> Path:
+    """Synthetic CSV for (kind, rows) under data/bench, generated on first use."""
+    from benchmarks.synth import write_dataset
+    path = Path(data_dir or ROOT / "data" / "bench") / f"{kind}_{rows}.csv"
+    if not path.exists():
+        print(f"Generating {rows:,} {kind} rows -> {path}", file=sys.stderr)
+        write_dataset(path, rows, kind)
+    return path
+
+def _bench_config(workdir) -> Path:
+    """Repo config with the cleaned-data cache off (repeats must really load)."""
+    import yaml
+    from src.utils import load_config
+    cfg = load_config(ROOT / "config.yaml")
+    cfg.setdefault("data", {})["cache"] = False
+    path = Path(workdir) / "bench_config.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    return path
+
+def _case_fns(kind, csv_path, workdir):
+    """case name -> fn(state); later cases read what earlier ones left in state."""
+    import numpy as np
+
+    def load_dataset(st):
+        from src.presets import load_dataset
+        st["df"] = load_dataset(csv_path, kind=kind)
+
+    def detect_leakage(st):
+        from src.leakage import detect_leakage
+        st["leaks"] = detect_leakage(st["df"], target="target")
+
+    def preprocess_fit(st):
+        from src.features import basic_preprocess
+        X = st["df"].drop(columns=["target"])
+        st["X"], st["y"] = X, st["df"]["target"].to_numpy()
+        st["pre"] = basic_preprocess(X).fit(X)
+
+    def preprocess_transform(st):
+        st["Xt"] = st["pre"].transform(st["X"])
+
+    def train_main(st):
+        from src.train import main
+        out = Path(workdir) / "train"
+        main(["--csv_path", str(csv_path), "--kind", kind, "--output_dir", str(out),
+              "--config", str(_bench_config(workdir))])
+        prof = json.loads((out / "run_profile.json").read_text())["train"]
+        st["train_stages"] = {s["name"]: s["wall_s"] for s in prof["spans"] if s["depth"] == 0}
+
+    def find_best_threshold(st):
+        from src.threshold import find_best_threshold
+        rng = np.random.default_rng(0)
+        st["y_prob"] = np.clip(0.3 * st["y"] + 0.7 * rng.random(len(st["y"])), 0, 1).round(4)
+        st["threshold"] = find_best_threshold(st["y"], st["y_prob"], metric="f1")
+
+    def subgroup_metrics(st):
+        from src.subgroup import subgroup_metrics
+        y_pred = (st["y_prob"] >= st["threshold"][0]).astype(int)
+        st["subgroups"] = subgroup_metrics(st["df"], st["y"], y_pred, SUBGROUP_COL[kind])
+
+    def scatter_matrix_with_corr(st):
+        import matplotlib.pyplot as plt
+        from src.ds_viz import scatter_matrix_with_corr
+        scatter_matrix_with_corr(st["df"], max_vars=6, save_fig=Path(workdir) / "matrix.png",
+                                 dpi=100, show=False)
+        plt.close("all")
+
+    return {name: fn for name, fn in locals().items() if name in CASES}
+
+def _warm_imports():
+    """Import what the cases use up front, so the first case to touch
+    sklearn or matplotlib isn't charged for loading it."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot, sklearn.linear_model, sklearn.pipeline, pyarrow.parquet  # noqa: F401
+    import src.presets, src.leakage, src.features, src.train, src.cv, src.threshold, src.subgroup  # noqa: F401
+    import src.ds_viz.corrmatrix  # noqa: F401
+
+def run_cases(kind, rows, csv_path, workdir, cases=CASES, repeat=1, profile=False) -> list:
+    """Run the cases in-process; one record per case (best wall of `repeat`)."""
+    from src.profiling import RunProfile, span
+    _warm_imports()
+    fns = _case_fns(kind, csv_path, workdir)
+    state, records = {}, []
+    with RunProfile(profile=profile):
+        for case in cases:
+            runs = []
+            for _ in range(max(1, repeat)):
+                with span(case) as rec:
+                    fns[case](state)
+                runs.append(rec)
+            best = min(runs, key=lambda r: r["wall_s"])
+            res = {"kind": kind, "rows": rows, "case": case,
+                   **{k: best[k] for k in ("wall_s", "cpu_s", "rss_delta_mb", "traced_peak_mb") if k in best},
+                   "peak_rss_mb": max(r["peak_rss_mb"] or 0 for r in runs)}
+            if case == "train_main":
+                res["stages"] = state["train_stages"]
+            records.append(res)
+            print(f"  {kind:<13} {rows:>10,} {case:<26} {res['wall_s']:>9.3f}s", file=sys.stderr)
+    return records
+
+def compare(results, baseline, tolerance=0.25, min_delta_s=0.05) -> list:
+    """Cases slower than baseline by more than `tolerance` (fraction) and
+    `min_delta_s` seconds (so tiny cases don't flag on noise)."""
+    base = {(r["kind"], r["rows"], r["case"]): r for r in baseline.get("results", [])}
+    slow = []
+    for r in results.get("results", []):
+        b = base.get((r["kind"], r["rows"], r["case"]))
+        if b is None or not b["wall_s"]:
+            continue
+        ratio = r["wall_s"] / b["wall_s"]
+        if ratio > 1 + tolerance and r["wall_s"] - b["wall_s"] > min_delta_s:
+            slow.append({"kind": r["kind"], "rows": r["rows"], "case": r["case"],
+                         "wall_s": r["wall_s"], "baseline_s": b["wall_s"], "ratio": round(ratio, 2)})
+    return slow
+
+def _meta() -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip()
+    except OSError:
+        rev = ""
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "git_rev": rev,
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count()}
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    p.add_argument("--kinds", nargs="+", default=["uci_hospitals", "pima"])
+    p.add_argument("--cases", nargs="+", default=CASES, choices=CASES)
+    p.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest is kept.")
+    p.add_argument("--profile", action="store_true", help="Add tracemalloc peaks/top allocators (slower).")
+    p.add_argument("--data_dir", type=str, default=None, help="Where synthetic CSVs are generated (default data/bench).")
+    p.add_argument("--out", type=str, default=None, help="Results JSON (default data/bench/results_<time>.json).")
+    p.add_argument("--baseline", type=str, default=str(DEFAULT_BASELINE))
+    p.add_argument("--update_baseline", action="store_true", help="Store these results as the baseline.")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Flag cases this much slower (fraction).")
+    p.add_argument("--_child", type=str, help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args._child:
+        job = json.loads(args._child)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = dataset_path(job["kind"], job["rows"], job["data_dir"])
+            records = run_cases(job["kind"], job["rows"], csv_path, tmp, job["cases"],
+                                job["repeat"], job["profile"])
+        print(json.dumps(records))
+        return
+
+    results = {"meta": _meta(), "results": []}
+    for kind in args.kinds:
+        for rows in args.rows:
+            job = {"kind": kind, "rows": rows, "cases": args.cases, "repeat": args.repeat,
+                   "profile": args.profile, "data_dir": args.data_dir}
+            out = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--_child", json.dumps(job)],
+                                 cwd=ROOT, check=True, stdout=subprocess.PIPE, text=True)
+            results["results"].extend(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    out_path = Path(args.out) if args.out else ROOT / "data" / "bench" / f"results_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(results, indent=2))
+    print(f"✅ Results: {out_path}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"✅ Baseline updated: {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; rerun with --update_baseline to store one.")
+        return
+    slow = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+    for s in slow:
+        print(f"⚠️  {s['kind']} {s['rows']:,} {s['case']}: {s['wall_s']:.3f}s vs {s['baseline_s']:.3f}s (x{s['ratio']})")
+    if slow:
+        sys.exit(1)
+    print(f"✅ No case slower than baseline by more than {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
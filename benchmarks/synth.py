@@ -0,0 +1,163 @@
+"""
+Synthetic UCI-hospitals- and Pima-shaped data for benchmarks and tests.
+Values, '?' markers, age brackets and column cardinalities follow the real
+extracts (UCI: ~70 specialties, 18 payer codes, ~800 diagnosis codes, about
+1.4 encounters per patient; Pima: zeros as missing markers); joint
+distributions don't.
+
+Run with: python -m benchmarks.synth --kind pima --rows 1000000 --out data/bench/pima_1000000.parquet
+"""
+import argparse, sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.presets import UCI_MED_COLS
+
+AGE_BRACKETS = [f"[{lo}-{lo+10})" for lo in range(0, 100, 10)]
+PAYER_CODES = ["MC", "HM", "SP", "BC", "MD", "CP", "UN", "CM", "OG", "PO",
+               "DM", "CH", "WC", "OT", "MP", "SI", "FR"]
+SPECIALTIES = ["InternalMedicine", "Emergency/Trauma", "Family/GeneralPractice", "Cardiology",
+               "Surgery-General", "Nephrology", "Orthopedics", "Orthopedics-Reconstructive",
+               "Radiologist", "Pulmonology", "Psychiatry", "Urology", "ObstetricsandGynecology",
+               "Surgery-Cardiovascular/Thoracic", "Gastroenterology", "Surgery-Vascular",
+               "Surgery-Neuro", "PhysicalMedicineandRehabilitation", "Oncology", "Pediatrics",
+               "Hematology/Oncology", "Neurology", "Pediatrics-Endocrinology", "Otolaryngology",
+               "Endocrinology", "Surgery-Thoracic", "Podiatry", "Psychology", "Surgery-Cardiovascular",
+               "Pediatrics-CriticalCare", "Gynecology", "Hematology", "Hospitalist", "Radiology",
+               "Surgery-Plastic", "InfectiousDiseases", "Osteopath", "Ophthalmology",
+               "Surgery-Pediatric", "Anesthesiology", "Rheumatology", "Pathology",
+               "Obstetrics", "SurgicalSpecialty", "Surgery-Maxillofacial", "AllergyandImmunology",
+               "Dentistry", "Surgeon", "Pediatrics-Pulmonology", "Endocrinology-Metabolism",
+               "Psychiatry-Child/Adolescent", "Pediatrics-Neurology", "Anesthesiology-Pediatric",
+               "Cardiology-Pediatric", "Surgery-Colon&Rectal", "Pediatrics-Hematology-Oncology",
+               "Pediatrics-EmergencyMedicine", "Resident", "Speech", "DCPTEAM", "Neurophysiology",
+               "Pediatrics-AllergyandImmunology", "Psychiatry-Addictive", "Dermatology",
+               "Pediatrics-InfectiousDiseases", "Perinatology", "Proctology", "Sportsmedicine",
+               "SportsMedicine", "OutreachServices", "Surgery-PlasticwithinHeadandNeck"]
+
+def _tail(n, head):
+    """Probabilities: `head` for the first values, Zipf-like over the rest."""
+    rest = 1.0 / np.arange(1, n - len(head) + 1)
+    return np.concatenate([head, rest / rest.sum() * (1 - sum(head))])
+
+def _diag_codes(rng, n_codes=700):
+    nums = rng.choice(np.arange(1, 1000), size=n_codes, replace=False)
+    codes = [f"{x:03d}" if i % 3 else f"{x:03d}.{i % 100:02d}" for i, x in enumerate(nums)]
+    return np.array(codes + [f"V{i:02d}" for i in range(60)] + ["E909", "?"], dtype=object)
+
+def make_uci_frame(n_rows: int, seed: int = 0, start_id: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    diag = _diag_codes(np.random.default_rng(12345))
+
+    def pick(values, p=None):
+        return np.asarray(values, dtype=object)[rng.choice(len(values), n_rows, p=p)]
+
+    df = pd.DataFrame({
+        "encounter_id": np.arange(start_id, start_id + n_rows) * 7 + 12522,
+        # ~1.4 encounters per patient, as in the real extract
+        "patient_nbr": (rng.integers(0, max(1, int(n_rows * 1.5)), n_rows) + start_id) * 9 + 135,
+        "race": pick(["Caucasian", "AfricanAmerican", "?", "Hispanic", "Other", "Asian"],
+                     [0.75, 0.19, 0.02, 0.02, 0.01, 0.01]),
+        "gender": pick(["Female", "Male", "Unknown/Invalid"], [0.538, 0.46, 0.002]),
+        "age": pick(AGE_BRACKETS, [0.002, 0.007, 0.016, 0.037, 0.095, 0.17, 0.221, 0.256, 0.169, 0.027]),
+        "weight": pick(["?", "[75-100)", "[50-75)", "[100-125)"], [0.97, 0.013, 0.009, 0.008]),
+        "admission_type_id": rng.integers(1, 9, n_rows),
+        "discharge_disposition_id": rng.integers(1, 30, n_rows),
+        "admission_source_id": rng.integers(1, 26, n_rows),
+        "time_in_hospital": rng.integers(1, 15, n_rows),
+        "payer_code": pick(["?"] + PAYER_CODES, _tail(len(PAYER_CODES) + 1, [0.4, 0.32, 0.06, 0.05, 0.05])),
+        "medical_specialty": pick(["?"] + SPECIALTIES,
+                                  _tail(len(SPECIALTIES) + 1, [0.49, 0.14, 0.07, 0.07, 0.05])),
+        "num_lab_procedures": rng.integers(1, 133, n_rows),
+        "num_procedures": rng.integers(0, 7, n_rows),
+        "num_medications": rng.integers(1, 82, n_rows),
+        "number_outpatient": rng.poisson(0.4, n_rows),
+        "number_emergency": rng.poisson(0.2, n_rows),
+        "number_inpatient": rng.poisson(0.6, n_rows),
+        "diag_1": pick(diag), "diag_2": pick(diag), "diag_3": pick(diag),
+        "number_diagnoses": rng.integers(1, 17, n_rows),
+        "max_glu_serum": pick(["None", "Norm", ">200", ">300"], [0.95, 0.025, 0.015, 0.01]),
+        "A1Cresult": pick(["None", "Norm", ">7", ">8"], [0.83, 0.05, 0.04, 0.08]),
+    })
+    for col in UCI_MED_COLS:
+        df[col] = pick(["No", "Steady", "Up", "Down"], [0.8, 0.15, 0.03, 0.02])
+    df["change"] = pick(["No", "Ch"], [0.54, 0.46])
+    df["diabetesMed"] = pick(["Yes", "No"], [0.77, 0.23])
+    df["readmitted"] = pick(["NO", ">30", "<30"], [0.54, 0.35, 0.11])
+    return df
+
+def make_pima_frame(n_rows: int, seed: int = 0, start_id: int = 0) -> pd.DataFrame:
+    """Pima-shaped frame; 0 marks missing Glucose/BloodPressure/SkinThickness/
+    Insulin/BMI at the real extract's rates, Outcome (~35% positive) depends
+    on glucose, BMI, age and pedigree through a logistic link."""
+    rng = np.random.default_rng(seed)
+    age = np.clip(21 + rng.gamma(1.6, 7.5, n_rows), 21, 81).astype(int)
+    glucose = np.clip(rng.normal(121, 30, n_rows), 44, 199).round()
+    bmi = np.clip(rng.normal(32.4, 6.9, n_rows), 18.2, 67.1).round(1)
+    pedigree = np.clip(rng.lognormal(-0.93, 0.6, n_rows), 0.078, 2.42).round(3)
+    logit = -8.9 + 0.035 * glucose + 0.09 * bmi + 0.015 * age + 0.9 * pedigree
+    df = pd.DataFrame({
+        "Pregnancies": np.minimum(rng.poisson(3.8, n_rows), 17),
+        "Glucose": glucose.astype(int),
+        "BloodPressure": np.clip(rng.normal(72, 12, n_rows), 24, 122).round().astype(int),
+        "SkinThickness": np.clip(rng.normal(29, 10, n_rows), 7, 99).round().astype(int),
+        "Insulin": np.clip(rng.lognormal(4.8, 0.6, n_rows), 14, 846).round().astype(int),
+        "BMI": bmi,
+        "DiabetesPedigreeFunction": pedigree,
+        "Age": age,
+        "Outcome": (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int),
+    })
+    for col, rate in [("Glucose", 0.007), ("BloodPressure", 0.046), ("SkinThickness", 0.296),
+                      ("Insulin", 0.487), ("BMI", 0.014)]:
+        df.loc[rng.random(n_rows) < rate, col] = 0
+    return df
+
+GENERATORS = {"uci_hospitals": make_uci_frame, "pima": make_pima_frame}
+
+def write_dataset(path, n_rows: int, kind: str = "uci_hospitals", chunk_rows: int = 500_000,
+                  seed: int = 0) -> Path:
+    """Write an n_rows synthetic dataset in chunks (generation memory stays
+    bounded): CSV, or Parquet (one row group per chunk) for a .parquet path."""
+    if kind not in GENERATORS:
+        raise ValueError("Unknown kind. Use 'uci_hospitals' or 'pima'.")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = ((i, GENERATORS[kind](min(chunk_rows, n_rows - start), seed=seed + i, start_id=start))
+              for i, start in enumerate(range(0, n_rows, chunk_rows)))
+    if path.suffix == ".parquet":
+        import pyarrow as pa, pyarrow.parquet as pq
+        writer = None
+        try:
+            for _, df in chunks:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+    with path.open("w", newline="") as f:
+        for i, df in chunks:
+            df.to_csv(f, index=False, header=(i == 0))
+    return path
+
+def write_uci_csv(path, n_rows: int, chunk_rows: int = 500_000, seed: int = 0) -> Path:
+    """Write an n_rows UCI-shaped CSV in chunks (generation memory stays bounded)."""
+    return write_dataset(path, n_rows, "uci_hospitals", chunk_rows, seed)
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--kind", type=str, default="uci_hospitals", choices=sorted(GENERATORS))
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--out", type=str, required=True, help=".csv or .parquet")
+    p.add_argument("--chunk_rows", type=int, default=500_000)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+    path = write_dataset(args.out, args.rows, args.kind, args.chunk_rows, args.seed)
+    print(f"✅ Wrote {args.rows:,} {args.kind} rows to {path} ({path.stat().st_size / 2**20:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-def classification_metrics(y_true, y_pred, y_prob=None):
+import numpy as np
+
+def classification_metrics(y_true, y_pred, y_prob=None, n_boot=0, ci=0.95, seed=0,
+                           weights="multinomial", n_jobs=1):
+    """Point estimates; n_boot > 0 adds percentile CIs under m["ci"] (binary only)."""
     from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, average_precision_score
     m = {}
     m["accuracy"] = float(accuracy_score(y_true, y_pred))
@@ -12,4 +16,90 @@ def classification_metrics(y_true, y_pred, y_prob=None):
             m["auprc"] = float(average_precision_score(y_true, y_prob))
         except Exception:
             pass
+    if n_boot and set(np.unique(y_true)) <= {0, 1}:
+        m["ci"] = bootstrap_ci(y_true, y_pred, y_prob, n_boot=n_boot, ci=ci, seed=seed,
+                               weights=weights, n_jobs=n_jobs)
+        m["n_boot"] = int(n_boot)
     return m
+
+def _replicate_weights(rng, n, b, weights):
+    """(b, n) row multiplicities: exact resampling counts (one flat bincount
+    over b*n draws), or independent Poisson(1) weights, which give the same
+    CIs asymptotically and can be drawn per shard."""
+    if weights == "poisson":
+        return rng.poisson(1.0, size=(b, n)).astype(np.float32)
+    if weights == "multinomial":
+        idx = rng.integers(0, n, size=(b, n)) + (np.arange(b) * n)[:, None]
+        return np.bincount(idx.ravel(), minlength=b * n).reshape(b, n).astype(np.float32)
+    raise ValueError("weights must be 'multinomial' or 'poisson'")
+
+def _weighted_block(y, y_pred, levels, W):
+    """Metrics for each row of weight matrix W.
+
+    Rows arrive sorted by score, so AUROC/AUPRC are rank statistics over
+    the distinct score levels (weights summed per tie level with
+    reduceat) and no replicate needs its own sort."""
+    yb, pb = y.astype(np.float32), y_pred.astype(np.float32)
+    wsum = W.sum(axis=1)
+    tp = W @ (yb * pb)
+    fp = W @ ((1 - yb) * pb)
+    fn = W @ (yb * (1 - pb))
+    correct = W @ (yb == pb).astype(np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = {"accuracy": correct / wsum,
+               "f1": np.nan_to_num(2 * tp / (2 * tp + fp + fn), nan=0.0)}
+    if levels is not None:
+        pos, neg = W * yb, W * (1 - yb)
+        if len(levels) < len(y):  # ties: collapse to one column per score level, ascending
+            pos, neg = np.add.reduceat(pos, levels, axis=1), np.add.reduceat(neg, levels, axis=1)
+        P, N = pos.sum(axis=1), neg.sum(axis=1)
+        neg_below = np.cumsum(neg, axis=1) - neg
+        # descending cumulative counts give precision at each threshold
+        tp_at = np.cumsum(pos[:, ::-1], axis=1)
+        fp_at = np.cumsum(neg[:, ::-1], axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["auroc"] = (pos * (neg_below + 0.5 * neg)).sum(axis=1) / (P * N)
+            prec = tp_at / (tp_at + fp_at)
+            out["auprc"] = np.nansum(pos[:, ::-1] * prec, axis=1) / P
+    return out
+
+def _boot_block(y, y_pred, levels, b, weights, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    return _weighted_block(y, y_pred, levels, _replicate_weights(rng, len(y), b, weights))
+
+def bootstrap_ci(y_true, y_pred, y_prob=None, n_boot=1000, ci=0.95, seed=0,
+                 weights="multinomial", n_jobs=1, max_cells=20_000_000):
+    """Percentile bootstrap CIs for accuracy, F1, AUROC and AUPRC.
+
+    Replicates are drawn as weight matrices in blocks of at most max_cells
+    entries; blocks run in a joblib process pool when n_jobs != 1. Each
+    block has its own spawned seed, so results don't depend on n_jobs.
+    Returns {metric: [lo, hi]}.
+    """
+    y = np.asarray(y_true).astype(np.int8)
+    yp = np.asarray(y_pred).astype(np.int8)
+    n = len(y)
+    levels = None
+    if y_prob is not None:
+        # resampling weights are iid per row, so sorting rows by score once up
+        # front is equivalent to sorting every replicate
+        p = np.asarray(y_prob, dtype=float)
+        order = np.argsort(p, kind="mergesort")
+        y, yp, p = y[order], yp[order], p[order]
+        levels = np.flatnonzero(np.r_[True, p[1:] != p[:-1]])
+    block = max(1, min(n_boot, max_cells // max(n, 1)))
+    sizes = [min(block, n_boot - s) for s in range(0, n_boot, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if n_jobs == 1 or len(sizes) == 1:
+        parts = [_boot_block(y, yp, levels, b, weights, s) for b, s in zip(sizes, seeds)]
+    else:
+        from joblib import Parallel, delayed
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(_boot_block)(y, yp, levels, b, weights, s) for b, s in zip(sizes, seeds))
+    alpha = (1 - ci) / 2
+    out = {}
+    for k in parts[0]:
+        draws = np.concatenate([part[k] for part in parts])
+        lo, hi = np.nanquantile(draws, [alpha, 1 - alpha])
+        out[k] = [float(lo), float(hi)]
+    return out
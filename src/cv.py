@@ -0,0 +1,56 @@
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv
+
+def _take(X, idx):
+    return X.iloc[idx] if hasattr(X, "iloc") else X[idx]
+
+def _fit_fold(estimator, X, y, train_idx, valid_idx, scorer, fold):
+    """Fit a clone on one fold and score it; failures become a NaN score."""
+    est = clone(estimator)
+    res = {"fold": fold, "n_train": int(len(train_idx)), "n_valid": int(len(valid_idx))}
+    t0 = time.perf_counter()
+    try:
+        est.fit(_take(X, train_idx), _take(y, train_idx))
+        res["fit_s"] = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        res["score"] = float(scorer(est, _take(X, valid_idx), _take(y, valid_idx)))
+        res["score_s"] = time.perf_counter() - t1
+    except Exception as e:
+        res.update({"fit_s": time.perf_counter() - t0, "score": float("nan"), "error": repr(e)})
+    return res
+
+def _fit_final(estimator, X, y):
+    est = clone(estimator)
+    t0 = time.perf_counter()
+    est.fit(X, y)
+    return est, time.perf_counter() - t0
+
+def cross_validate_and_fit(estimator, X, y, cv=3, scoring="roc_auc", n_jobs=1):
+    """Run CV folds and the final fit on all of X as one batch of pool tasks.
+
+    The final model does not depend on CV results, so it runs alongside the
+    folds instead of after them. n_jobs follows joblib (-1 = all cores,
+    loky process pool). Returns (fitted_estimator, report) where report has
+    per-fold scores and timings.
+    """
+    splitter = check_cv(cv, y, classifier=True)
+    scorer = get_scorer(scoring)
+    splits = list(splitter.split(X, y))
+    t0 = time.perf_counter()
+    tasks = [delayed(_fit_final)(estimator, X, y)]
+    tasks += [delayed(_fit_fold)(estimator, X, y, tr, va, scorer, i)
+              for i, (tr, va) in enumerate(splits)]
+    out = Parallel(n_jobs=n_jobs)(tasks)
+    (fitted, final_s), folds = out[0], out[1:]
+
+    scores = np.array([f["score"] for f in folds], dtype=float)
+    report = {"scoring": scoring, "n_jobs": n_jobs, "folds": folds,
+              "final_fit_s": final_s, "wall_s": time.perf_counter() - t0}
+    if scores.size and not np.isnan(scores).any():
+        report[f"cv_{scoring}_mean"] = float(scores.mean())
+        report[f"cv_{scoring}_std"] = float(scores.std())
+    return fitted, report
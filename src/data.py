@@ -1,19 +1,73 @@
+import hashlib
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+SPLITS = ("train", "valid", "test")
+SPLIT_META_KEY = b"split_fingerprint"  # Parquet metadata key on preds written from a split
+
 def load_csv(csv_path: str) -> pd.DataFrame:
     path = Path(csv_path)
     if not path.exists():
         raise FileNotFoundError(f"CSV not found at {csv_path}. Put your data at ./data/raw/diabetes.csv or pass --csv_path.")
     return pd.read_csv(path)
 
-def train_valid_test_split(df, target, seed=42, valid_size=0.2, test_size=0.2):
+def split_indices(y, seed=42, valid_size=0.2, test_size=0.2) -> dict:
+    """Stratified {"train", "valid", "test"} row positions (int32 below 2**31 rows).
+    Only y is read, and the assignment (and order) is the one the frame-based
+    split always produced, so results are unchanged."""
     from sklearn.model_selection import train_test_split
-    y = df[target]
-    X = df.drop(columns=[target])
-    strat = y if y.nunique()<=20 else None
-    X_temp, X_test, y_temp, y_test = train_test_split(X, y, test_size=test_size, random_state=seed, stratify=strat)
+    y = np.asarray(y)
+    pos = np.arange(len(y), dtype=np.int32 if len(y) < 2**31 else np.int64)
+    strat = y if len(np.unique(y)) <= 20 else None
+    temp, test = train_test_split(pos, test_size=test_size, random_state=seed, stratify=strat)
     rel_valid = valid_size / (1 - test_size)
-    strat_temp = y_temp if y_temp.nunique()<=20 else None
-    X_train, X_valid, y_train, y_valid = train_test_split(X_temp, y_temp, test_size=rel_valid, random_state=seed, stratify=strat_temp)
-    return (X_train, y_train), (X_valid, y_valid), (X_test, y_test)
+    strat_temp = y[temp] if strat is not None else None
+    train, valid = train_test_split(temp, test_size=rel_valid, random_state=seed, stratify=strat_temp)
+    return {"train": train, "valid": valid, "test": test}
+
+def split_fingerprint(y, seed=42, valid_size=0.2, test_size=0.2) -> str:
+    """The split is a function of y and the parameters only, so that is all
+    the key hashes (feature or leakage-drop changes reuse the same split)."""
+    h = hashlib.sha256(f"{seed}|{valid_size}|{test_size}|{len(y)}".encode())
+    h.update(pd.util.hash_array(np.asarray(y)).tobytes())
+    return h.hexdigest()[:20]
+
+def save_split(idx: dict, path, fingerprint: str = "") -> Path:
+    """Write the index arrays (+ fingerprint) as one uncompressed .npz."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, fingerprint=np.array(fingerprint), **{k: idx[k] for k in SPLITS})
+    tmp.replace(path)
+    return path
+
+def load_split(path) -> dict:
+    """{"train", "valid", "test", "fingerprint"} from save_split."""
+    with np.load(path) as z:
+        out = {k: z[k] for k in SPLITS}
+        out["fingerprint"] = str(z["fingerprint"]) if "fingerprint" in z.files else ""
+    return out
+
+def cached_split(y, seed=42, valid_size=0.2, test_size=0.2, cache_dir=None) -> dict:
+    """split_indices, reused from cache_dir/splits/<fingerprint>.npz when the
+    same target column was split before (cache_dir=None: compute only)."""
+    fp = split_fingerprint(y, seed, valid_size, test_size)
+    path = Path(cache_dir) / "splits" / f"{fp}.npz" if cache_dir is not None else None
+    if path is not None and path.exists():
+        return load_split(path)
+    idx = split_indices(y, seed, valid_size, test_size)
+    if path is not None:
+        save_split(idx, path, fp)
+    return {**idx, "fingerprint": fp}
+
+def split_xy(df, idx, target):
+    """(X, y) for one split: a single take of the needed rows and feature
+    columns, instead of copying the whole frame without the target first."""
+    cols = [i for i, c in enumerate(df.columns) if c != target]
+    return df.iloc[idx, cols], df[target].iloc[idx]
+
+def train_valid_test_split(df, target, seed=42, valid_size=0.2, test_size=0.2):
+    idx = split_indices(df[target].to_numpy(), seed, valid_size, test_size)
+    return tuple(split_xy(df, idx[k], target) for k in SPLITS)
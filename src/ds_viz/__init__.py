@@ -1,2 +1,9 @@
-from .corrmatrix import scatter_matrix_with_corr, quick_corr_plot
+# Plotting helpers load matplotlib; resolve them on first attribute access so
+# `import ds_viz.fastcorr` (and anything importing this package) stays light.
 __all__ = ["scatter_matrix_with_corr", "quick_corr_plot"]
+
+def __getattr__(name):
+    if name in __all__:
+        from . import corrmatrix
+        return getattr(corrmatrix, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
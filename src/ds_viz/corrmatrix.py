@@ -5,6 +5,8 @@ from matplotlib.patches import Ellipse
 from matplotlib import colors as mcolors
 from matplotlib import cm
 
+from .fastcorr import corr_matrices, METHODS
+
 # --- helper: covariance ellipse ---
 def confidence_ellipse(x, y, ax, n_std=2.0, **kwargs):
     x = np.asarray(x); y = np.asarray(y)
@@ -22,6 +24,38 @@ def confidence_ellipse(x, y, ax, n_std=2.0, **kwargs):
                     angle=theta, fill=False, **kwargs)
     ax.add_patch(ellip)
 
+# --- helpers: large-data panels ---
+def _sample_index(mask, max_points, rng, strata=None):
+    """Row positions of at most max_points rows where mask holds; with
+    strata, each stratum keeps its share of the rows."""
+    idx = np.flatnonzero(mask)
+    if idx.size <= max_points:
+        return idx
+    if strata is None:
+        return np.sort(rng.choice(idx, max_points, replace=False))
+    codes, _ = pd.factorize(strata[idx])
+    picks = []
+    for k in range(codes.max() + 1):
+        members = idx[codes == k]
+        take = int(round(max_points * members.size / idx.size))
+        if take:
+            picks.append(rng.choice(members, min(take, members.size), replace=False))
+    return np.sort(np.concatenate(picks)) if picks else idx[:0]
+
+def _density_panel(ax, x, y, kind, gridsize, cmap_name="Blues"):
+    """Hexbin or 2D-histogram panel; one binning pass over the pair."""
+    if kind == "hexbin":
+        ax.hexbin(x, y, gridsize=gridsize, bins="log", mincnt=1, cmap=cmap_name, rasterized=True)
+        return
+    # equal-width bins by arithmetic + one bincount (np.histogram2d searches edges)
+    xe, ye = (np.linspace(v.min(), v.max() if v.max() > v.min() else v.min() + 1, gridsize + 1) for v in (x, y))
+    ix = np.clip(((x - xe[0]) / (xe[-1] - xe[0]) * gridsize).astype(np.int64), 0, gridsize - 1)
+    iy = np.clip(((y - ye[0]) / (ye[-1] - ye[0]) * gridsize).astype(np.int64), 0, gridsize - 1)
+    H = np.bincount(iy * gridsize + ix, minlength=gridsize * gridsize).reshape(gridsize, gridsize)
+    H = np.ma.masked_equal(H, 0)
+    ax.pcolormesh(xe, ye, H, cmap=cmap_name, norm=mcolors.LogNorm(vmin=1, vmax=max(H.max(), 1)),
+                  rasterized=True)
+
 # --- main function ---
 def scatter_matrix_with_corr(
     df,
@@ -53,7 +87,16 @@ def scatter_matrix_with_corr(
     dpi=300,
     show=True,
     # NaN filtering
-    min_nonmissing=0.8
+    min_nonmissing=0.8,
+    # large data
+    panel="auto",                 # "auto" | "scatter" | "sample" | "hist2d" | "hexbin"
+    large_threshold=20_000,       # auto: rows above this switch to hist2d panels
+    max_points=5_000,             # sample: points drawn per panel
+    gridsize=40,                  # hist2d/hexbin: bins per axis
+    rasterized=None,              # None = rasterize panel artists whenever not plain scatter
+    corr=None,                    # precomputed correlation matrix to reuse
+    random_state=0,
+    n_jobs=1                      # processes for Kendall pairs
 ):
     """
     Create a JMP-style scatterplot matrix with correlations.
@@ -67,11 +110,19 @@ def scatter_matrix_with_corr(
       - Colored & scaled correlation coefficients
       - Shared Y-axis on diagonal histograms
       - Saves correlation table (CSV) + figure (PNG/PDF)
+      - Large frames: sampled (stratified by target) or density (hist2d/hexbin)
+        lower panels, rasterized; r values and ellipses still use every row
     """
     # validate method
     method = method.lower()
     if method not in {"pearson", "spearman", "kendall"}:
         raise ValueError("method must be 'pearson', 'spearman', or 'kendall'")
+    if panel == "auto":
+        panel = "hist2d" if len(df) > large_threshold else "scatter"
+    if panel not in {"scatter", "sample", "hist2d", "hexbin"}:
+        raise ValueError('panel must be "auto", "scatter", "sample", "hist2d" or "hexbin"')
+    if rasterized is None:
+        rasterized = panel != "scatter"
 
     # auto-pick numeric columns
     if columns is None:
@@ -93,7 +144,10 @@ def scatter_matrix_with_corr(
         elif select_strategy == "target":
             if target is None or target not in df.columns:
                 raise ValueError("Must provide a valid target column when using select_strategy='target'")
-            corrs = df[columns].corrwith(df[target], method=method).abs().sort_values(ascending=False)
+            if corr is None or target not in corr.columns or not set(columns) <= set(corr.index):
+                # one matrix serves both the selection and the plot below
+                corr = corr_matrices(df[list(dict.fromkeys(columns + [target]))], method, n_jobs)[method]
+            corrs = corr.loc[columns, target].abs().sort_values(ascending=False)
             columns = [target] + [c for c in corrs.index if c != target][:max_vars-1]
         else:
             raise ValueError('select_strategy must be "variance", "first", or "target"')
@@ -107,8 +161,11 @@ def scatter_matrix_with_corr(
     if standardize:
         data = (data - data.mean()) / data.std(ddof=0)
 
-    # compute correlation matrix
-    corr = data.corr(method=method)
+    # compute correlation matrix (standardizing doesn't change it)
+    if corr is not None and set(columns) <= set(corr.index) and set(columns) <= set(corr.columns):
+        corr = corr.loc[columns, columns]
+    else:
+        corr = corr_matrices(data, method, n_jobs)[method]
     print(f"{method.capitalize()} correlation matrix:\n", corr.round(3))
 
     # optional save
@@ -121,6 +178,8 @@ def scatter_matrix_with_corr(
     fig, axes = plt.subplots(n, n, figsize=(cell_size_in * n, cell_size_in * n))
 
     diag_heights, diag_axes = [], []
+    rng = np.random.default_rng(random_state)
+    strata = df[target].to_numpy() if target is not None and target in df.columns else None
 
     for i in range(n):
         for j in range(n):
@@ -136,7 +195,16 @@ def scatter_matrix_with_corr(
                 ax.set_xlabel(columns[j] if i == n - 1 else "")
 
             elif i > j:
-                ax.scatter(xi, yi, s=s, alpha=alpha)
+                if panel == "scatter":
+                    ax.scatter(xi, yi, s=s, alpha=alpha, rasterized=rasterized)
+                else:
+                    xv, yv = xi.to_numpy(dtype=float, na_value=np.nan), yi.to_numpy(dtype=float, na_value=np.nan)
+                    ok = ~np.isnan(xv) & ~np.isnan(yv)
+                    if panel == "sample":
+                        k = _sample_index(ok, max_points, rng, strata)
+                        ax.scatter(xv[k], yv[k], s=s, alpha=alpha, rasterized=rasterized)
+                    elif ok.any():
+                        _density_panel(ax, xv[ok], yv[ok], panel, gridsize)
                 confidence_ellipse(xi, yi, ax, n_std=2.0, linewidth=1.5, color='red')
                 ax.set_ylabel(columns[i] if j == 0 else "")
                 ax.set_xlabel(columns[j] if i == n - 1 else "")
@@ -190,54 +258,91 @@ def quick_corr_plot(
     filepath,
     target=None,
     max_vars=10,
-    method="pearson",     # "pearson" | "spearman" | "kendall"
+    method="pearson",     # "pearson" | "spearman" | "kendall", a list of them, or "all"
     select_strategy="variance",
     standardize=True,
     min_nonmissing=0.8,
     bins=20,
-    show=True
+    show=True,
+    n_jobs=1,
+    stream_above_mb=512,  # CSV/Parquet files larger than this are read in chunks
+    chunksize=200_000,
+    n_bins=256            # streaming: rank bins per column for Spearman/Kendall
 ):
     """
     Quick one-liner wrapper around scatter_matrix_with_corr.
     Saves outputs in the SAME directory as the input file.
     Filenames include method and target for easy tracking.
+    Several methods share one correlation pass (ranks computed once);
+    returns (corr, fig) for one method, {method: (corr, fig)} for several.
+    Files above stream_above_mb are never loaded whole: correlations come
+    from a StreamingCorr pass and the figure is drawn from its row sample.
     """
     import os
     import pandas as pd
 
-    # --- Load data ---
-    if filepath.lower().endswith(".csv"):
-        df = pd.read_csv(filepath)
-    elif filepath.lower().endswith((".xls", ".xlsx")):
-        df = pd.read_excel(filepath)
+    methods = list(METHODS) if method == "all" else [method] if isinstance(method, str) else list(method)
+    methods = [m.lower() for m in methods]
+    lower = filepath.lower()
+    streamable = lower.endswith((".csv", ".parquet", ".pq"))
+    size_mb = os.path.getsize(filepath) / 2**20
+
+    if streamable and stream_above_mb is not None and size_mb > stream_above_mb:
+        # --- Chunked pass: tables from sketches, figure from the sample ---
+        from .streamcorr import streaming_corr
+        print(f"ℹ️ {size_mb:.0f} MB > {stream_above_mb} MB; streaming in chunks of {chunksize:,} rows")
+        acc = streaming_corr(filepath, chunksize=chunksize, n_bins=n_bins)
+        df = acc.sample
+        candidates = [c for c in acc.columns if acc.valid_frac()[c] >= min_nonmissing]
+        tables = {m: acc.corr(m).loc[candidates, candidates] for m in methods}
+        if max_vars is not None and len(candidates) > max_vars and select_strategy == "variance":
+            candidates = acc.variance()[candidates].sort_values(ascending=False).head(max_vars).index.tolist()
+        # the sample's own NaN share must not re-filter what the full pass kept
+        min_nonmissing = 0.0
     else:
-        raise ValueError("Only CSV or Excel supported for now.")
+        # --- Load data ---
+        if lower.endswith(".csv"):
+            df = pd.read_csv(filepath)
+        elif lower.endswith((".parquet", ".pq")):
+            df = pd.read_parquet(filepath)
+        elif lower.endswith((".xls", ".xlsx")):
+            df = pd.read_excel(filepath)
+        else:
+            raise ValueError("Only CSV, Parquet or Excel supported for now.")
+
+        # --- All tables in one pass over the candidate columns ---
+        numeric = df.select_dtypes(include=np.number)
+        candidates = [c for c in numeric.columns if numeric[c].notna().mean() >= min_nonmissing]
+        tables = corr_matrices(df[candidates], methods, n_jobs) if candidates else {}
 
     # --- Build output paths in the input's directory ---
     in_dir  = os.path.dirname(os.path.abspath(filepath)) or "."
     base    = os.path.splitext(os.path.basename(filepath))[0]
-    method_suffix = method.lower()
     target_suffix = "" if target is None else "_" + str(target).replace(" ", "").replace("/", "_")
 
-    save_table = os.path.join(in_dir, f"{base}_corr_{method_suffix}{target_suffix}.csv")
-    save_fig   = os.path.join(in_dir, f"{base}_scatter_matrix_{method_suffix}{target_suffix}.png")
-
-    # --- Run the full plotter ---
-    corr, fig = scatter_matrix_with_corr(
-        df,
-        target=target,
-        max_vars=max_vars,
-        select_strategy=select_strategy,
-        method=method,
-        standardize=standardize,
-        min_nonmissing=min_nonmissing,
-        bins=bins,
-        save_table=save_table,
-        save_fig=save_fig,
-        show=show
-    )
-
-    print(f"✅ Saved correlation matrix to {save_table}")
-    print(f"✅ Saved scatterplot matrix to {save_fig}")
-    return corr, fig
+    results = {}
+    for method_suffix in methods:
+        save_table = os.path.join(in_dir, f"{base}_corr_{method_suffix}{target_suffix}.csv")
+        save_fig   = os.path.join(in_dir, f"{base}_scatter_matrix_{method_suffix}{target_suffix}.png")
+
+        # --- Run the full plotter, reusing the precomputed table ---
+        corr, fig = scatter_matrix_with_corr(
+            df,
+            columns=candidates,
+            target=target,
+            max_vars=max_vars,
+            select_strategy=select_strategy,
+            method=method_suffix,
+            standardize=standardize,
+            min_nonmissing=min_nonmissing,
+            bins=bins,
+            save_table=save_table,
+            save_fig=save_fig,
+            show=show,
+            corr=tables.get(method_suffix)
+        )
 
+        print(f"✅ Saved correlation matrix to {save_table}")
+        print(f"✅ Saved scatterplot matrix to {save_fig}")
+        results[method_suffix] = (corr, fig)
+    return results[methods[0]] if len(methods) == 1 else results
@@ -0,0 +1,182 @@
+"""
+Correlation matrices for several methods in one pass over the data.
+
+Each column is ranked once; Spearman is Pearson on the average ranks and
+Kendall's tau-b works from the dense ranks, so neither re-sorts a column
+per pair. Kendall pairs can be spread over a joblib process pool.
+"""
+from __future__ import annotations
+import numpy as np
+
+METHODS = ("pearson", "spearman", "kendall")
+
+def _ranks(v):
+    """(dense ranks 0..k-1, average ranks 1..n) of a NaN-free 1-D array."""
+    order = np.argsort(v, kind="mergesort")
+    sv = v[order]
+    new = np.r_[True, sv[1:] != sv[:-1]]
+    dense_sorted = np.cumsum(new) - 1
+    starts = np.flatnonzero(new)
+    ends = np.r_[starts[1:], len(v)]
+    avg_sorted = ((starts + ends + 1) / 2.0)[dense_sorted]
+    dense, avg = np.empty(len(v), np.int64), np.empty(len(v))
+    dense[order], avg[order] = dense_sorted, avg_sorted
+    return dense, avg
+
+def _tie_pairs(dense):
+    t = np.bincount(dense)
+    return int((t * (t - 1) // 2).sum())
+
+def _count_inversions(r):
+    """#(j < i with r[j] > r[i]) for non-negative ints, in O(n log k).
+
+    Bits are visited from the top; a stable partition by each bit keeps
+    equal prefixes contiguous and in original order (a wavelet matrix), so
+    at each level the inversions decided by that bit are a per-group
+    count of ones seen before each zero."""
+    r = np.asarray(r)
+    r = r.astype(np.int32 if len(r) and r.max() < 2**31 else np.int64)
+    n_bits = max(int(r.max()).bit_length(), 1) if len(r) else 1
+    inv = 0
+    for b in range(n_bits - 1, -1, -1):
+        bit = ((r >> b) & 1).astype(np.uint8)
+        ones_before = np.cumsum(bit, dtype=np.int64) - bit
+        zeros = bit == 0
+        if b == n_bits - 1:
+            inv += int(ones_before[zeros].sum())
+        else:
+            prefix = r >> (b + 1)
+            starts = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+            zeros_per_group = np.add.reduceat(zeros.astype(np.int64), starts)
+            inv += int(ones_before[zeros].sum() - (zeros_per_group * ones_before[starts]).sum())
+        r = r[np.argsort(bit, kind="stable")]
+    return inv
+
+def _tau_b_from_table(rx, ry, kx, ky):
+    """tau-b from the kx x ky contingency table: O(n + kx*ky), which wins
+    for the low-cardinality integer columns typical of clinical data."""
+    return _tau_b_from_counts(np.bincount(rx * ky + ry, minlength=kx * ky).reshape(kx, ky))
+
+def _tau_b_from_counts(T):
+    """tau-b from a joint count table whose rows/columns are ordered levels."""
+    T = np.asarray(T, dtype=np.float64)
+    n = T.sum()
+    above = np.cumsum(T, axis=0) - T                          # rows i' < i, same column
+    lower_left = np.cumsum(above, axis=1) - above             # i' < i, j' < j
+    lower_right = above.sum(axis=1, keepdims=True) - np.cumsum(above, axis=1)  # i' < i, j' > j
+    conc, disc = (T * lower_left).sum(), (T * lower_right).sum()
+    n0 = n * (n - 1) / 2
+    n1 = (T.sum(axis=1) * (T.sum(axis=1) - 1) / 2).sum()
+    n2 = (T.sum(axis=0) * (T.sum(axis=0) - 1) / 2).sum()
+    denom = np.sqrt((n0 - n1) * (n0 - n2))
+    return (conc - disc) / denom if denom > 0 else np.nan
+
+def _tau_b_from_dense(rx, ry, n1=None, n2=None, max_cells=4_000_000):
+    """tau-b from dense ranks of two NaN-free columns: contingency table
+    when it is small, else Knight's O(n log n) sort + inversion count."""
+    n = len(rx)
+    if n < 2:
+        return np.nan
+    kx, ky = int(rx.max()) + 1, int(ry.max()) + 1
+    if kx * ky <= max_cells:
+        return _tau_b_from_table(rx, ry, kx, ky)
+    key = rx * ky + ry
+    order = np.argsort(key, kind="stable")
+    skey = key[order]
+    n1 = _tie_pairs(rx) if n1 is None else n1
+    n2 = _tie_pairs(ry) if n2 is None else n2
+    run = np.r_[True, skey[1:] != skey[:-1]]
+    sizes = np.diff(np.r_[np.flatnonzero(run), n])
+    n3 = int((sizes * (sizes - 1) // 2).sum())
+    dis = _count_inversions(ry[order])  # ties in x are y-sorted, so only discordant pairs invert
+    n0 = n * (n - 1) // 2
+    denom = np.sqrt(float(n0 - n1) * float(n0 - n2))
+    return (n0 - n1 - n2 + n3 - 2 * dis) / denom if denom > 0 else np.nan
+
+def kendall_tau_b(x, y) -> float:
+    """Kendall's tau-b over rows where both x and y are present."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    ok = ~np.isnan(x) & ~np.isnan(y)
+    return float(_tau_b_from_dense(_ranks(x[ok])[0], _ranks(y[ok])[0]))
+
+def _kendall_pairs(pairs, X, dense, ties, complete):
+    out = []
+    for i, j in pairs:
+        if complete[i] and complete[j]:
+            out.append(_tau_b_from_dense(dense[i], dense[j], ties[i], ties[j]))
+        else:  # pairwise-complete rows; dense ranks stay ordered on a subset
+            ok = ~np.isnan(X[:, i]) & ~np.isnan(X[:, j])
+            out.append(_tau_b_from_dense(_ranks(X[ok, i])[0], _ranks(X[ok, j])[0]))
+    return out
+
+def _pearson(X):
+    """Pairwise-complete Pearson matrix (plain matrix product when NaN-free)."""
+    M = ~np.isnan(X)
+    if M.all():
+        Xc = X - X.mean(axis=0)
+        ss = np.sqrt((Xc * Xc).sum(axis=0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (Xc.T @ Xc) / np.outer(ss, ss)
+    p = X.shape[1]
+    C = np.full((p, p), np.nan)
+    for i in range(p):
+        for j in range(i, p):
+            ok = M[:, i] & M[:, j]
+            if ok.sum() > 1:
+                C[i, j] = C[j, i] = np.corrcoef(X[ok, i], X[ok, j])[0, 1]
+    return C
+
+def corr_matrices(df: pd.DataFrame, methods=METHODS, n_jobs=1) -> dict:
+    """{method: correlation DataFrame} for each requested method, matching
+    df.corr(method=...) (pairwise-complete observations)."""
+    import pandas as pd
+    methods = [m.lower() for m in ([methods] if isinstance(methods, str) else methods)]
+    bad = set(methods) - set(METHODS)
+    if bad:
+        raise ValueError(f"Unknown method(s) {sorted(bad)}; use {METHODS}")
+    cols = list(df.columns)
+    X = df.to_numpy(dtype=np.float64, na_value=np.nan)
+    p = len(cols)
+    complete = ~np.isnan(X).any(axis=0)
+    out = {}
+    if "pearson" in methods:
+        out["pearson"] = _pearson(X)
+    if "spearman" in methods or "kendall" in methods:
+        dense, avg = [None] * p, np.full(X.shape, np.nan)
+        for k in range(p):
+            ok = ~np.isnan(X[:, k])
+            dense_k, avg[ok, k] = _ranks(X[ok, k])
+            if complete[k]:
+                dense[k] = dense_k
+        if "spearman" in methods:
+            if complete.all():
+                out["spearman"] = _pearson(avg)
+            else:  # re-rank on each pair's complete rows, as pandas does
+                S = np.eye(p)
+                for i in range(p):
+                    for j in range(i + 1, p):
+                        ok = ~np.isnan(X[:, i]) & ~np.isnan(X[:, j])
+                        a, b = _ranks(X[ok, i])[1], _ranks(X[ok, j])[1]
+                        S[i, j] = S[j, i] = np.corrcoef(a, b)[0, 1] if ok.sum() > 1 else np.nan
+                out["spearman"] = S
+        if "kendall" in methods:
+            ties = [_tie_pairs(d) if d is not None else None for d in dense]
+            pairs = [(i, j) for i in range(p) for j in range(i + 1, p)]
+            if n_jobs == 1 or len(pairs) < 2:
+                taus = _kendall_pairs(pairs, X, dense, ties, complete)
+            else:
+                from joblib import Parallel, delayed, effective_n_jobs
+                k = max(1, min(len(pairs), effective_n_jobs(n_jobs)))
+                chunks = [pairs[c::k] for c in range(k)]
+                parts = Parallel(n_jobs=n_jobs)(
+                    delayed(_kendall_pairs)(ch, X, dense, ties, complete) for ch in chunks)
+                lookup = {pr: t for ch, part in zip(chunks, parts) for pr, t in zip(ch, part)}
+                taus = [lookup[pr] for pr in pairs]
+            K = np.eye(p)
+            for (i, j), t in zip(pairs, taus):
+                K[i, j] = K[j, i] = t
+            out["kendall"] = K
+    for m, C in out.items():
+        np.fill_diagonal(C, 1.0)
+        out[m] = pd.DataFrame(C, index=cols, columns=cols)
+    return {m: out[m] for m in methods}
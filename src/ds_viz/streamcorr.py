@@ -0,0 +1,219 @@
+"""
+Correlation tables for files too big to load, one chunk at a time.
+
+StreamingCorr keeps, per column pair, mergeable co-moments (Chan/Welford
+updates over pairwise-complete rows) for Pearson, and a joint histogram
+over per-column bins for Spearman and Kendall. The bins are the distinct
+values of the column when there are at most n_bins of them (exact for the
+integer-coded columns of the diabetes extracts), otherwise quantile bins
+from a uniform bottom-k sample of its values; rank correlations are then
+computed from the binned table with mid-ranks, so their error is the
+within-bin ties. column_edges finds the bins in a first pass over every
+chunk, so sorted files and columns that start out empty bin correctly.
+It also keeps a uniform bottom-k row sample for drawing figures.
+"""
+import numpy as np
+import pandas as pd
+
+from .fastcorr import _tau_b_from_counts
+
+class StreamingCorr:
+    """Mergeable correlation accumulator; shards to be merged must share
+    their bins, so build them with edges=first.edges (and its columns).
+    Without edges the bins come from the first chunk alone, which is only
+    right when that chunk is representative; prefer column_edges."""
+    def __init__(self, columns=None, n_bins=256, sample_rows=20_000, seed=0, edges=None):
+        self.columns = columns
+        self.n_bins = n_bins
+        self.sample_rows = sample_rows
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.edges = None
+        self._fixed_edges = edges
+        self.sample, self._sample_keys = None, None
+
+    def _init(self, X):
+        p = X.shape[1]
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))   # mean of column i over rows where i and j are present
+        self.m2 = np.zeros((p, p))     # sum of squared deviations of column i, same rows
+        self.cross = np.zeros((p, p))  # co-moment of i and j
+        if self._fixed_edges is not None:
+            self.edges = [np.asarray(e, dtype=np.float64) for e in self._fixed_edges]
+        else:
+            self.edges = []
+        for k in range(p if self._fixed_edges is None else 0):
+            v = X[:, k][~np.isnan(X[:, k])]
+            uniq = np.unique(v)
+            self.edges.append(_bin_edges(uniq if len(uniq) <= self.n_bins else None, v, self.n_bins))
+        self.tables = {(i, j): np.zeros((len(self.edges[i]) + 1, len(self.edges[j]) + 1), dtype=np.int64)
+                       for i in range(p) for j in range(i + 1, p)}
+
+    def _moments(self, X):
+        """Per-chunk pairwise moments, as (n, mean, m2, cross) p x p arrays."""
+        M = ~np.isnan(X)
+        Mf = M.astype(np.float64)
+        X0 = np.where(M, X, 0.0)
+        n = Mf.T @ Mf
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.nan_to_num((X0.T @ Mf) / n)           # [i, j] -> mean of i on rows with j
+        m2, cross = np.zeros_like(n), np.zeros_like(n)
+        for j in range(X.shape[1]):  # center on each pair's own means to avoid cancellation
+            rows = M[:, j]
+            D = np.where(M[rows], X[rows] - mean[:, j], 0.0)
+            m2[:, j] = (D * D).sum(axis=0)
+            cross[:, j] = D.T @ D[:, j]  # D[:, i] sums to 0 on these rows, so j's centering cancels
+        return n, mean, m2, cross
+
+    def update(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self.columns = chunk.select_dtypes(include=np.number).columns.tolist()
+        frame, X = _numeric(chunk, self.columns)
+        if self.edges is None:
+            self._init(X)
+        self.rows += len(X)
+        self._merge_moments(*self._moments(X))
+        bins = [np.searchsorted(e, X[:, k], side="right") for k, e in enumerate(self.edges)]
+        ok = ~np.isnan(X)
+        for (i, j), T in self.tables.items():
+            rows = ok[:, i] & ok[:, j]
+            T += np.bincount(bins[i][rows] * T.shape[1] + bins[j][rows], minlength=T.size).reshape(T.shape)
+        self._update_sample(frame)
+        return self
+
+    def _merge_moments(self, n_b, mean_b, m2_b, cross_b):
+        n_a, mean_a = self.n, self.mean
+        n = n_a + n_b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w = np.where(n > 0, n_a * n_b / n, 0.0)
+            delta = mean_b - mean_a
+            self.mean = np.where(n > 0, mean_a + delta * n_b / np.where(n > 0, n, 1), 0.0)
+        self.m2 = self.m2 + m2_b + delta ** 2 * w
+        self.cross = self.cross + cross_b + delta * delta.T * w
+        self.n = n
+
+    def _update_sample(self, frame):
+        keys = self.rng.random(len(frame))
+        if self.sample is not None:
+            frame = pd.concat([self.sample, frame], ignore_index=True)
+            keys = np.r_[self._sample_keys, keys]
+        keep = np.sort(np.argsort(keys)[:self.sample_rows])
+        self.sample, self._sample_keys = frame.iloc[keep].reset_index(drop=True), keys[keep]
+
+    def merge(self, other):
+        """Fold in an accumulator built over another shard with the same bins."""
+        if other.edges is None:
+            return self
+        if self.edges is None:
+            self.__dict__.update({k: v for k, v in other.__dict__.items() if k != "rng"})
+            return self
+        self.rows += other.rows
+        self._merge_moments(other.n, other.mean, other.m2, other.cross)
+        for key, T in other.tables.items():
+            self.tables[key] += T
+        keys = np.r_[self._sample_keys, other._sample_keys]
+        frame = pd.concat([self.sample, other.sample], ignore_index=True)
+        keep = np.sort(np.argsort(keys)[:self.sample_rows])
+        self.sample, self._sample_keys = frame.iloc[keep].reset_index(drop=True), keys[keep]
+        return self
+
+    def valid_frac(self) -> pd.Series:
+        return pd.Series(np.diag(self.n) / max(self.rows, 1), index=self.columns)
+
+    def variance(self) -> pd.Series:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.Series(np.diag(self.m2) / (np.diag(self.n) - 1), index=self.columns)
+
+    def corr(self, method="pearson") -> pd.DataFrame:
+        p = len(self.columns)
+        if method == "pearson":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                C = self.cross / np.sqrt(self.m2 * self.m2.T)
+            C[self.n < 2] = np.nan
+        elif method in ("spearman", "kendall"):
+            C = np.eye(p)
+            for (i, j), T in self.tables.items():
+                C[i, j] = C[j, i] = (_spearman_from_table(T) if method == "spearman"
+                                     else _tau_b_from_counts(T))
+        else:
+            raise ValueError("method must be 'pearson', 'spearman', or 'kendall'")
+        np.fill_diagonal(C, 1.0)
+        return pd.DataFrame(C, index=self.columns, columns=self.columns)
+
+def _spearman_from_table(T):
+    """Pearson correlation of mid-ranks, weighted by the joint counts."""
+    T = T.astype(np.float64)
+    n = T.sum()
+    if n < 2:
+        return np.nan
+    r, c = T.sum(axis=1), T.sum(axis=0)
+    rx, ry = np.cumsum(r) - r + (r + 1) / 2, np.cumsum(c) - c + (c + 1) / 2
+    mx, my = (r * rx).sum() / n, (c * ry).sum() / n
+    dx, dy = rx - mx, ry - my
+    cov = dx @ T @ dy
+    denom = np.sqrt((r * dx * dx).sum() * (c * dy * dy).sum())
+    return cov / denom if denom > 0 else np.nan
+
+def iter_file_chunks(filepath, chunksize=200_000):
+    """DataFrame chunks from a CSV or Parquet file."""
+    path = str(filepath).lower()
+    if path.endswith(".csv"):
+        yield from pd.read_csv(filepath, chunksize=chunksize, low_memory=False)
+    elif path.endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError("Streaming supports CSV or Parquet files.")
+
+def _numeric(chunk, columns):
+    """(chunk restricted to columns, its float64 matrix with NaN for missing)."""
+    frame = chunk.reindex(columns=columns)
+    return frame, frame.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _bin_edges(distinct, sample, n_bins):
+    """Midpoints between the distinct values when known (one bin each),
+    else inner quantiles of the sample."""
+    if distinct is not None:
+        return (distinct[1:] + distinct[:-1]) / 2
+    return np.unique(np.quantile(sample, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+def column_edges(chunks, columns=None, n_bins=256, sample_values=50_000, seed=0):
+    """(columns, edges) for StreamingCorr from one pass over every chunk.
+
+    Each column's distinct values are tracked until there are more than
+    n_bins; past that its edges are quantiles of a uniform bottom-k sample
+    of its non-missing values, so the order of the rows does not matter."""
+    rng = np.random.default_rng(seed)
+    distinct = samples = keys = None
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk.select_dtypes(include=np.number).columns.tolist()
+        X = _numeric(chunk, columns)[1]
+        if distinct is None:
+            p = X.shape[1]
+            distinct = [np.empty(0)] * p
+            samples, keys = [np.empty(0)] * p, [np.empty(0)] * p
+        for k in range(X.shape[1]):
+            v = X[:, k][~np.isnan(X[:, k])]
+            if distinct[k] is not None:
+                distinct[k] = np.union1d(distinct[k], v)
+                if len(distinct[k]) > n_bins:
+                    distinct[k] = None
+            v, kv = np.r_[samples[k], v], np.r_[keys[k], rng.random(len(v))]
+            if len(v) > sample_values:
+                keep = np.argpartition(kv, sample_values)[:sample_values]
+                v, kv = v[keep], kv[keep]
+            samples[k], keys[k] = v, kv
+    if distinct is None:
+        return columns, None
+    return columns, [_bin_edges(d, v, n_bins) for d, v in zip(distinct, samples)]
+
+def streaming_corr(filepath, chunksize=200_000, n_bins=256, columns=None, sample_rows=20_000) -> StreamingCorr:
+    """Accumulate a StreamingCorr over every chunk of filepath: a first pass
+    fixes each column's bins, a second fills the moments and tables."""
+    columns, edges = column_edges(iter_file_chunks(filepath, chunksize), columns, n_bins)
+    acc = StreamingCorr(columns=columns, n_bins=n_bins, sample_rows=sample_rows, edges=edges)
+    for chunk in iter_file_chunks(filepath, chunksize):
+        acc.update(chunk)
+    return acc
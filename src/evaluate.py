@@ -1,40 +1,116 @@
 import argparse, json
-import pandas as pd
-import pyarrow.parquet as pq
-from .metrics import classification_metrics
-from .utils import save_json
-from .threshold import find_best_threshold
-from .subgroup import subgroup_metrics
+from pathlib import Path
+from .utils import save_json, load_config
+from .profiling import RunProfile, span
+
+PRED_COLS = ("y_pred", "y_prob")
 
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--pred_path", type=str, required=True)
     p.add_argument("--ytrue_path", type=str, required=True)
     p.add_argument("--report_path", type=str, required=True)
+    p.add_argument("--config", type=str, default="config.yaml", help="Reads the evaluate section.")
+    p.add_argument("--n_boot", type=int, default=None, help="Bootstrap replicates for metric CIs (overrides config).")
+    p.add_argument("--mode", type=str, default=None, choices=["auto", "exact", "streaming"],
+                   help="streaming = constant-memory binned metrics (overrides config).")
+    p.add_argument("--profile", action="store_true",
+                   help="Trace allocations and dump cProfile stats for the slowest stage (slower).")
     return p.parse_args()
 
-def main():
-    args = parse_args()
-    preds = pq.read_table(args.pred_path).to_pandas()
-    ytrue = pq.read_table(args.ytrue_path).to_pandas()["y_true"].values
+def evaluate_exact(args, eval_cfg, attributes):
+    import pyarrow.parquet as pq
+    from .capstone.metrics import classification_metrics
+    from .threshold import find_best_threshold
+    from .subgroup import subgroup_report
+    with span("read"):
+        preds = pq.read_table(args.pred_path).to_pandas()
+        ytrue = pq.read_table(args.ytrue_path).to_pandas()["y_true"].values
     y_pred = preds["y_pred"].values
     y_prob = preds["y_prob"].values if "y_prob" in preds.columns else None
 
-    metrics = classification_metrics(ytrue, y_pred, y_prob)
+    n_boot = eval_cfg.get("n_boot", 1000) if args.n_boot is None else args.n_boot
+    with span("metrics"):
+        metrics = classification_metrics(ytrue, y_pred, y_prob, n_boot=int(n_boot or 0),
+                                         n_jobs=eval_cfg.get("n_jobs", 1))
 
     # Threshold tuning (binary only)
     if y_prob is not None and len(set(ytrue))==2:
-        thr, score = find_best_threshold(ytrue, y_prob, metric="f1")
-        metrics["best_thr_f1"] = thr
-        metrics["best_f1"] = score
+        thr_metric = eval_cfg.get("threshold_metric", "f1")
+        with span("threshold"):
+            thr, score = find_best_threshold(ytrue, y_prob, metric=thr_metric)
+        metrics[f"best_thr_{thr_metric}"] = thr
+        metrics[f"best_{thr_metric}"] = score
+
+    with span("subgroups"):
+        report = subgroup_report(
+            preds, ytrue, y_pred, attributes, y_prob=y_prob,
+            intersections=eval_cfg.get("intersections", []) or [],
+            min_size=int(eval_cfg.get("min_group_size", 10)),
+            n_boot=int(eval_cfg.get("subgroup_n_boot", 0) or 0),
+        )
+    return metrics, report
+
+def evaluate_streaming(args, eval_cfg, attributes):
+    from .stream_metrics import evaluate_stream
+    with span("stream"):
+        ev = evaluate_stream(args.pred_path, args.ytrue_path, attributes,
+                             intersections=eval_cfg.get("intersections", []) or [],
+                             n_bins=int(eval_cfg.get("n_bins", 10_000)),
+                             batch_size=int(eval_cfg.get("batch_size", 1_000_000)))
+    metrics = ev.metrics()
+    metrics["mode"] = "streaming"
+    return metrics, ev.subgroups.result(min_size=int(eval_cfg.get("min_group_size", 10)))
 
-    # Optionally add subgroup metrics if meta cols present (e.g., gender)
-    subgroup_results = {}
-    if "gender" in preds.columns:
-        subgroup_results["gender"] = subgroup_metrics(preds, ytrue, y_pred, "gender")
+def _split_provenance(pred_path, meta):
+    """Fingerprint and sizes of the split.npz train wrote next to the
+    predictions, when the preds carry the same split fingerprint in their
+    metadata (None otherwise, e.g. streaming runs, which hash-split rows)."""
+    from .data import SPLIT_META_KEY, load_split
+    fp = (meta.schema_arrow.metadata or {}).get(SPLIT_META_KEY)
+    path = Path(pred_path).parent / "split.npz"
+    if fp is None or not path.exists():
+        return None
+    idx = load_split(path)
+    if idx["fingerprint"] != fp.decode():
+        raise ValueError(f"{pred_path} was written from split {fp.decode()} but {path} is split "
+                         f"{idx['fingerprint']}; predictions and split are from different runs.")
+    n_rows = meta.metadata.num_rows
+    if len(idx["test"]) != n_rows:
+        raise ValueError(f"{pred_path} has {n_rows} rows but {path} has {len(idx['test'])} test rows.")
+    return {"fingerprint": idx["fingerprint"], **{f"n_{k}": len(idx[k]) for k in ("train", "valid", "test")}}
 
-    out = {"metrics": metrics, "subgroups": subgroup_results}
-    save_json(out, args.report_path)
+def run_evaluate(pred_path, ytrue_path, report_path, eval_cfg: dict, n_boot=None, mode=None) -> dict:
+    """Evaluate saved predictions per the evaluate config section and write
+    {"metrics", "subgroups"} to report_path."""
+    import pyarrow.parquet as pq
+    from .subgroup import report_to_dict
+    args = argparse.Namespace(pred_path=pred_path, ytrue_path=ytrue_path, n_boot=n_boot)
+    meta = pq.ParquetFile(pred_path)
+    split = _split_provenance(pred_path, meta)  # fail on a stale split before the slow part
+    mode = mode or eval_cfg.get("mode", "auto")
+    if mode == "auto":
+        mode = "streaming" if meta.metadata.num_rows > int(eval_cfg.get("stream_rows", 5_000_000)) else "exact"
+
+    # Subgroup metrics for every attribute column train carried into preds
+    attributes = eval_cfg.get("subgroups") or [c for c in meta.schema_arrow.names
+                                               if c not in PRED_COLS and not c.startswith("__")]
+    run = evaluate_streaming if mode == "streaming" else evaluate_exact
+    metrics, report = run(args, eval_cfg, attributes)
+
+    out = {"metrics": metrics, "subgroups": report_to_dict(report)}
+    if split:
+        out["split"] = split
+    with span("write"):
+        save_json(out, report_path)
+    return out
+
+def main():
+    args = parse_args()
+    eval_cfg = load_config(args.config).get("evaluate", {}) or {}
+    with RunProfile(profile=args.profile) as prof:
+        run_evaluate(args.pred_path, args.ytrue_path, args.report_path, eval_cfg, args.n_boot, args.mode)
+    prof.write(Path(args.report_path).parent, "evaluate")
 
 if __name__ == "__main__":
     main()
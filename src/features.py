@@ -1,20 +1,83 @@
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.impute import SimpleImputer
+from sklearn.utils import murmurhash3_32
 
-def basic_preprocess(df: pd.DataFrame, numeric_strategy="median"):
-    num_cols = df.select_dtypes(include=[float, int, "number"]).columns.tolist()
-    cat_cols = [c for c in df.columns if c not in num_cols]
+def infer_column_types(df: pd.DataFrame = None, schema: dict = None):
+    """Split columns into (numeric, categorical) from dtypes alone.
+    Pass any frame with the right dtypes (a split, a sample, or df.head(0)),
+    or a {column: dtype} schema, so no data has to be concatenated or copied."""
+    if schema is None:
+        schema = dict(df.dtypes.items())
+    num_cols, cat_cols = [], []
+    for col, dtype in schema.items():
+        dtype = pd.api.types.pandas_dtype(dtype)
+        is_num = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        (num_cols if is_num else cat_cols).append(col)
+    return num_cols, cat_cols
+
+class HashingEncoder(BaseEstimator, TransformerMixin):
+    """Hash 'column=value' tokens into n_features columns (counts, CSR).
+
+    Stateless, so memory stays fixed no matter how many diag codes appear.
+    Each distinct value is hashed once and broadcast through categorical codes.
+    """
+    def __init__(self, n_features=2**20):
+        self.n_features = n_features
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def transform(self, X):
+        X = pd.DataFrame(X) if not isinstance(X, pd.DataFrame) else X
+        n, k = X.shape
+        cols = np.empty((n, k), dtype=np.int64)
+        for j in range(k):
+            cat = pd.Categorical(X.iloc[:, j].to_numpy(dtype=object))
+            hashed = np.array([murmurhash3_32(f"{j}={v}", positive=True) % self.n_features
+                               for v in cat.categories] + [-1], dtype=np.int64)
+            cols[:, j] = hashed[cat.codes]
+        keep = cols >= 0
+        indptr = np.r_[0, np.cumsum(keep.sum(axis=1))]
+        out = sparse.csr_matrix((np.ones(keep.sum()), cols[keep], indptr), shape=(n, self.n_features))
+        out.sum_duplicates()
+        return out
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"hash_{i}" for i in range(self.n_features)], dtype=object)
+
+def basic_preprocess(df: pd.DataFrame = None, numeric_strategy="median", encoding="onehot",
+                     min_frequency=None, max_categories=None, n_hash_features=2**20, schema=None):
+    """Impute+scale numeric columns and encode the rest.
+    - encoding='onehot': OneHotEncoder; min_frequency/max_categories fold rare
+      categories into one 'infrequent' column (unseen ones go there too)
+    - encoding='hashed': HashingEncoder with n_hash_features columns
+    - column types come from df's dtypes or an explicit schema (see infer_column_types)
+    """
+    num_cols, cat_cols = infer_column_types(df, schema)
 
     numeric = Pipeline([
         ('imputer', SimpleImputer(strategy=numeric_strategy)),
         ('scaler', StandardScaler())
     ])
+    if encoding == "onehot":
+        capped = min_frequency is not None or max_categories is not None
+        encoder = ('onehot', OneHotEncoder(
+            handle_unknown='infrequent_if_exist' if capped else 'ignore',
+            min_frequency=min_frequency, max_categories=max_categories))
+    elif encoding == "hashed":
+        encoder = ('hasher', HashingEncoder(n_features=n_hash_features))
+    else:
+        raise ValueError("encoding must be 'onehot' or 'hashed'")
     categoric = Pipeline([
         ('imputer', SimpleImputer(strategy='most_frequent')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+        encoder
     ])
     pre = ColumnTransformer(
         transformers=[('num', numeric, num_cols),
@@ -22,3 +85,162 @@ def basic_preprocess(df: pd.DataFrame, numeric_strategy="median"):
         remainder='drop'
     )
     return pre
+
+def design_matrix_report(Xt) -> dict:
+    """Shape, nnz and memory of a transformed design matrix."""
+    if sparse.issparse(Xt):
+        Xt = Xt.tocsr()
+        nbytes = Xt.data.nbytes + Xt.indices.nbytes + Xt.indptr.nbytes
+        nnz = int(Xt.nnz)
+    else:
+        nbytes, nnz = int(Xt.nbytes), int(np.count_nonzero(Xt))
+    n_rows, n_cols = Xt.shape
+    return {"rows": int(n_rows), "columns": int(n_cols), "nnz": nnz, "sparse": bool(sparse.issparse(Xt)),
+            "density": nnz / max(n_rows * n_cols, 1), "mb": nbytes / 2**20,
+            "bytes_per_row": nbytes / max(n_rows, 1)}
+
+# below this many rows a dict lookup beats pandas' vectorized get_indexer
+_SMALL_BATCH = 512
+
+class FrozenPreprocessor:
+    """A fitted basic_preprocess ColumnTransformer flattened to NumPy arrays.
+
+    Numeric columns: impute vector, then (x - mean) / scale.
+    Categorical columns: impute value, then category -> output column via a
+    per-column index; unknown categories produce no entry (handle_unknown='ignore').
+    transform() returns the same matrix as the sklearn transformer, built
+    directly as CSR with a few vectorized operations per call.
+    """
+    def __init__(self, pre: ColumnTransformer = None):
+        self.num_cols, self.cat_cols = [], []
+        self.num_fill = self.num_mean = self.num_scale = np.zeros(0)
+        self.cat_maps, self.cat_index, self.cat_lookup = [], [], []
+        self.cat_unknown, self.cat_fill, self.cat_offsets = [], [], []
+        self.n_cat_out = 0
+        for name, trans, cols in (pre.transformers_ if pre is not None else []):
+            if trans == "drop" or len(cols) == 0:
+                continue
+            steps = dict(trans.steps) if isinstance(trans, Pipeline) else {}
+            if name == "num" and set(steps) == {"imputer", "scaler"}:
+                self._freeze_numeric(list(cols), steps["imputer"], steps["scaler"])
+            elif name == "cat" and set(steps) == {"imputer", "onehot"}:
+                self._freeze_categorical(list(cols), steps["imputer"], steps["onehot"])
+            else:
+                raise NotImplementedError(f"Can't freeze transformer {name!r}: {trans!r}")
+        self.n_num = len(self.num_cols)
+        self.n_features = self.n_num + self.n_cat_out
+
+    def _freeze_numeric(self, cols, imputer, scaler):
+        stats = np.asarray(imputer.statistics_, dtype=float)
+        keep = ~np.isnan(stats)  # all-missing columns are dropped by the imputer
+        self.num_cols = [c for c, k in zip(cols, keep) if k]
+        self.num_fill = stats[keep]
+        self.num_mean = np.asarray(scaler.mean_ if scaler.with_mean else np.zeros(keep.sum()), dtype=float)
+        self.num_scale = np.asarray(scaler.scale_ if scaler.with_std else np.ones(keep.sum()), dtype=float)
+
+    def _freeze_categorical(self, cols, imputer, onehot):
+        if onehot.drop is not None or onehot.handle_unknown not in ("ignore", "infrequent_if_exist"):
+            raise NotImplementedError("Freezing supports one-hot encoding without drop/handle_unknown='error'.")
+        stats = imputer.statistics_
+        keep = ~pd.isna(stats)
+        infrequent = (onehot.infrequent_categories_ if getattr(onehot, "_infrequent_enabled", False)
+                      else [None] * len(onehot.categories_))
+        for col, fill, cats, infreq in zip([c for c, k in zip(cols, keep) if k], stats[keep],
+                                           onehot.categories_, infrequent):
+            rare = set(infreq) if infreq is not None else set()
+            self._add_categorical(col, fill, [c for c in cats if c not in rare], rare,
+                                  unknown_to_rare=onehot.handle_unknown == "infrequent_if_exist")
+
+    def _add_categorical(self, col, fill, frequent, rare=(), unknown_to_rare=False):
+        # sklearn's output order: frequent categories, then one infrequent column
+        mapping = {v: i for i, v in enumerate(frequent)}
+        n_out, unknown = len(frequent), -1
+        if rare:
+            mapping.update({v: n_out for v in rare})
+            if unknown_to_rare:
+                unknown = n_out
+            n_out += 1
+        self.cat_cols.append(col)
+        self.cat_maps.append(mapping)
+        self.cat_index.append(pd.Index(list(mapping), dtype=object))
+        self.cat_lookup.append(np.array(list(mapping.values()), dtype=np.int64))
+        self.cat_unknown.append(unknown)
+        self.cat_fill.append(mapping.get(fill, unknown))
+        self.cat_offsets.append(self.n_cat_out)
+        self.n_cat_out += n_out
+
+    @classmethod
+    def from_stats(cls, num_cols, num_fill, num_mean, num_scale, categories, unknown_to_rare=False):
+        """Build from precomputed statistics instead of a fitted transformer
+        (stream_train's one-pass fit). categories: {column: (fill, frequent,
+        rare)} in output order. Same matrix layout as basic_preprocess."""
+        self = cls()
+        self.num_cols = list(num_cols)
+        self.num_fill, self.num_mean, self.num_scale = (np.asarray(a, dtype=float)
+                                                        for a in (num_fill, num_mean, num_scale))
+        for col, (fill, frequent, rare) in categories.items():
+            self._add_categorical(col, fill, list(frequent), set(rare), unknown_to_rare)
+        self.n_num = len(self.num_cols)
+        self.n_features = self.n_num + self.n_cat_out
+        return self
+
+    def _cat_codes(self, s: pd.Series, j: int) -> np.ndarray:
+        mapping, fill_code, unknown = self.cat_maps[j], self.cat_fill[j], self.cat_unknown[j]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # look up each distinct category once, broadcast through the codes
+            lookup = np.array([mapping.get(v, unknown) for v in s.cat.categories] + [fill_code], dtype=np.int64)
+            return lookup[s.cat.codes.to_numpy()]
+        values = s.to_numpy(dtype=object)
+        missing = pd.isna(values)
+        if len(values) <= _SMALL_BATCH:
+            codes = np.fromiter((mapping.get(v, unknown) for v in values), dtype=np.int64, count=len(values))
+        else:
+            pos = self.cat_index[j].get_indexer(values)
+            codes = np.where(pos >= 0, self.cat_lookup[j][pos], unknown)
+        codes[missing] = fill_code
+        return codes
+
+    def transform(self, df: pd.DataFrame) -> sparse.csr_matrix:
+        n = len(df)
+        n_cat = len(self.cat_cols)
+        cols = np.empty((n, self.n_num + n_cat), dtype=np.int64)
+        data = np.ones((n, self.n_num + n_cat), dtype=float)
+        if self.n_num:
+            x = df[self.num_cols].to_numpy(dtype=float, na_value=np.nan)
+            x = np.where(np.isnan(x), self.num_fill, x)
+            data[:, :self.n_num] = (x - self.num_mean) / self.num_scale
+            cols[:, :self.n_num] = np.arange(self.n_num)
+        for j, col in enumerate(self.cat_cols):
+            codes = self._cat_codes(df[col], j)
+            cols[:, self.n_num + j] = np.where(codes >= 0, self.n_num + self.cat_offsets[j] + codes, -1)
+        keep = cols >= 0
+        indptr = np.r_[0, np.cumsum(keep.sum(axis=1))]
+        return sparse.csr_matrix((data[keep], cols[keep], indptr), shape=(n, self.n_features))
+
+class FrozenPipeline:
+    """predict_proba/predict for a (pre, clf) Pipeline using FrozenPreprocessor."""
+    def __init__(self, pipeline: Pipeline):
+        self.pre = FrozenPreprocessor(pipeline.named_steps["pre"])
+        self.clf = pipeline.named_steps["clf"]
+        self.classes_ = self.clf.classes_
+
+    @classmethod
+    def from_parts(cls, pre: FrozenPreprocessor, clf):
+        """Wrap an already frozen preprocessor and a fitted classifier."""
+        self = cls.__new__(cls)
+        self.pre, self.clf, self.classes_ = pre, clf, clf.classes_
+        return self
+
+    def predict_proba(self, X):
+        return self.clf.predict_proba(self.pre.transform(X))
+
+    def predict(self, X):
+        return self.clf.predict(self.pre.transform(X))
+
+def freeze_pipeline(pipeline):
+    """Return a FrozenPipeline when the pipeline's preprocessor can be
+    frozen, else the pipeline unchanged."""
+    try:
+        return FrozenPipeline(pipeline)
+    except (NotImplementedError, KeyError, AttributeError):
+        return pipeline
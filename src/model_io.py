@@ -0,0 +1,71 @@
+import hashlib, json, pickle, platform, time
+from pathlib import Path
+import pandas as pd
+import sklearn
+
+MODEL_FILE = "model.pkl"
+MANIFEST_FILE = "model_manifest.json"
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def save_model(pipeline, outdir, X_train: pd.DataFrame, kind: str, target: str = "target", extra=None) -> Path:
+    """Pickle a fitted pipeline next to a manifest describing its input schema."""
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    model_path = outdir / MODEL_FILE
+    with model_path.open("wb") as f:
+        pickle.dump(pipeline, f, protocol=pickle.HIGHEST_PROTOCOL)
+    manifest = {
+        "kind": kind,
+        "target": target,
+        "features": [{"name": c, "dtype": str(t)} for c, t in X_train.dtypes.items()],
+        "n_train": int(len(X_train)),
+        "sklearn_version": sklearn.__version__,
+        "pandas_version": pd.__version__,
+        "python_version": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sha256": _sha256(model_path),
+        **(extra or {}),
+    }
+    with (outdir / MANIFEST_FILE).open("w") as f:
+        json.dump(manifest, f, indent=2)
+    return model_path
+
+def load_model(model_dir):
+    """Load (pipeline, manifest) saved by save_model.
+    Only load artifacts you produced: pickle can run arbitrary code."""
+    model_dir = Path(model_dir)
+    manifest_path = model_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No {MANIFEST_FILE} in {model_dir}. Train with src.train first.")
+    manifest = json.loads(manifest_path.read_text())
+    model_path = model_dir / MODEL_FILE
+    if _sha256(model_path) != manifest["sha256"]:
+        raise ValueError(f"{model_path} does not match the checksum in {MANIFEST_FILE}.")
+    if manifest.get("sklearn_version") != sklearn.__version__:
+        print(f"⚠️ Model trained with scikit-learn {manifest.get('sklearn_version')}, running {sklearn.__version__}.")
+    with model_path.open("rb") as f:
+        pipeline = pickle.load(f)
+    return pipeline, manifest
+
+def align_features(df: pd.DataFrame, manifest: dict) -> pd.DataFrame:
+    """Select the manifest's feature columns in training order; columns the
+    input lacks are added as all-missing so the imputers handle them, and
+    columns that were numeric at training time are coerced to numbers
+    (JSON payloads often carry them as strings)."""
+    cols = [f["name"] for f in manifest["features"]]
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        df = df.assign(**{c: float("nan") for c in missing})
+    df = df[cols]
+    numeric = [f["name"] for f in manifest["features"]
+               if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(f["dtype"]))
+               and not pd.api.types.is_numeric_dtype(df[f["name"]].dtype)]
+    if numeric:
+        df = df.assign(**{c: pd.to_numeric(df[c], errors="coerce") for c in numeric})
+    return df
@@ -0,0 +1,331 @@
+"""
+Content-addressed stage runner for the load -> train -> evaluate -> plot chain.
+
+Stages form a DAG: load -> {leakage, split} -> fit -> predict -> evaluate -> plot.
+A stage's fingerprint hashes its code (the stage function and every function,
+class, constant or module of this package it reaches through names and
+relative imports), the config sections it reads and the content hashes of
+the upstream outputs it consumes (the raw CSV for load).
+Outputs live in <cache>/<stage>/<fingerprint>/, and a stage whose
+fingerprint already has a complete entry is skipped: changing
+evaluate.threshold_metric reruns evaluate and plot, not the fit, and a
+leakage setting that leaves the applied drops unchanged stops at leakage.
+Stages whose inputs are ready run concurrently (leakage and split do).
+The published artifacts are copied into --output_dir under the names
+src.train / src.evaluate use.
+
+Run with: python -m src.pipeline --csv_path data/raw/diabetes.csv --output_dir output
+"""
+import argparse, ast, hashlib, importlib.util, inspect, json, os, shutil, sys, textwrap, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from .utils import save_json, load_config
+
+STAGE_FILE = "_stage.json"
+
+class Stage:
+    """One node of the DAG. fn(ctx, inputs, out) reads its dependencies'
+    directories from inputs[name] and writes `outputs` into out."""
+    def __init__(self, name, fn, deps=(), outputs=(), config=(), code=(), publish=None):
+        self.name, self.fn, self.deps = name, fn, tuple(deps)
+        self.outputs = tuple(outputs)
+        self.config = tuple(config)    # "section" or "section.key" entries hashed into the fingerprint
+        self.code = tuple(code)        # extra "module" or "module:attr" (relative to src) to hash; see _code_refs
+        self.publish = self.outputs if publish is None else tuple(publish)
+
+def _read_frame(stage_dir):
+    import pandas as pd
+    return pd.read_parquet(Path(stage_dir) / "frame.parquet")
+
+def _write_frame(df, out):
+    import pyarrow as pa, pyarrow.parquet as pq
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), Path(out) / "frame.parquet")
+
+def _split_parts(ctx, inputs, names):
+    from .data import load_split, split_xy
+    df = _read_frame(inputs["leakage"])
+    idx = load_split(Path(inputs["split"]) / "split.npz")
+    return {k: split_xy(df, idx[k], ctx["target"]) for k in names}
+
+def stage_load(ctx, inputs, out):
+    from .train import load_frame
+    df, ctx["target"] = load_frame(ctx["csv_path"], ctx["kind"], ctx["cfg"])
+    _write_frame(df, out)
+
+def stage_leakage(ctx, inputs, out):
+    from .train import screen_leakage
+    _write_frame(screen_leakage(_read_frame(inputs["load"]), ctx["target"], ctx["cfg"], Path(out)), out)
+
+def stage_split(ctx, inputs, out):
+    # row positions only: the stratified split depends on the target, not on
+    # which feature columns leakage screening keeps
+    import pandas as pd
+    from .data import save_split, split_fingerprint, split_indices
+    y = pd.read_parquet(Path(inputs["load"]) / "frame.parquet", columns=[ctx["target"]])[ctx["target"]].to_numpy()
+    train_cfg = ctx["cfg"].get("train", {}) or {}
+    params = (int(train_cfg.get("seed", 42)), float(train_cfg.get("valid_size", 0.2)),
+              float(train_cfg.get("test_size", 0.2)))
+    save_split(split_indices(y, *params), Path(out) / "split.npz", split_fingerprint(y, *params))
+
+def stage_fit(ctx, inputs, out):
+    from .train import fit_pipeline
+    from .model_io import save_model
+    X_train, y_train = _split_parts(ctx, inputs, ["train"])["train"]
+    pipeline, cv_scores = fit_pipeline(X_train, y_train, ctx["cfg"])
+    save_json(cv_scores, Path(out) / "cv_scores.json")
+    save_model(pipeline, out, X_train, kind=ctx["kind"], target=ctx["target"])
+
+def stage_predict(ctx, inputs, out):
+    from .train import write_predictions
+    from .model_io import load_model
+    from .data import load_split
+    X_test, y_test = _split_parts(ctx, inputs, ["test"])["test"]
+    idx = load_split(Path(inputs["split"]) / "split.npz")
+    pipeline, _ = load_model(inputs["fit"])
+    write_predictions(pipeline, X_test, y_test, len(idx["train"]), ctx["cfg"], Path(out), idx["fingerprint"])
+
+def stage_evaluate(ctx, inputs, out):
+    from .evaluate import run_evaluate
+    pred = Path(inputs["predict"])
+    run_evaluate(pred / "preds.parquet", pred / "y_true.parquet", Path(out) / "metrics.json",
+                 ctx["cfg"].get("evaluate", {}) or {})
+
+def stage_plot(ctx, inputs, out):
+    import matplotlib
+    matplotlib.use("Agg")
+    from .utils import _plot_metrics
+    metrics = json.loads((Path(inputs["evaluate"]) / "metrics.json").read_text())
+    _plot_metrics(metrics, Path(out) / "baseline_metrics.png")
+
+STAGES = [
+    Stage("load", stage_load, outputs=["frame.parquet"], publish=[],
+          config=["dataset", "data"]),
+    Stage("leakage", stage_leakage, deps=["load"],
+          outputs=["frame.parquet", "leakage_report.json", "column_drop_report.json"],
+          publish=["leakage_report.json", "column_drop_report.json"],
+          config=["leakage", "columns"]),
+    Stage("split", stage_split, deps=["load"], outputs=["split.npz"], publish=[],
+          config=["train.seed", "train.valid_size", "train.test_size"]),
+    Stage("fit", stage_fit, deps=["leakage", "split"],
+          outputs=["model.pkl", "model_manifest.json", "cv_scores.json"],
+          config=["features", "train"]),
+    Stage("predict", stage_predict, deps=["fit", "leakage", "split"],
+          outputs=["preds.parquet", "y_true.parquet", "design_matrix.json"],
+          config=["features.encoding", "evaluate.subgroups"]),
+    Stage("evaluate", stage_evaluate, deps=["predict"], outputs=["metrics.json"],
+          config=["evaluate"]),
+    Stage("plot", stage_plot, deps=["evaluate"], outputs=["baseline_metrics.png"]),
+]
+
+def _file_hash(path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+_PARSED = {}  # (file, mtime, size) -> parsed module; shared by the stage threads
+
+def _module(name: str) -> dict:
+    """Source, lines, AST, top-level names and relative imports of a module,
+    read from the file rather than imported, so fingerprinting a cached run
+    doesn't load sklearn. Re-parsed only when the file changes."""
+    spec = importlib.util.find_spec(name)
+    st = os.stat(spec.origin)
+    key = (spec.origin, st.st_mtime_ns, st.st_size)
+    if key not in _PARSED:
+        text = Path(spec.origin).read_text()
+        tree = ast.parse(text)
+        defs, imports = {}, {}
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                defs[node.name] = node
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for n in (n for t in targets for n in ast.walk(t)):
+                    if isinstance(n, ast.Name):
+                        defs[n.id] = node
+            elif isinstance(node, ast.ImportFrom) and node.level:
+                for ref, alias in _import_refs(node, spec):
+                    imports[alias] = ref
+        _PARSED[key] = {"text": text, "lines": text.splitlines(keepends=True), "tree": tree,
+                        "spec": spec, "defs": defs, "imports": imports}
+    return _PARSED[key]
+
+def _segment(info, node) -> str:
+    """Source lines of a top-level node, decorators included."""
+    start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    return "".join(info["lines"][start - 1:node.end_lineno])
+
+def _import_refs(node, spec):
+    """(module, attr) per name of a relative `from ... import`; attr is None
+    when the name is itself a submodule."""
+    package = spec.name if spec.submodule_search_locations else spec.parent
+    base = importlib.util.resolve_name("." * node.level + (node.module or ""), package)
+    dirs = importlib.util.find_spec(base).submodule_search_locations or []
+    for alias in node.names:
+        is_mod = any((Path(d) / f"{alias.name}.py").exists() or (Path(d) / alias.name / "__init__.py").exists()
+                     for d in dirs)
+        ref = (f"{base}.{alias.name}", None) if is_mod else (base, alias.name)
+        yield ref, alias.asname or alias.name
+
+def _references(node, module: str) -> set:
+    """Package code `node` (in `module`) reaches directly: helpers and
+    constants of its own module, and what its relative imports name."""
+    info = _module(module)
+    refs = set()
+    for n in ast.walk(node):
+        if isinstance(n, ast.ImportFrom) and n.level:
+            refs.update(ref for ref, _ in _import_refs(n, info["spec"]))
+        elif isinstance(n, ast.Name):
+            if n.id in info["imports"]:
+                refs.add(info["imports"][n.id])
+            elif n.id in info["defs"] and info["defs"][n.id] is not node:
+                refs.add((module, n.id))
+    return refs
+
+def _code_refs(stage) -> dict:
+    """Source of everything a stage can run inside this package: the
+    closure of _references from stage.fn, plus any explicit stage.code
+    ("module" or "module:attr", relative to src). Keyed "module:attr"."""
+    mod, name = stage.fn.__module__, stage.fn.__name__
+    spec = sys.modules[mod].__spec__ if mod in sys.modules else None
+    if spec is None:  # defined in __main__ or a script: no file to walk
+        return {f"{mod}:{name}": textwrap.dedent(inspect.getsource(stage.fn))}
+    seen, todo = {}, set()
+    if name in _module(mod)["defs"]:
+        todo.add((mod, name))
+    else:  # a lambda or nested function: hash its own source, then follow it
+        src = textwrap.dedent(inspect.getsource(stage.fn))
+        seen[(mod, f"<{name}>")] = src
+        try:
+            todo = _references(ast.parse(src), mod)
+        except SyntaxError:  # a lambda's lines can be part of a larger expression
+            pass
+    for ref in stage.code:
+        m, _, attr = ref.partition(":")
+        todo.add((importlib.util.resolve_name(m, __package__), attr or None))
+    while todo:
+        mod, attr = todo.pop()
+        if (mod, attr) in seen:
+            continue
+        info = _module(mod)
+        if attr is None:
+            node, seen[(mod, attr)] = info["tree"], info["text"]
+        elif attr in info["defs"]:
+            node = info["defs"][attr]
+            seen[(mod, attr)] = _segment(info, node)
+        elif attr in info["imports"]:  # re-exported name: follow it to its module
+            seen[(mod, attr)] = ""
+            todo.add(info["imports"][attr])
+            continue
+        else:
+            raise ValueError(f"{attr} not found in {mod}")
+        todo.update(_references(node, mod) - set(seen))
+    return {f"{m}:{a or ''}": src for (m, a), src in seen.items()}
+
+def _code_hash(stage) -> str:
+    h = hashlib.sha256()
+    for ref, src in sorted(_code_refs(stage).items()):
+        h.update(ref.encode())
+        h.update(src.encode())
+    return h.hexdigest()[:16]
+
+def _config_slice(cfg, entries) -> dict:
+    out = {}
+    for entry in entries:
+        section, _, key = entry.partition(".")
+        value = cfg.get(section, {}) or {}
+        out[entry] = value.get(key) if key else value
+    return out
+
+def fingerprint(stage, ctx, upstream) -> str:
+    """sha256 over code, config slice and upstream output hashes."""
+    payload = {"stage": stage.name, "code": _code_hash(stage),
+               "config": _config_slice(ctx["cfg"], stage.config),
+               "inputs": {d: upstream[d]["outputs"] for d in stage.deps}}
+    if not stage.deps:  # roots read the raw data
+        from .preset_cache import cache_dir, source_hash
+        payload["data"] = {"csv": source_hash(ctx["csv_path"], cache_dir()), "kind": ctx["kind"]}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+def _run_stage(stage, ctx, upstream, cache_root: Path, force: bool) -> dict:
+    t0 = time.perf_counter()
+    fp = fingerprint(stage, ctx, upstream)
+    final = cache_root / stage.name / fp
+    if (final / STAGE_FILE).exists() and not force:
+        rec = json.loads((final / STAGE_FILE).read_text())
+        return {**rec, "dir": str(final), "status": "cached", "seconds": round(time.perf_counter() - t0, 3)}
+    tmp = final.with_name(f"{fp}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    stage.fn(ctx, {d: upstream[d]["dir"] for d in stage.deps}, tmp)
+    rec = {"stage": stage.name, "fingerprint": fp,
+           "outputs": {name: _file_hash(tmp / name) for name in stage.outputs}}
+    save_json(rec, tmp / STAGE_FILE)  # written last: marks the entry complete
+    shutil.rmtree(final, ignore_errors=True)
+    tmp.rename(final)
+    return {**rec, "dir": str(final), "status": "ran", "seconds": round(time.perf_counter() - t0, 3)}
+
+def run_pipeline(csv_path, cfg: dict, cache_root, kind=None, stages=STAGES, n_jobs=2, force=()) -> dict:
+    """Run (or reuse) every stage; returns {stage: record} with the stage
+    directory, fingerprint, output hashes and cached/ran status."""
+    ctx = {"csv_path": str(csv_path), "cfg": cfg, "target": "target",
+           "kind": kind or cfg.get("dataset", {}).get("kind", "uci_hospitals")}
+    cache_root = Path(cache_root)
+    done, running = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, n_jobs)) as pool:
+        while len(done) < len(stages):
+            for s in stages:
+                if s.name not in done and s.name not in running and all(d in done for d in s.deps):
+                    running[s.name] = pool.submit(_run_stage, s, ctx, done, cache_root,
+                                                  s.name in force or "all" in force)
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name, fut in list(running.items()):
+                if fut in finished:
+                    done[name] = fut.result()  # re-raises a failed stage
+                    del running[name]
+                    rec = done[name]
+                    icon = "♻️" if rec["status"] == "cached" else "✅"
+                    print(f"{icon} {name:<9} {rec['status']:<6} {rec['seconds']:>8.2f}s  {rec['fingerprint']}")
+    return {s.name: done[s.name] for s in stages}
+
+def publish(records: dict, output_dir, stages=STAGES) -> Path:
+    """Copy each stage's published files into output_dir."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for s in stages:
+        for name in s.publish:
+            shutil.copyfile(Path(records[s.name]["dir"]) / name, output_dir / name)
+    save_json({k: {f: v[f] for f in ("fingerprint", "status", "seconds", "dir")} for k, v in records.items()},
+              output_dir / "pipeline_run.json")
+    return output_dir
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv_path", type=str, required=True, help="Path to input CSV.")
+    p.add_argument("--kind", type=str, default=None, choices=["uci_hospitals","pima"], help="Dataset kind (overrides config).")
+    p.add_argument("--output_dir", type=str, default="output", help="Where published artifacts are copied.")
+    p.add_argument("--config", type=str, default="config.yaml", help="Path to YAML config.")
+    p.add_argument("--cache_dir", type=str, default=None, help="Stage cache (default data/cache/stages).")
+    p.add_argument("--n_jobs", type=int, default=2, help="Stages run concurrently when their inputs are ready.")
+    p.add_argument("--force", nargs="*", default=[], help="Stage names to rerun even if cached ('all' for every stage).")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    cfg = load_config(args.config)
+    if args.cache_dir:
+        cache_root = Path(args.cache_dir)
+    else:
+        from .preset_cache import cache_dir
+        cache_root = cache_dir() / "stages"
+    t0 = time.perf_counter()
+    records = run_pipeline(args.csv_path, cfg, cache_root, kind=args.kind, n_jobs=args.n_jobs, force=set(args.force))
+    out = publish(records, args.output_dir)
+    n_ran = sum(r["status"] == "ran" for r in records.values())
+    print(f"✅ {n_ran}/{len(records)} stages ran in {time.perf_counter() - t0:.1f}s; artifacts in {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Batch scoring of CSV/Parquet inputs with a model saved by src.train.
+
+Reads the input as pyarrow record batches, applies the same presets
+cleaning the model was trained with, and appends each scored batch to a
+Parquet file, so memory stays bounded by --batch_size.
+
+Run with:
+    python -m src.predict --model_dir output --input data/raw/feed.csv --output output/scores.parquet
+"""
+from __future__ import annotations
+import argparse, json, time
+from pathlib import Path
+
+from .utils import save_json
+
+DEFAULT_ID_COLS = ["encounter_id", "patient_nbr"]
+
+_ARROW_TYPES = {
+    "category": "string", "string": "string",
+    "Int8": "int8", "Int16": "int16", "Int32": "int32", "Int64": "int64",
+    "float32": "float32", "float64": "float64",
+}
+
+def _arrow_schema(kind: str) -> dict:
+    import pyarrow as pa
+    from .presets import SCHEMAS
+    return {c: getattr(pa, _ARROW_TYPES[t])() for c, t in SCHEMAS[kind].items()}
+
+def _rebatch(batches, batch_size: int):
+    """Re-slice a stream of record batches into batch_size-row tables."""
+    import pyarrow as pa
+    buf, n_buf = [], 0
+    for batch in batches:
+        buf.append(batch); n_buf += batch.num_rows
+        if n_buf >= batch_size:
+            table = pa.Table.from_batches(buf)
+            n_full = (n_buf // batch_size) * batch_size
+            for start in range(0, n_full, batch_size):
+                yield table.slice(start, batch_size)
+            rest = table.slice(n_full)
+            buf, n_buf = rest.to_batches(), rest.num_rows
+    if n_buf:
+        yield pa.Table.from_batches(buf)
+
+def _null_na_strings(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """Treat NA_VALUES strings in Parquet input as null, matching how the
+    training CSV was read."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from .presets import NA_VALUES
+    na = pa.array(NA_VALUES)
+    cols = []
+    for col in batch.columns:
+        if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+            col = pc.if_else(pc.is_in(col, value_set=na), pa.scalar(None, col.type), col)
+        cols.append(col)
+    return pa.RecordBatch.from_arrays(cols, names=batch.schema.names)
+
+def iter_input_batches(path, kind: str, batch_size: int = 100_000):
+    """Yield raw input tables of at most batch_size rows from CSV or Parquet."""
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    from .presets import NA_VALUES
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Input not found at {path}.")
+    if path.suffix.lower() in (".parquet", ".pq"):
+        batches = (_null_na_strings(b) for b in pq.ParquetFile(path).iter_batches(batch_size=batch_size))
+    elif path.suffix.lower() == ".csv":
+        convert = pacsv.ConvertOptions(column_types=_arrow_schema(kind), null_values=NA_VALUES,
+                                       strings_can_be_null=True)
+        batches = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=1 << 24),
+                                 convert_options=convert)
+    else:
+        raise ValueError("Input must be .csv or .parquet")
+    yield from _rebatch(batches, batch_size)
+
+def score_table(pipeline, manifest, table: pa.Table, id_cols=(), threshold=0.5) -> pa.Table:
+    import numpy as np
+    import pyarrow as pa
+    from .model_io import align_features
+    from .presets import _clean
+    raw = table.to_pandas()
+    ids = {c: raw[c].to_numpy() for c in id_cols if c in raw.columns}
+    X = align_features(_clean(raw, manifest["kind"], require_target=False), manifest)
+    y_prob = pipeline.predict_proba(X)[:, 1]
+    return pa.table({**ids, "y_prob": y_prob, "y_pred": (y_prob >= threshold).astype(np.int8)})
+
+def predict_file(model_dir, input_path, output_path, batch_size=100_000, id_cols=None,
+                 threshold=0.5, verbose=True) -> dict:
+    """Score input_path batch by batch into output_path; returns run stats."""
+    import pyarrow.parquet as pq
+    from .features import freeze_pipeline
+    from .model_io import load_model
+    pipeline, manifest = load_model(model_dir)
+    pipeline = freeze_pipeline(pipeline)
+    id_cols = DEFAULT_ID_COLS if id_cols is None else id_cols
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    stats = {"batches": [], "rows": 0}
+    writer = None
+    t_start = time.perf_counter()
+    try:
+        for i, table in enumerate(iter_input_batches(input_path, manifest["kind"], batch_size)):
+            t0 = time.perf_counter()
+            scored = score_table(pipeline, manifest, table, id_cols, threshold)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, scored.schema)
+            writer.write_table(scored.cast(writer.schema))
+            secs = time.perf_counter() - t0
+            rec = {"batch": i, "rows": scored.num_rows, "seconds": round(secs, 4),
+                   "rows_per_s": round(scored.num_rows / secs, 1) if secs > 0 else None}
+            stats["batches"].append(rec)
+            stats["rows"] += scored.num_rows
+            if verbose:
+                print(json.dumps(rec))
+    finally:
+        if writer is not None:
+            writer.close()
+    wall = time.perf_counter() - t_start
+    stats.update({"wall_s": round(wall, 3), "rows_per_s": round(stats["rows"] / wall, 1) if wall > 0 else None})
+    return stats
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--model_dir", type=str, required=True, help="Directory with model.pkl + model_manifest.json.")
+    p.add_argument("--input", type=str, required=True, help="CSV or Parquet file to score.")
+    p.add_argument("--output", type=str, required=True, help="Parquet file to write.")
+    p.add_argument("--batch_size", type=int, default=100_000)
+    p.add_argument("--threshold", type=float, default=0.5, help="Cut for y_pred.")
+    p.add_argument("--id_cols", nargs="*", default=None, help="Input columns passed through to the output.")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    stats = predict_file(args.model_dir, args.input, args.output, args.batch_size,
+                         args.id_cols, args.threshold)
+    save_json(stats, Path(args.output).with_suffix(".stats.json"))
+    print(f"✅ Scored {stats['rows']:,} rows at {stats['rows_per_s']:,} rows/s -> {args.output}")
+
+if __name__ == "__main__":
+    main()
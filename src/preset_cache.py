@@ -0,0 +1,145 @@
+"""
+Parquet cache of cleaned datasets for presets.load_dataset.
+
+Entries are keyed by the CSV's content hash, the dataset kind and a
+fingerprint of the presets module source, so editing any cleaning helper,
+mapping or schema invalidates old entries automatically.
+
+CLI:
+    python -m src.preset_cache list
+    python -m src.preset_cache clear
+    python -m src.preset_cache evict --max_mb 2048 --max_age_days 30
+"""
+from __future__ import annotations
+import argparse, hashlib, inspect, json, os, threading, time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "cache"
+_HASH_INDEX = "source_hashes.json"
+
+def cache_dir(path=None) -> Path:
+    p = Path(path or os.environ.get("DIABETES_CACHE_DIR", DEFAULT_CACHE_DIR))
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+def _load_index(cdir: Path) -> dict:
+    try:
+        return json.loads((cdir / _HASH_INDEX).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def source_hash(csv_path, cdir: Path) -> str:
+    """SHA-256 of the file contents, memoized on (path, size, mtime) so an
+    unchanged multi-GB CSV is not re-read on every run."""
+    path = Path(csv_path).resolve()
+    st = path.stat()
+    stamp = f"{st.st_size}:{st.st_mtime_ns}"
+    index = _load_index(cdir)
+    hit = index.get(str(path))
+    if hit and hit["stamp"] == stamp:
+        return hit["sha256"]
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    index[str(path)] = {"stamp": stamp, "sha256": h.hexdigest()}
+    # write-then-rename so a concurrent or interrupted run never leaves a
+    # truncated index behind (per-process tmp name: writers don't collide)
+    tmp = cdir / f"{_HASH_INDEX}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(json.dumps(index, indent=2))
+    tmp.replace(cdir / _HASH_INDEX)
+    return h.hexdigest()
+
+def cleaning_fingerprint() -> str:
+    """Short hash of the whole presets module source: the cleaning helpers,
+    category maps, NA markers and schemas all live there, and listing them
+    one by one goes stale as soon as a new helper is added."""
+    from . import presets
+    return hashlib.sha256(inspect.getsource(presets).encode()).hexdigest()[:12]
+
+def entry_path(csv_path, kind: str, cdir: Path) -> Path:
+    key = f"{kind}-{source_hash(csv_path, cdir)[:16]}-{cleaning_fingerprint()}"
+    return cdir / f"{key}.parquet"
+
+def read_cached(csv_path, kind: str, path=None):
+    """Return the cached cleaned frame, or None on a miss."""
+    cdir = cache_dir(path)
+    entry = entry_path(csv_path, kind, cdir)
+    if not entry.exists():
+        return None
+    import pyarrow.parquet as pq
+    table = pq.read_table(entry, memory_map=True)
+    os.utime(entry)  # mtime doubles as last-used time for eviction
+    return table.to_pandas()
+
+def write_cached(df: pd.DataFrame, csv_path, kind: str, path=None) -> Path:
+    """Write a cleaned frame; categoricals are stored dictionary-encoded."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    cdir = cache_dir(path)
+    entry = entry_path(csv_path, kind, cdir)
+    tmp = entry.with_suffix(".tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    tmp.replace(entry)
+    return entry
+
+def list_entries(path=None):
+    import pyarrow.parquet as pq
+    cdir = cache_dir(path)
+    out = []
+    for p in sorted(cdir.glob("*.parquet")):
+        st = p.stat()
+        out.append({"file": p.name, "mb": round(st.st_size / 2**20, 2),
+                    "age_days": round((time.time() - st.st_mtime) / 86400, 2),
+                    "rows": pq.ParquetFile(p).metadata.num_rows})
+    return out
+
+def evict(max_mb=None, max_age_days=None, path=None):
+    """Drop entries unused for max_age_days, then least recently used ones
+    until the cache fits in max_mb. Returns the removed file names."""
+    cdir = cache_dir(path)
+    entries = sorted(cdir.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+    removed = []
+    if max_age_days is not None:
+        cutoff = time.time() - max_age_days * 86400
+        for p in [p for p in entries if p.stat().st_mtime < cutoff]:
+            p.unlink(); removed.append(p.name); entries.remove(p)
+    if max_mb is not None:
+        total = sum(p.stat().st_size for p in entries)
+        while entries and total > max_mb * 2**20:
+            p = entries.pop(0)
+            total -= p.stat().st_size
+            p.unlink(); removed.append(p.name)
+    return removed
+
+def clear(path=None):
+    cdir = cache_dir(path)
+    removed = [p.name for p in cdir.glob("*.parquet")]
+    for p in cdir.glob("*.parquet"):
+        p.unlink()
+    (cdir / _HASH_INDEX).unlink(missing_ok=True)
+    return removed
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Inspect or clear the cleaned-dataset cache.")
+    p.add_argument("command", choices=["list", "clear", "evict"])
+    p.add_argument("--cache_dir", type=str, default=None)
+    p.add_argument("--max_mb", type=float, default=None)
+    p.add_argument("--max_age_days", type=float, default=None)
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "list":
+        entries = list_entries(args.cache_dir)
+        for e in entries:
+            print(f"{e['file']}  {e['mb']:>9.2f} MB  {e['rows']:>10,} rows  {e['age_days']:>6.1f} d")
+        print(f"{len(entries)} entries in {cache_dir(args.cache_dir)}")
+    elif args.command == "clear":
+        print(f"Removed {len(clear(args.cache_dir))} entries.")
+    else:
+        removed = evict(args.max_mb, args.max_age_days, args.cache_dir)
+        print(f"Evicted {len(removed)} entries.")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import re
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -10,38 +11,115 @@ UCI_DROP_COLS = [
     "weight","payer_code","medical_specialty",
 ]
 
+UCI_MED_COLS = [
+    "metformin","repaglinide","nateglinide","chlorpropamide","glimepiride",
+    "acetohexamide","glipizide","glyburide","tolbutamide","pioglitazone",
+    "rosiglitazone","acarbose","miglitol","troglitazone","tolazamide",
+    "examide","citoglipton","insulin","glyburide-metformin",
+    "glipizide-metformin","glimepiride-pioglitazone",
+    "metformin-rosiglitazone","metformin-pioglitazone",
+]
+
+# Explicit read dtypes for the streaming path. Columns missing from a file are
+# ignored by read_csv, so one schema covers trimmed extracts too.
+UCI_SCHEMA = {
+    "encounter_id": "Int64", "patient_nbr": "Int64",
+    "race": "category", "gender": "category", "age": "category",
+    "weight": "category", "payer_code": "category", "medical_specialty": "category",
+    "admission_type_id": "Int8", "discharge_disposition_id": "Int8",
+    "admission_source_id": "Int8", "time_in_hospital": "Int8",
+    "num_lab_procedures": "Int16", "num_procedures": "Int8",
+    "num_medications": "Int16", "number_outpatient": "Int16",
+    "number_emergency": "Int16", "number_inpatient": "Int16",
+    "diag_1": "category", "diag_2": "category", "diag_3": "category",
+    "number_diagnoses": "Int8",
+    "max_glu_serum": "category", "A1Cresult": "category",
+    **{c: "category" for c in UCI_MED_COLS},
+    "change": "category", "diabetesMed": "category", "readmitted": "category",
+}
+
+PIMA_SCHEMA = {
+    "Pregnancies": "Int8", "Glucose": "Int16", "BloodPressure": "Int16",
+    "SkinThickness": "Int16", "Insulin": "Int16", "BMI": "float32",
+    "DiabetesPedigreeFunction": "float32", "Age": "Int8", "Outcome": "Int8",
+}
+
+SCHEMAS = {"uci_hospitals": UCI_SCHEMA, "pima": PIMA_SCHEMA}
+
+# pandas' default NA strings (what read_csv turns into NaN at training time)
+# plus UCI's '?'; scoring inputs that bypass read_csv are normalized with these
+NA_VALUES = ["", "?", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+             "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+A1C_GLU_ORDER = {"None":0, "Norm":1, ">7":2, ">8":3, ">200":2, ">300":3}
+_DIAG_PREFIX = re.compile(r"^(\d{3})")
+
+def _as_categorical(s: pd.Series) -> pd.Series:
+    return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+
+def _null_out(s: pd.Series, value) -> pd.Series:
+    """Set one sentinel value to NaN without a full-frame replace."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.remove_categories(value) if value in s.cat.categories else s
+    if s.dtype == object or pd.api.types.is_string_dtype(s.dtype):
+        hit = s.to_numpy() == value
+        return s.mask(hit) if hit.any() else s
+    return s
+
+def _map_categories(s: pd.Series, fn, as_category=False) -> pd.Series:
+    """Apply fn once per distinct value and broadcast via categorical codes.
+    Missing inputs (and fn results of NaN/None) come back as NaN."""
+    cat = _as_categorical(s)
+    codes = cat.cat.codes.to_numpy()
+    mapped = pd.Series([fn(v) for v in cat.cat.categories], dtype=object)
+    if as_category:
+        new_cats = pd.Index(mapped.dropna().unique())
+        lookup = np.append(new_cats.get_indexer(mapped), -1)  # code -1 -> -1
+        return pd.Series(pd.Categorical.from_codes(lookup[codes], new_cats), index=s.index, name=s.name)
+    lookup = np.append(mapped.to_numpy(dtype=float, na_value=np.nan), np.nan)
+    return pd.Series(lookup[codes], index=s.index, name=s.name)
+
+def _age_mid(v):
+    try:
+        lo, hi = str(v).strip("[]()").split("-")
+        return (int(lo)+int(hi))/2
+    except Exception:
+        return np.nan
+
+def _diag_prefix(v):
+    m = _DIAG_PREFIX.match(str(v))
+    return m.group(1) if m else None
+
 def _clean_uci(df: pd.DataFrame) -> pd.DataFrame:
-    # Replace '?' with NaN (UCI uses '?' for missing)
-    df = df.replace("?", np.nan)
     # Drop columns that are mostly missing or IDs
     drop_cols = [c for c in UCI_DROP_COLS if c in df.columns]
     if drop_cols:
         df = df.drop(columns=drop_cols)
+    else:
+        df = df.copy()
+    # Replace '?' with NaN (UCI uses '?' for missing)
+    for col in df.columns:
+        df[col] = _null_out(df[col], "?")
     # Normalize readmitted to binary (within 30 days)
     if "readmitted" in df.columns:
         df["target"] = (df["readmitted"] == "<30").astype(int)
     # Convert 'gender' to simple categories if present
     if "gender" in df.columns:
-        df["gender"] = df["gender"].replace({"Unknown/Invalid": np.nan})
+        df["gender"] = _null_out(df["gender"], "Unknown/Invalid")
+    # The mappings below run once per distinct value, not once per row
     # Map age ranges to midpoints (e.g., [60-70) -> 65)
-    if "age" in df.columns and df["age"].astype(str).str.startswith("[").any():
-        def to_mid(s):
-            try:
-                s = s.strip("[]()")
-                lo, hi = s.split("-")
-                return (int(lo)+int(hi))/2
-            except Exception:
-                return np.nan
-        df["age_mid"] = df["age"].astype(str).map(to_mid)
+    if "age" in df.columns:
+        age = _as_categorical(df["age"])
+        if any(str(v).startswith("[") for v in age.cat.categories):
+            df["age_mid"] = _map_categories(age, _age_mid)
     # Convert 'A1Cresult'/'max_glu_serum' to ordered categories
     for col in ["A1Cresult","max_glu_serum"]:
         if col in df.columns:
-            order = {"None":0, "Norm":1, ">7":2, ">8":3, ">200":2, ">300":3}
-            df[col] = df[col].map(order).astype("float")
+            df[col] = _map_categories(df[col], lambda v: A1C_GLU_ORDER.get(v, np.nan))
     # Collapse diagnosis codes to prefixes (e.g., 250.xx -> 250)
     for col in ["diag_1","diag_2","diag_3"]:
         if col in df.columns:
-            df[col] = df[col].astype(str).str.extract(r"^(\d{3})", expand=False)
+            df[col] = _map_categories(df[col], _diag_prefix, as_category=True)
     return df
 
 def _clean_pima(df: pd.DataFrame) -> pd.DataFrame:
@@ -55,24 +133,114 @@ def _clean_pima(df: pd.DataFrame) -> pd.DataFrame:
         df["target"] = df["Outcome"].astype(int)
     return df
 
-def load_dataset(csv_path: str, kind: str = "uci_hospitals") -> pd.DataFrame:
-    """Load and lightly clean a diabetes dataset.
-    - kind='uci_hospitals' for UCI 130-US hospitals (readmission task)
-    - kind='pima' for Pima Indians Diabetes
-    Returns a DataFrame with a unified 'target' column for modeling.
-    """
+def _check_path(csv_path) -> Path:
     path = Path(csv_path)
     if not path.exists():
         raise FileNotFoundError(f"CSV not found at {csv_path}. Put your data at ./data/raw/diabetes.csv or pass --csv_path.")
-    df = pd.read_csv(path)
+    return path
+
+def _clean(df: pd.DataFrame, kind: str, require_target: bool = True) -> pd.DataFrame:
+    # require_target=False is for scoring inputs, which carry no label
     if kind == "uci_hospitals":
         df = _clean_uci(df)
-        if "target" not in df.columns:
+        if require_target and "target" not in df.columns:
             raise ValueError("Could not derive 'target' from UCI dataset. Expect a 'readmitted' column.")
     elif kind == "pima":
         df = _clean_pima(df)
-        if "target" not in df.columns:
+        if require_target and "target" not in df.columns:
             raise ValueError("Pima dataset missing 'Outcome' to derive 'target'.")
     else:
         raise ValueError("Unknown kind. Use 'uci_hospitals' or 'pima'.")
     return df
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    # strings left over from cleaning (e.g. diag prefixes) are low-cardinality
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = df[col].astype("category")
+    return df
+
+def _concat_chunks(chunks) -> pd.DataFrame:
+    """Concatenate cleaned chunks, unioning per-chunk categories so
+    categorical columns stay categorical instead of falling back to object."""
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+    cat_cols = [c for c in chunks[0].columns if isinstance(chunks[0][c].dtype, pd.CategoricalDtype)]
+    for col in cat_cols:
+        categories = chunks[0][col].cat.categories
+        for ch in chunks[1:]:
+            categories = categories.union(ch[col].cat.categories)
+        for ch in chunks:
+            ch[col] = ch[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+def _raw_chunks(path: Path, parse_dtypes: dict, chunksize: int):
+    """Raw chunks from CSV or Parquet, typed per parse_dtypes. Parquet strings
+    in NA_VALUES become missing, as read_csv's defaults make them for CSV."""
+    if path.suffix.lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            text = [c for c in chunk.columns if chunk[c].dtype == object or pd.api.types.is_string_dtype(chunk[c].dtype)]
+            for c in text:
+                chunk[c] = chunk[c].where(~chunk[c].isin(NA_VALUES))
+            yield chunk.astype({c: t for c, t in parse_dtypes.items() if c in chunk.columns})
+        return
+    with pd.read_csv(path, dtype=parse_dtypes, na_values=["?"], chunksize=chunksize) as reader:
+        yield from reader
+
+def iter_dataset(csv_path: str, kind: str = "uci_hospitals", chunksize: int = 100_000,
+                 keep_cols=()):
+    """Yield cleaned, compactly typed chunks of a diabetes dataset.
+    Reads CSV or Parquet with the per-dataset dtype schema and '?' as missing,
+    so peak memory is bounded by chunksize rather than file size.
+    keep_cols: raw columns to carry through even if cleaning drops them
+    (e.g. encounter_id/patient_nbr for keyed storage).
+    """
+    if kind not in SCHEMAS:
+        raise ValueError("Unknown kind. Use 'uci_hospitals' or 'pima'.")
+    path = _check_path(csv_path)
+    schema = SCHEMAS[kind]
+    # The C parser is several times slower on nullable ints than on floats, so
+    # parse them as float64 (exact for these ranges) and cast per chunk.
+    int_cols = {c: t for c, t in schema.items() if t.startswith("Int")}
+    parse_dtypes = {c: ("float64" if c in int_cols else t) for c, t in schema.items()}
+    for chunk in _raw_chunks(path, parse_dtypes, chunksize):
+        chunk = chunk.astype({c: t for c, t in int_cols.items() if c in chunk.columns})
+        cleaned = _compact(_clean(chunk, kind))
+        for col in keep_cols:
+            if col in chunk.columns and col not in cleaned.columns:
+                cleaned[col] = chunk[col]
+        yield cleaned
+
+def load_dataset(csv_path: str, kind: str = "uci_hospitals", chunksize: int | None = None,
+                 cache: bool = False, cache_dir=None) -> pd.DataFrame:
+    """Load and lightly clean a diabetes dataset.
+    - kind='uci_hospitals' for UCI 130-US hospitals (readmission task)
+    - kind='pima' for Pima Indians Diabetes
+    - chunksize: if set, stream the file through iter_dataset and concatenate
+      the compact chunks (typed schema, categoricals) instead of one eager read
+    - cache: reuse the cleaned frame from the Parquet cache (see preset_cache)
+      when the CSV and cleaning code are unchanged. Entries are always built
+      with the typed chunked loader, so a cached frame has the compact dtypes
+      of the chunksize path whatever chunksize is passed (it only bounds
+      memory while the entry is filled); the eager uncached read keeps
+      read_csv's object/float64 columns.
+    Returns a DataFrame with a unified 'target' column for modeling.
+    """
+    if cache:
+        if kind not in SCHEMAS:
+            raise ValueError("Unknown kind. Use 'uci_hospitals' or 'pima'.")
+        from . import preset_cache
+        path = _check_path(csv_path)
+        df = preset_cache.read_cached(path, kind, cache_dir)
+        if df is None:
+            df = _concat_chunks(iter_dataset(path, kind=kind, chunksize=chunksize or 1_000_000))
+            preset_cache.write_cached(df, path, kind, cache_dir)
+        return df
+    if chunksize or Path(csv_path).suffix.lower() in (".parquet", ".pq"):
+        return _concat_chunks(iter_dataset(csv_path, kind=kind, chunksize=chunksize or 1_000_000))
+    path = _check_path(csv_path)
+    df = pd.read_csv(path)
+    return _clean(df, kind)
@@ -0,0 +1,160 @@
+"""
+Per-stage timing and memory spans for the train/evaluate CLIs.
+
+    with RunProfile(profile=args.profile) as prof:
+        with span("load"):
+            ...
+    prof.write(outdir, "train")
+
+Every span records wall and CPU seconds plus the process RSS (current and
+high-water mark) when it ends. profile=True additionally traces Python
+allocations and runs cProfile around each top-level span: the span's
+tracemalloc peak, what it still holds at the end and the top allocating
+lines of the latter; write() keeps the stats of the slowest
+one as profile_<command>_<span>.prof (+ a .txt summary). Both slow the run
+down noticeably, so they are opt-in.
+
+span() is a no-op outside an active RunProfile, so library code can mark
+stages unconditionally.
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from .utils import save_json
+
+_active = None
+_SKIP_FRAMES = (tracemalloc.__file__, "<frozen importlib._bootstrap")
+
+def _rss_mb():
+    """Current resident set size (Linux /proc; None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_mb():
+    """Process RSS high-water mark (None without the resource module)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes vs KiB
+
+def _round(x, nd=3):
+    return None if x is None else round(x, nd)
+
+class RunProfile:
+    """Collects spans; see the module docstring."""
+
+    def __init__(self, profile=False, top_n=5):
+        self.profile = profile
+        self.top_n = top_n
+        self.spans = []
+        self._stack = []
+        self._stats = {}  # top-level span -> cProfile.Profile
+        self._t0 = time.perf_counter()
+
+    def __enter__(self):
+        global _active
+        self._prev, _active = _active, self
+        if self.profile:
+            self._started_trace = not tracemalloc.is_tracing()
+            if self._started_trace:
+                tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._prev
+        if self.profile and self._started_trace:
+            tracemalloc.stop()
+        return False
+
+    @contextmanager
+    def span(self, name):
+        path = "/".join(self._stack + [name])
+        top = not self._stack
+        rec = {"name": path, "depth": len(self._stack),
+               "start_s": round(time.perf_counter() - self._t0, 4)}
+        self._stack.append(name)
+        tm = prof = None
+        if self.profile and top:
+            if tracemalloc.is_tracing():
+                # forget earlier blocks: the end-of-span snapshot then holds only
+                # what this span allocated and kept, which keeps it cheap
+                tm = tracemalloc
+                tm.clear_traces()
+            import cProfile
+            prof = cProfile.Profile()
+            prof.enable()
+        rss0 = _rss_mb()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            rec["wall_s"] = round(time.perf_counter() - wall0, 4)
+            rec["cpu_s"] = round(time.process_time() - cpu0, 4)
+            if prof is not None:
+                prof.disable()
+                self._stats[path] = prof
+            rss = _rss_mb()
+            rec["rss_mb"] = _round(rss, 1)
+            rec["rss_delta_mb"] = _round(rss - rss0, 1) if rss is not None and rss0 is not None else None
+            rec["peak_rss_mb"] = _round(_peak_rss_mb(), 1)
+            if tm is not None:
+                current, peak = tm.get_traced_memory()
+                rec["traced_peak_mb"] = round(peak / 2**20, 2)
+                rec["traced_kept_mb"] = round(current / 2**20, 2)
+                # skip the profiler's own and import-machinery frames after
+                # grouping (Snapshot.filter_traces is far slower on big snapshots)
+                stats = [st for st in tm.take_snapshot().statistics("lineno")
+                         if not st.traceback[0].filename.startswith(_SKIP_FRAMES)]
+                rec["top_allocators"] = [
+                    {"where": f"{st.traceback[0].filename}:{st.traceback[0].lineno}",
+                     "size_mb": round(st.size / 2**20, 3), "count": st.count}
+                    for st in stats[:self.top_n]]
+            self._stack.pop()
+            self.spans.append(rec)
+
+    def to_dict(self) -> dict:
+        spans = sorted(self.spans, key=lambda r: r["start_s"])  # appended on exit: children first
+        top = [s for s in spans if s["depth"] == 0]
+        return {"total_wall_s": round(time.perf_counter() - self._t0, 4),
+                "slowest": max(top, key=lambda s: s["wall_s"])["name"] if top else None,
+                "peak_rss_mb": _round(_peak_rss_mb(), 1),
+                "spans": spans}
+
+    def write(self, outdir, command: str) -> Path:
+        """Add this run under `command` in outdir/run_profile.json (train and
+        evaluate share the file); with profile=True also dump the slowest
+        top-level span's cProfile stats. Returns the JSON path."""
+        outdir = Path(outdir)
+        path = outdir / "run_profile.json"
+        data = json.loads(path.read_text()) if path.exists() else {}
+        data[command] = self.to_dict()
+        slowest = data[command]["slowest"]
+        if slowest in self._stats:
+            import pstats
+            stem = outdir / f"profile_{command}_{slowest.replace('/', '_')}"
+            self._stats[slowest].dump_stats(f"{stem}.prof")
+            with open(f"{stem}.txt", "w") as f:
+                pstats.Stats(self._stats[slowest], stream=f).sort_stats("cumulative").print_stats(30)
+            data[command]["cprofile"] = f"{stem.name}.prof"
+        save_json(data, path)
+        return path
+
+@contextmanager
+def span(name):
+    """Span on the active RunProfile; does nothing when none is active."""
+    if _active is None:
+        yield None
+        return
+    with _active.span(name) as rec:
+        yield rec
@@ -1,28 +1,376 @@
 # src/db_utils.py
 from pathlib import Path
 import sqlite3
+import threading
+from contextlib import contextmanager
 from project_paths import PROJECT_ROOT
 
-def connect_to_db(db_name: str = "diabetes.db") -> tuple[sqlite3.Connection, sqlite3.Cursor]:
+# Applied to every connection. WAL lets readers run while a writer commits;
+# NORMAL sync is crash-safe under WAL; cache/mmap sizes suit a single-user
+# analytics file of a few GB.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,       # KiB (negative) -> 64 MB page cache
+    "mmap_size": 268435456,     # 256 MB memory-mapped reads
+    "foreign_keys": "ON",
+}
+
+# Declared indexes per dataset kind; columns absent from a table are skipped.
+INDEXES = {
+    "uci_hospitals": [("patient_nbr",), ("encounter_id",), ("target",)],
+    "pima": [("target",)],
+}
+
+def resolve_db_path(db_name="diabetes.db") -> Path:
+    """A bare filename lives in /data; anything with a directory is used as is."""
+    p = Path(db_name)
+    return p if p.parent != Path(".") or p.is_absolute() else PROJECT_ROOT / "data" / p
+
+def _configure(conn: sqlite3.Connection, pragmas=PRAGMAS) -> sqlite3.Connection:
+    for key, value in pragmas.items():
+        conn.execute(f"PRAGMA {key}={value}")
+    return conn
+
+def connect_to_db(db_name: str = "diabetes.db", verbose: bool = True) -> tuple[sqlite3.Connection, sqlite3.Cursor]:
     """
     Connect to an SQLite database located in the /data folder.
 
     Args:
         db_name: Filename of the SQLite database (default: 'diabetes.db').
+        verbose: Print the path on connect (notebooks); pass False in loops.
 
     Returns:
         (conn, cursor) tuple ready for queries.
     """
-    db_path = PROJECT_ROOT / "data" / db_name
+    db_path = resolve_db_path(db_name)
     if not db_path.exists():
         raise FileNotFoundError(f"❌ Database not found: {db_path}")
-    conn = sqlite3.connect(db_path)
+    conn = _configure(sqlite3.connect(db_path))
     cursor = conn.cursor()
-    print(f"✅ Connected to database: {db_path}")
+    if verbose:
+        print(f"✅ Connected to database: {db_path}")
     return conn, cursor
 
 def close_db(conn):
     """Close the SQLite connection."""
     if conn:
         conn.close()
-        print("🔒 Connection closed.")
\ No newline at end of file
+        print("🔒 Connection closed.")
+
+class ConnectionPool:
+    """One configured connection per (thread, database), reused across calls.
+
+    sqlite3 connections must stay on the thread that opened them, so the
+    pool is a threading.local rather than a shared queue."""
+
+    def __init__(self, db_path, pragmas=PRAGMAS):
+        self.db_path = Path(db_path)
+        self.pragmas = pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # only this thread uses it; the flag just lets close_all() run elsewhere
+            conn = _configure(sqlite3.connect(self.db_path, check_same_thread=False), self.pragmas)
+            self._local.conn = conn
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on error."""
+        conn = self.get()
+        with conn:
+            yield conn
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        self._local = threading.local()
+
+_POOLS: dict = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(db_name="diabetes.db") -> ConnectionPool:
+    """Process-wide pool for a database (created on first use)."""
+    path = resolve_db_path(db_name).resolve()
+    with _POOLS_LOCK:
+        if path not in _POOLS:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _POOLS[path] = ConnectionPool(path)
+        return _POOLS[path]
+
+def _sql_type(dtype) -> str:
+    import pandas as pd
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+def _quote(name) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _literal(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _records(df):
+    """Row tuples with missing values as None (what sqlite3 binds to NULL)."""
+    cols = []
+    for col in df.columns:
+        s = df[col].astype(object)
+        cols.append(s.where(s.notna(), None).tolist())
+    return zip(*cols)
+
+_VERSIONS_DDL = ("CREATE TABLE IF NOT EXISTS _table_versions "
+                 "(name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)")
+
+def track_versions(table: str, db_name="diabetes.db", enable=True):
+    """Keep a per-table change counter in _table_versions via row triggers,
+    so cached summaries can tell when a table was modified. Bulk loads turn
+    the triggers off and bump the counter once instead."""
+    conn = get_pool(db_name).get()
+    with conn:
+        conn.execute(_VERSIONS_DDL)
+        conn.execute("INSERT OR IGNORE INTO _table_versions (name) VALUES (?)", (table,))
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            trig = _quote(f"_version_{table}_{op.lower()}")
+            conn.execute(f"DROP TRIGGER IF EXISTS {trig}")
+            if enable:
+                conn.execute(f"CREATE TRIGGER {trig} AFTER {op} ON {_quote(table)} BEGIN "
+                             f"UPDATE _table_versions SET version = version + 1 "
+                             f"WHERE name = {_literal(table)}; END")
+
+def bump_version(table: str, db_name="diabetes.db"):
+    conn = get_pool(db_name).get()
+    with conn:
+        conn.execute(_VERSIONS_DDL)
+        conn.execute("INSERT INTO _table_versions (name, version) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET version = version + 1", (table,))
+
+def _version_triggers_present(conn, table: str) -> bool:
+    names = {f"_version_{table}_{op}" for op in ("insert", "update", "delete")}
+    found = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,))}
+    return names <= found
+
+def table_stamp(table: str, db_name="diabetes.db"):
+    """Modification stamp of a table (its _table_versions counter), or None
+    if the table is not tracked; see track_versions.
+
+    Dropping a table takes its triggers with it, so a table replaced outside
+    write_frames (e.g. to_sql(if_exists="replace")) would keep its old stamp;
+    missing triggers therefore count as a change: the counter is bumped and
+    the triggers reinstalled."""
+    conn = get_pool(db_name).get()
+    try:
+        row = conn.execute("SELECT version FROM _table_versions WHERE name = ?", (table,)).fetchone()
+    except sqlite3.OperationalError:  # no _table_versions yet
+        return None
+    if row is None:
+        return None
+    if not _version_triggers_present(conn, table):
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone() is None:
+            return None
+        bump_version(table, db_name)
+        track_versions(table, db_name)
+        row = conn.execute("SELECT version FROM _table_versions WHERE name = ?", (table,)).fetchone()
+    return f"v{row[0]}"
+
+def write_frames(frames, table: str, db_name="diabetes.db", kind=None, replace=True) -> int:
+    """Bulk-insert an iterable of DataFrames into `table`, one transaction
+    per frame via executemany; indexes for `kind` are built once at the end
+    (cheaper than maintaining them row by row). Returns rows written."""
+    pool = get_pool(db_name)
+    conn = pool.get()
+    rows, insert = 0, None
+    conn.execute("PRAGMA synchronous=OFF")  # bulk load; restored below
+    try:
+        for df in frames:
+            if insert is None:
+                cols = ", ".join(f"{_quote(c)} {_sql_type(df[c].dtype)}" for c in df.columns)
+                with conn:
+                    if replace:
+                        conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                    conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({cols})")
+                track_versions(table, db_name, enable=False)
+                names = list(df.columns)
+                marks = ", ".join("?" * len(names))
+                insert = f"INSERT INTO {_quote(table)} ({', '.join(map(_quote, names))}) VALUES ({marks})"
+            with conn:
+                conn.executemany(insert, _records(df[names]))
+            rows += len(df)
+    finally:
+        conn.execute(f"PRAGMA synchronous={pool.pragmas.get('synchronous', 'NORMAL')}")
+    if insert is not None:
+        create_indexes(table, kind, db_name)
+        bump_version(table, db_name)
+        track_versions(table, db_name)
+    return rows
+
+def create_indexes(table: str, kind=None, db_name="diabetes.db", indexes=None) -> list[str]:
+    """CREATE INDEX IF NOT EXISTS for the declared columns present in `table`."""
+    conn = get_pool(db_name).get()
+    present = {r[1] for r in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+    made = []
+    with conn:
+        for cols in (indexes if indexes is not None else INDEXES.get(kind, [])):
+            if set(cols) <= present:
+                name = f"idx_{table}_{'_'.join(cols)}"
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} "
+                             f"({', '.join(map(_quote, cols))})")
+                made.append(name)
+        conn.execute("ANALYZE")
+    return made
+
+def ingest_dataset(csv_path, kind="uci_hospitals", table=None, db_name="diabetes.db",
+                   chunksize=100_000, verbose=True) -> int:
+    """Load a raw CSV through presets' cleaning into SQLite, keeping the
+    patient/encounter ids the cleaned frame drops so they can be indexed."""
+    from src.presets import iter_dataset
+    table = table or kind
+    frames = iter_dataset(csv_path, kind=kind, chunksize=chunksize,
+                          keep_cols=("encounter_id", "patient_nbr"))
+    rows = write_frames(frames, table, db_name, kind=kind)
+    if verbose:
+        print(f"✅ Ingested {rows:,} rows into {resolve_db_path(db_name)}:{table}")
+    return rows
+
+def _arrow_type(value):
+    import pyarrow as pa
+    if isinstance(value, bool) or isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    if isinstance(value, str):
+        return pa.dictionary(pa.int32(), pa.string())  # categoricals, like presets' compact frames
+    if isinstance(value, bytes):
+        return pa.binary()
+    return None
+
+def _declared_type(decl: str):
+    """Arrow type for a declared column type, by SQLite's affinity rules."""
+    import pyarrow as pa
+    decl = (decl or "").upper()
+    if "INT" in decl:
+        return pa.int64()
+    if any(t in decl for t in ("CHAR", "CLOB", "TEXT")):
+        return pa.dictionary(pa.int32(), pa.string())
+    if any(t in decl for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return None
+
+def _declared_types(conn, query, params) -> list:
+    """Declared types of the query's columns (None for expressions), read
+    through a temporary view; views can't take parameters, so [] then."""
+    if params:
+        return []
+    view = f"_read_sql_{threading.get_ident()}"
+    try:
+        conn.execute(f"CREATE TEMP VIEW {_quote(view)} AS {query}")
+        try:
+            return [r[2] for r in conn.execute(f"PRAGMA table_info({_quote(view)})")]
+        finally:
+            conn.execute(f"DROP VIEW {_quote(view)}")
+    except sqlite3.Error:
+        return []
+
+def _result_schema(conn, query, params, names, first_rows, probe_rows=100_000):
+    """One Arrow schema for every batch of a result. Each column is typed by
+    its first non-null value in the first batch, else by its declared type;
+    columns still untyped (expressions, parameterised queries) are resolved
+    by one scan of the result that stops as soon as each has a non-null value
+    (or after probe_rows rows). Columns that stay all-NULL are typed null."""
+    import pyarrow as pa
+    types = [next((t for t in (_arrow_type(r[i]) for r in first_rows if r[i] is not None) if t), None)
+             for i in range(len(names))]
+    if any(t is None for t in types):
+        declared = _declared_types(conn, query, params)
+        types = [t or (_declared_type(declared[i]) if i < len(declared) else None)
+                 for i, t in enumerate(types)]
+    todo = [i for i, t in enumerate(types) if t is None]
+    if first_rows and todo:
+        cols = [f"_c{i}" for i in range(len(names))]  # duplicate result names are fine here
+        wanted = [cols[i] for i in todo]
+        probe = (f"WITH _q({', '.join(cols)}) AS ({query}) SELECT {', '.join(wanted)} FROM _q "
+                 f"WHERE {' OR '.join(f'{c} IS NOT NULL' for c in wanted)} LIMIT {int(probe_rows)}")
+        try:
+            cur = conn.execute(probe, params)
+        except sqlite3.Error:
+            cur = None
+        while cur is not None and todo:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                break
+            for j, i in enumerate(list(todo)):
+                t = next((_arrow_type(r[j]) for r in rows if r[j] is not None), None)
+                if t is not None:
+                    types[i] = t
+            todo = [i for i in todo if types[i] is None]
+        if cur is not None:
+            cur.close()
+    return pa.schema([pa.field(n, t or pa.null()) for n, t in zip(names, types)])
+
+def _batch(rows, schema):
+    """Arrow table from row tuples, typed per schema (see _result_schema).
+    A column whose later values don't fit (a float after ints) is widened
+    in the schema so the remaining batches agree."""
+    import pyarrow as pa
+    arrays = []
+    for i, (field, col) in enumerate(zip(schema, zip(*rows))):
+        t = field.type
+        if pa.types.is_integer(t) and any(isinstance(v, float) for v in col):
+            t = pa.float64()  # pyarrow would truncate the floats instead
+        try:
+            if pa.types.is_dictionary(t):
+                a = pa.array(col, type=pa.string()).dictionary_encode()
+            else:
+                a = pa.array(col, type=t)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            a = pa.array(col)
+        if not a.type.equals(field.type):
+            schema = schema.set(i, pa.field(field.name, a.type))
+        arrays.append(a)
+    return pa.Table.from_arrays(arrays, schema=schema), schema
+
+def iter_sql(query: str, params=(), db_name="diabetes.db", chunksize=100_000, arrow=False):
+    """Run a query on the pooled connection and yield pandas DataFrames
+    (or pyarrow Tables with arrow=True) of at most chunksize rows; every
+    chunk has the same column types (see _result_schema)."""
+    conn = get_pool(db_name).get()
+    cur = conn.execute(query, params)
+    names = [d[0] for d in cur.description]
+    schema = None
+    try:
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            if schema is None:
+                schema = _result_schema(conn, query, params, names, rows)
+            table, schema = _batch(rows, schema)
+            yield table if arrow else table.to_pandas()
+    finally:
+        cur.close()
+
+def read_sql(query: str, params=(), db_name="diabetes.db", chunksize=100_000):
+    """Whole result as one DataFrame, fetched in chunks; an empty result
+    still has the query's columns."""
+    from src.presets import _concat_chunks
+    parts = list(iter_sql(query, params, db_name, chunksize))
+    if parts:
+        return _concat_chunks(parts)
+    conn = get_pool(db_name).get()
+    cur = conn.execute(query, params)
+    names = [d[0] for d in cur.description]
+    cur.close()
+    return _result_schema(conn, query, params, names, []).empty_table().to_pandas()
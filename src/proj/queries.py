@@ -0,0 +1,139 @@
+# src/proj/queries.py
+"""
+Summary statistics computed inside SQLite instead of pandas.
+
+Each summary is one aggregate query with bound parameters (sqlite3 keeps the
+prepared statement in its per-connection cache), backed by covering indexes
+where a GROUP BY can be answered from the index alone. Results are cached in
+the database (_summary_cache) keyed by the table's modification stamp, so a
+repeated report costs one lookup until the table changes.
+
+CLI:
+    python -m proj.queries --table diabetes_patients --target Outcome --groups Age --hist Glucose BMI
+"""
+import argparse, json
+from pathlib import Path
+import pandas as pd
+from project_paths import REPORTS_DIR
+from .db import get_pool, table_stamp, track_versions, _quote
+
+_CACHE_DDL = ("CREATE TABLE IF NOT EXISTS _summary_cache "
+              "(key TEXT PRIMARY KEY, stamp TEXT NOT NULL, payload TEXT NOT NULL)")
+
+def _columns(conn, table) -> list:
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+def _covering_index(conn, table, cols):
+    name = f"idx_{table}_{'_'.join(cols)}"
+    with conn:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} "
+                     f"({', '.join(map(_quote, cols))})")
+
+def _cached(db_name, table, key, compute) -> pd.DataFrame:
+    """compute() -> DataFrame, memoized on (table, key) and the table stamp."""
+    conn = get_pool(db_name).get()
+    stamp = table_stamp(table, db_name)
+    if stamp is None:  # first summary of a table loaded elsewhere: start tracking it
+        track_versions(table, db_name)
+        stamp = table_stamp(table, db_name)
+    conn.execute(_CACHE_DDL)
+    full_key = f"{table}|{key}"
+    row = conn.execute("SELECT stamp, payload FROM _summary_cache WHERE key = ?", (full_key,)).fetchone()
+    if row is not None and row[0] == stamp:
+        return pd.DataFrame(json.loads(row[1]))
+    df = compute(conn)
+    payload = json.dumps({c: df[c].tolist() for c in df.columns}, default=str)  # per column keeps int/float
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO _summary_cache (key, stamp, payload) VALUES (?, ?, ?)",
+                     (full_key, stamp, payload))
+    return df
+
+def _frame(cur) -> pd.DataFrame:
+    return pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+
+def row_count(table, db_name="diabetes.db") -> pd.DataFrame:
+    return _cached(db_name, table, "rows", lambda conn: _frame(
+        conn.execute(f"SELECT COUNT(*) AS n_rows FROM {_quote(table)}")))
+
+def class_balance(table, target="target", db_name="diabetes.db") -> pd.DataFrame:
+    """Rows per target value (the outcome_counts report)."""
+    def compute(conn):
+        _covering_index(conn, table, [target])
+        t = _quote(target)
+        return _frame(conn.execute(f"SELECT {t}, COUNT(*) AS n FROM {_quote(table)} "
+                                   f"GROUP BY {t} ORDER BY {t}"))
+    return _cached(db_name, table, f"balance|{target}", compute)
+
+def missingness(table, columns=None, db_name="diabetes.db") -> pd.DataFrame:
+    """Missing count and share per column, all columns in one scan."""
+    def compute(conn):
+        cols = list(columns or _columns(conn, table))
+        exprs = ", ".join(f"COUNT({_quote(c)})" for c in cols)
+        n, *present = conn.execute(f"SELECT COUNT(*), {exprs} FROM {_quote(table)}").fetchone()
+        miss = [n - p for p in present]
+        return pd.DataFrame({"column": cols, "n_missing": miss,
+                             "pct_missing": [round(100.0 * m / n, 4) if n else 0.0 for m in miss]})
+    return _cached(db_name, table, f"missing|{','.join(columns or [])}", compute)
+
+def group_rates(table, group, target="target", db_name="diabetes.db") -> pd.DataFrame:
+    """Rows and mean target per level of `group`; an index on (group, target)
+    lets SQLite answer from the index without touching the table."""
+    def compute(conn):
+        _covering_index(conn, table, [group, target])
+        g, t = _quote(group), _quote(target)
+        return _frame(conn.execute(
+            f"SELECT {g}, COUNT(*) AS n, SUM({t}) AS positives, ROUND(AVG({t}), 6) AS target_rate "
+            f"FROM {_quote(table)} GROUP BY {g} ORDER BY {g}"))
+    return _cached(db_name, table, f"rates|{group}|{target}", compute)
+
+def histogram(table, column, bins=20, db_name="diabetes.db") -> pd.DataFrame:
+    """Equal-width bins over [min, max]: the range comes from the column's
+    index (two seeks), the counts from one GROUP BY on the bin number."""
+    def compute(conn):
+        _covering_index(conn, table, [column])
+        c, tq = _quote(column), _quote(table)
+        lo, hi = conn.execute(f"SELECT MIN({c}), MAX({c}) FROM {tq}").fetchone()
+        if lo is None:
+            return pd.DataFrame(columns=["bin", "left", "right", "n"])
+        width = (hi - lo) / bins if hi > lo else 1.0
+        counts = dict(conn.execute(
+            f"SELECT MIN(CAST(({c} - ?) / ? AS INTEGER), ?) AS b, COUNT(*) FROM {tq} "
+            f"WHERE {c} IS NOT NULL GROUP BY b", (lo, width, bins - 1)).fetchall())
+        return pd.DataFrame({"bin": range(bins),
+                             "left": [lo + k * width for k in range(bins)],
+                             "right": [lo + (k + 1) * width for k in range(bins)],
+                             "n": [counts.get(k, 0) for k in range(bins)]})
+    return _cached(db_name, table, f"hist|{column}|{bins}", compute)
+
+def write_sql_reports(table, target="target", groups=(), hist=(), bins=20,
+                      db_name="diabetes.db", outdir=None) -> dict:
+    """Write the reports/sql CSVs (rows_count, outcome_counts, missingness,
+    group_rates_<col>, hist_<col>) and return {name: path}."""
+    outdir = Path(outdir or REPORTS_DIR / "sql")
+    outdir.mkdir(parents=True, exist_ok=True)
+    frames = {"rows_count": row_count(table, db_name),
+              "outcome_counts": class_balance(table, target, db_name),
+              "missingness": missingness(table, db_name=db_name)}
+    frames.update({f"group_rates_{g}": group_rates(table, g, target, db_name) for g in groups})
+    frames.update({f"hist_{c}": histogram(table, c, bins, db_name) for c in hist})
+    paths = {}
+    for name, df in frames.items():
+        paths[name] = outdir / f"{name}.csv"
+        df.to_csv(paths[name], index=False)
+    print(f"✅ Wrote {len(paths)} SQL reports to {outdir}")
+    return paths
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--db", type=str, default="diabetes.db")
+    p.add_argument("--table", type=str, default="diabetes_patients")
+    p.add_argument("--target", type=str, default="Outcome")
+    p.add_argument("--groups", nargs="*", default=[])
+    p.add_argument("--hist", nargs="*", default=[])
+    p.add_argument("--bins", type=int, default=20)
+    p.add_argument("--outdir", type=str, default=None)
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    write_sql_reports(args.table, args.target, args.groups, args.hist, args.bins, args.db, args.outdir)
@@ -0,0 +1,173 @@
+"""
+Hyperparameter search over the train pipeline with successive halving.
+
+Candidates combine basic_preprocess options with a classifier from
+CLASSIFIERS. Each rung fits every surviving candidate on a larger nested
+subsample of the training split, scores it on the validation split and
+keeps the best 1/factor. The ColumnTransformer is fitted once per
+(preprocessing config, rung) and shared by all classifier candidates.
+
+Run with: python -m src.search --csv_path data/raw/diabetes.csv --output_dir output/search
+"""
+import argparse, itertools, json, math, time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import get_scorer
+
+from .data import split_xy
+from .features import basic_preprocess
+from .utils import save_json
+
+CLASSIFIERS = {
+    "logistic_regression": LogisticRegression,
+    "sgd": SGDClassifier,
+    "random_forest": RandomForestClassifier,
+}
+
+DEFAULT_SPACE = {
+    "preprocess": {"numeric_strategy": ["median", "mean"]},
+    "classifiers": [
+        {"type": "logistic_regression", "params": {"C": [0.01, 0.1, 1.0, 10.0], "max_iter": [200]}},
+    ],
+}
+
+def _expand(grid: dict):
+    """{'a': [1, 2], 'b': 3} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]"""
+    keys = list(grid)
+    values = [v if isinstance(v, list) else [v] for v in grid.values()]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+def build_candidates(search_cfg: dict, seed=42):
+    """Cross preprocessing configs with classifier configs; sample
+    n_candidates of them at random if set (otherwise the full grid)."""
+    pre_space = search_cfg.get("preprocess", DEFAULT_SPACE["preprocess"]) or {}
+    clf_space = search_cfg.get("classifiers", DEFAULT_SPACE["classifiers"]) or []
+    cands = []
+    for pre in _expand(pre_space):
+        for spec in clf_space:
+            if spec["type"] not in CLASSIFIERS:
+                raise ValueError(f"Unknown classifier type: {spec['type']}. Use one of {sorted(CLASSIFIERS)}.")
+            for params in _expand(spec.get("params", {}) or {}):
+                cands.append({"preprocess": pre, "classifier": spec["type"], "params": params})
+    n = search_cfg.get("n_candidates")
+    if n and n < len(cands):
+        rng = np.random.default_rng(seed)
+        cands = [cands[i] for i in sorted(rng.choice(len(cands), n, replace=False))]
+    for i, c in enumerate(cands):
+        c["id"] = i
+    return cands
+
+def _pre_key(cand):
+    return json.dumps(cand["preprocess"], sort_keys=True)
+
+def _fit_candidate(cand, Xt, y, Xv, yv, scorer):
+    clf = CLASSIFIERS[cand["classifier"]](**cand["params"])
+    t0 = time.perf_counter()
+    try:
+        clf.fit(Xt, y)
+        fit_s = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        score = float(scorer(clf, Xv, yv))
+        predict_s = time.perf_counter() - t1
+    except Exception as e:
+        return {"id": cand["id"], "score": float("nan"), "fit_s": time.perf_counter() - t0,
+                "predict_s": float("nan"), "error": repr(e)}
+    return {"id": cand["id"], "score": score, "fit_s": fit_s, "predict_s": predict_s}
+
+def successive_halving(candidates, X_train, y_train, X_valid, y_valid, frame_for_types=None,
+                       scoring="roc_auc", min_resources=1000, factor=3, n_jobs=1, seed=42):
+    """Run successive halving and return the leaderboard DataFrame with one
+    row per (candidate, rung) evaluation."""
+    scorer = get_scorer(scoring)
+    frame_for_types = X_train if frame_for_types is None else frame_for_types
+    n_train = len(X_train)
+    order = np.random.default_rng(seed).permutation(n_train)  # nested subsamples
+    alive = list(candidates)
+    n_rows = min(int(min_resources), n_train)
+    rows, rung = [], 0
+    with Parallel(n_jobs=n_jobs) as pool:
+        while True:
+            idx = np.sort(order[:n_rows])
+            X_sub, y_sub = X_train.iloc[idx], y_train.iloc[idx]
+            # one preprocessor fit per distinct preprocessing config in this rung
+            pre_cache = {}
+            for cand in alive:
+                key = _pre_key(cand)
+                if key not in pre_cache:
+                    t0 = time.perf_counter()
+                    pre = basic_preprocess(frame_for_types, **cand["preprocess"]).fit(X_sub, y_sub)
+                    Xt = pre.transform(X_sub)
+                    pre_cache[key] = (Xt, pre.transform(X_valid), time.perf_counter() - t0)
+            results = pool(
+                delayed(_fit_candidate)(cand, pre_cache[_pre_key(cand)][0], y_sub,
+                                        pre_cache[_pre_key(cand)][1], y_valid, scorer)
+                for cand in alive)
+            by_id = {c["id"]: c for c in alive}
+            for res in results:
+                cand = by_id[res["id"]]
+                pre_s = pre_cache[_pre_key(cand)][2]
+                rows.append({
+                    "rung": rung, "n_rows": n_rows, "candidate": res["id"],
+                    "classifier": cand["classifier"],
+                    "params": json.dumps(cand["params"], sort_keys=True),
+                    "preprocess": _pre_key(cand),
+                    "score": res["score"], "preprocess_fit_s": pre_s, "fit_s": res["fit_s"],
+                    "predict_us_per_row": 1e6 * res["predict_s"] / max(len(X_valid), 1),
+                    "error": res.get("error"),
+                })
+            if n_rows >= n_train or len(alive) <= 1:
+                break
+            keep = max(1, math.ceil(len(alive) / factor))
+            ranked = sorted(results, key=lambda r: -np.nan_to_num(r["score"], nan=-np.inf))
+            alive = [by_id[r["id"]] for r in ranked[:keep]]
+            n_rows = min(n_rows * factor, n_train)
+            rung += 1
+    board = pd.DataFrame(rows)
+    return board.sort_values(["rung", "score"], ascending=[False, False], ignore_index=True)
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--csv_path", type=str, required=True, help="Path to input CSV.")
+    p.add_argument("--kind", type=str, default=None, choices=["uci_hospitals","pima"], help="Dataset kind (overrides config).")
+    p.add_argument("--output_dir", type=str, default="output/search", help="Where to write the leaderboard.")
+    p.add_argument("--config", type=str, default="config.yaml", help="Path to YAML config.")
+    return p.parse_args()
+
+def main():
+    from .utils import load_config
+    from .train import prepare_frame, split_rows
+    args = parse_args()
+    cfg = load_config(args.config)
+    search_cfg = cfg.get("search", {}) or {}
+    df, target, outdir = prepare_frame(args.csv_path, args.kind, cfg, args.output_dir)
+    idx = split_rows(df, target, cfg)  # same split as src.train, reused when cached
+    X_train, y_train = split_xy(df, idx["train"], target)
+    X_valid, y_valid = split_xy(df, idx["valid"], target)
+
+    seed = int(search_cfg.get("seed", 42))
+    candidates = build_candidates(search_cfg, seed=seed)
+    base_pre = cfg.get("features", {}) or {}  # search grid overrides the features section
+    for cand in candidates:
+        cand["preprocess"] = {**base_pre, **cand["preprocess"]}
+    strategy = search_cfg.get("strategy", "halving")
+    if strategy not in ("halving", "grid"):
+        raise ValueError("search.strategy must be 'halving' or 'grid'")
+    min_resources = search_cfg.get("min_resources", 1000) if strategy == "halving" else len(X_train)
+    t0 = time.perf_counter()
+    board = successive_halving(
+        candidates, X_train, y_train, X_valid, y_valid,
+        scoring=search_cfg.get("scoring", "roc_auc"),
+        min_resources=min_resources, factor=int(search_cfg.get("factor", 3)),
+        n_jobs=search_cfg.get("n_jobs", -1), seed=seed,
+    )
+    board.to_csv(outdir/"leaderboard.csv", index=False)
+    best = board.iloc[0].to_dict()
+    save_json({"n_candidates": len(candidates), "strategy": strategy, "split_fingerprint": idx["fingerprint"],
+               "wall_s": time.perf_counter() - t0, "best": best}, outdir/"search_summary.json")
+    print(board.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Local HTTP scoring service for a model saved by src.train.
+
+Concurrent requests are queued and scored together in micro-batches
+(up to --max_batch rows, waiting at most --max_wait_ms for company), since
+one predict_proba call on 64 rows costs about the same as on one row.
+
+Endpoints:
+    POST /predict   one encounter as a JSON object (raw UCI/Pima fields),
+                    or a JSON list of them -> {"y_prob": ..., "y_pred": ...}
+    GET  /metrics   request count, p50/p95/p99 latency (ms), batch-size histogram
+    GET  /health
+
+Run with: python -m src.serve --model_dir output --port 8080
+Load test: python -m benchmarks.load_gen --url http://127.0.0.1:8080 --csv data/raw/diabetes.csv
+"""
+import argparse, json, queue, threading, time
+from collections import Counter, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+class ServiceMetrics:
+    """Thread-safe latency window and batch-size histogram."""
+    def __init__(self, window=10_000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = Counter()
+        self.requests = 0
+        self.errors = 0
+
+    def record_request(self, seconds, ok=True):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+            self.errors += 0 if ok else 1
+
+    def record_batch(self, size):
+        with self._lock:
+            self._batch_sizes[size] += 1
+
+    def snapshot(self):
+        with self._lock:
+            lat = np.array(self._latencies) * 1000.0
+            sizes = dict(sorted(self._batch_sizes.items()))
+            out = {"requests": self.requests, "errors": self.errors,
+                   "batch_size_hist": {str(k): v for k, v in sizes.items()}}
+        n_batches = sum(sizes.values())
+        out["mean_batch_size"] = (sum(k * v for k, v in sizes.items()) / n_batches) if n_batches else None
+        if lat.size:
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            out["latency_ms"] = {"p50": p50, "p95": p95, "p99": p99, "max": float(lat.max()),
+                                 "window": int(lat.size)}
+        return out
+
+class MicroBatcher:
+    """Collect queued records into batches and score them on one worker thread."""
+    def __init__(self, score_fn, max_batch=64, max_wait_ms=2.0, metrics=None):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = metrics or ServiceMetrics()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict) -> Future:
+        fut = Future()
+        self._queue.put((record, fut))
+        return fut
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                probs = [float(p) for p in self.score_fn([rec for rec, _ in batch])]
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._score_each(batch)  # one bad record must not fail its neighbours
+            else:
+                for (_, fut), p in zip(batch, probs):
+                    fut.set_result(p)
+            self.metrics.record_batch(len(batch))
+
+    def _score_each(self, batch):
+        for rec, fut in batch:
+            try:
+                fut.set_result(float(self.score_fn([rec])[0]))
+            except Exception as e:
+                fut.set_exception(e)
+
+def make_scorer(pipeline, manifest):
+    import pandas as pd
+    from .features import freeze_pipeline
+    from .model_io import align_features
+    from .presets import NA_VALUES, _clean
+    model = freeze_pipeline(pipeline)  # NumPy fast path; sklearn overhead dominates tiny batches
+
+    def score(records):
+        raw = pd.DataFrame.from_records(records)
+        for col in raw.columns:
+            if raw[col].dtype == object or pd.api.types.is_string_dtype(raw[col].dtype):
+                raw[col] = raw[col].mask(raw[col].isin(NA_VALUES))
+        X = align_features(_clean(raw, manifest["kind"], require_target=False), manifest)
+        return model.predict_proba(X)[:, 1]
+    return score
+
+def warm_up(score_fn, manifest, n=3):
+    """Run a few all-missing rows through the pipeline so first requests
+    don't pay for lazy imports and allocator warm-up."""
+    blank = {f["name"]: None for f in manifest["features"]}
+    for size in (1, 8, 64)[:n]:
+        score_fn([blank] * size)
+
+def make_handler(batcher: MicroBatcher, threshold: float, timeout_s: float):
+    metrics = batcher.metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, obj):
+            body = json.dumps(obj).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, metrics.snapshot())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            t0 = time.perf_counter()
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                records = payload if isinstance(payload, list) else [payload]
+                if not records or not all(isinstance(r, dict) for r in records):
+                    raise ValueError("expected a JSON object or a non-empty list of objects")
+                futures = [batcher.submit(r) for r in records]
+                probs = [f.result(timeout=timeout_s) for f in futures]
+            except Exception as e:
+                # recorded before replying, like the 200 path: once the client
+                # has its response, /metrics already counts the request
+                metrics.record_request(time.perf_counter() - t0, ok=False)
+                self._send(400, {"error": repr(e)})
+                return
+            out = [{"y_prob": p, "y_pred": int(p >= threshold)} for p in probs]
+            metrics.record_request(time.perf_counter() - t0)
+            self._send(200, out if isinstance(payload, list) else out[0])
+
+        def log_message(self, fmt, *args):  # keep the hot path quiet
+            pass
+
+    return Handler
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default backlog of 5 drops bursts of clients
+
+def build_server(model_dir, host="127.0.0.1", port=8080, max_batch=64, max_wait_ms=2.0,
+                 threshold=0.5, timeout_s=5.0, warm=True):
+    from .model_io import load_model
+    pipeline, manifest = load_model(model_dir)
+    score_fn = make_scorer(pipeline, manifest)
+    if warm:
+        warm_up(score_fn, manifest)
+    batcher = MicroBatcher(score_fn, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    return ScoringServer((host, port), make_handler(batcher, threshold, timeout_s))
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--model_dir", type=str, required=True, help="Directory with model.pkl + model_manifest.json.")
+    p.add_argument("--host", type=str, default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--max_batch", type=int, default=64)
+    p.add_argument("--max_wait_ms", type=float, default=2.0)
+    p.add_argument("--threshold", type=float, default=0.5)
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    server = build_server(args.model_dir, args.host, args.port, args.max_batch,
+                          args.max_wait_ms, args.threshold)
+    print(f"✅ Serving {args.model_dir} on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
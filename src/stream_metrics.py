@@ -0,0 +1,189 @@
+"""
+Mergeable metric accumulators for evaluating predictions in constant memory.
+
+Each accumulator consumes one batch at a time (update), can be combined
+with another accumulator built over a different shard (merge, e.g. one per
+worker process) and turns its counts into metrics at the end (result).
+
+Binned AUROC: scores are histogrammed into n_bins equal-width bins per
+class. Pairs of a positive and a negative in different bins are ordered
+exactly; pairs sharing a bin are counted as ties (1/2). The error against
+the exact AUROC is therefore at most sum_b pos_b * neg_b / (2 * P * N),
+which result() reports as auroc_error_bound (about 1 / (2 * n_bins) for
+smooth score distributions; 0 when every distinct score gets its own bin).
+AUPRC is the step-wise average precision over the bin edges.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .subgroup import _rates
+
+class ConfusionAccumulator:
+    """tp/fp/fn/tn counts at a fixed threshold."""
+    def __init__(self):
+        self.counts = np.zeros(4, dtype=np.int64)  # tp, fp, fn, tn
+
+    def update(self, y_true, y_pred):
+        y = np.asarray(y_true) == 1
+        yp = np.asarray(y_pred) == 1
+        self.counts += [np.sum(y & yp), np.sum(~y & yp), np.sum(y & ~yp), np.sum(~y & ~yp)]
+        return self
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def result(self):
+        return {k: float(v) for k, v in _rates(self.counts).items()}
+
+class BinnedCurveAccumulator:
+    """Per-class score histograms on [0, 1]; gives binned ROC/PR summaries."""
+    def __init__(self, n_bins=10_000):
+        self.n_bins = n_bins
+        self.pos = np.zeros(n_bins, dtype=np.int64)
+        self.neg = np.zeros(n_bins, dtype=np.int64)
+
+    def update(self, y_true, y_prob):
+        y = np.asarray(y_true) == 1
+        b = np.clip((np.asarray(y_prob, dtype=float) * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.pos += np.bincount(b[y], minlength=self.n_bins)
+        self.neg += np.bincount(b[~y], minlength=self.n_bins)
+        return self
+
+    def merge(self, other):
+        if other.n_bins != self.n_bins:
+            raise ValueError("Cannot merge curves with different n_bins.")
+        self.pos += other.pos
+        self.neg += other.neg
+        return self
+
+    def curve(self):
+        """tp/fp when predicting positive at score >= each bin's lower edge."""
+        tp = np.cumsum(self.pos[::-1])[::-1]
+        fp = np.cumsum(self.neg[::-1])[::-1]
+        return {"threshold": np.arange(self.n_bins) / self.n_bins, "tp": tp, "fp": fp}
+
+    def result(self):
+        P, N = self.pos.sum(), self.neg.sum()
+        if P == 0 or N == 0:
+            return {}
+        pos, neg = self.pos.astype(float), self.neg.astype(float)
+        neg_below = np.cumsum(neg) - neg
+        c = self.curve()
+        nz = self.pos > 0
+        precision = c["tp"][nz] / (c["tp"][nz] + c["fp"][nz])
+        return {
+            "auroc": float((pos * (neg_below + 0.5 * neg)).sum() / (P * N)),
+            "auprc": float((pos[nz] * precision).sum() / P),
+            "auroc_error_bound": float((pos * neg).sum() / (2 * P * N)),
+        }
+
+    def best_threshold(self, metric="f1"):
+        """(threshold, score) maximizing F1 over the bin edges; ties -> lowest."""
+        if metric != "f1":
+            raise ValueError("Streaming threshold search supports metric='f1' only.")
+        c = self.curve()
+        P = self.pos.sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f1 = np.nan_to_num(2 * c["tp"] / (c["tp"] + c["fp"] + P), nan=0.0)
+        i = int(np.argmax(f1))
+        return float(c["threshold"][i]), float(f1[i])
+
+class SubgroupAccumulator:
+    """Confusion counts per group for attributes and their intersections."""
+    def __init__(self, attributes, intersections=()):
+        self.slices = [(a,) for a in attributes] + [tuple(t) for t in intersections]
+        self.counts = {}  # (slice, group) -> [tp, fp, fn, tn]
+
+    def update(self, frame: pd.DataFrame, y_true, y_pred):
+        y = np.asarray(y_true) == 1
+        yp = np.asarray(y_pred) == 1
+        cells = pd.DataFrame({"tp": y & yp, "fp": ~y & yp, "fn": y & ~yp, "tn": ~y & ~yp}, dtype=np.int64)
+        for cols in self.slices:
+            if any(c not in frame.columns for c in cols):
+                continue
+            keys = [frame[c].to_numpy() for c in cols]
+            sums = cells.groupby(keys, dropna=True).sum()
+            name = " & ".join(cols)
+            for group, row in zip(sums.index, sums.to_numpy()):
+                label = " & ".join(map(str, group)) if len(cols) > 1 else str(group)
+                key = (name, label)
+                self.counts[key] = self.counts.get(key, 0) + row
+        return self
+
+    def merge(self, other):
+        for key, row in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + row
+        return self
+
+    def result(self, min_size=10) -> pd.DataFrame:
+        """Same layout as subgroup.subgroup_report (without AUROC/CIs)."""
+        if not self.counts:
+            return pd.DataFrame(columns=["slice", "group", "n"])
+        keys = list(self.counts)
+        counts = np.stack([self.counts[k] for k in keys])
+        table = pd.DataFrame({"slice": [k[0] for k in keys], "group": [k[1] for k in keys],
+                              "n": counts.sum(axis=1), **_rates(counts)})
+        return table[table["n"] >= min_size].sort_values(["slice", "group"], ignore_index=True)
+
+class StreamingEvaluator:
+    """Bundle of the accumulators evaluate needs, updated from record batches."""
+    def __init__(self, attributes=(), intersections=(), n_bins=10_000):
+        self.rows = 0
+        self.confusion = ConfusionAccumulator()
+        self.curve = BinnedCurveAccumulator(n_bins)
+        self.subgroups = SubgroupAccumulator(attributes, intersections)
+        self.has_prob = False
+
+    def update(self, preds: pd.DataFrame, y_true):
+        self.rows += len(preds)
+        self.confusion.update(y_true, preds["y_pred"])
+        if "y_prob" in preds.columns:
+            self.has_prob = True
+            self.curve.update(y_true, preds["y_prob"])
+        self.subgroups.update(preds, y_true, preds["y_pred"])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.confusion.merge(other.confusion)
+        self.curve.merge(other.curve)
+        self.subgroups.merge(other.subgroups)
+        self.has_prob |= other.has_prob
+        return self
+
+    def metrics(self):
+        m = self.confusion.result()
+        m = {"accuracy": m["accuracy"], "f1": m["f1"]}
+        if self.has_prob:
+            m.update(self.curve.result())
+            if self.curve.pos.sum() and self.curve.neg.sum():
+                m["best_thr_f1"], m["best_f1"] = self.curve.best_threshold("f1")
+        m["n"] = int(self.rows)
+        return m
+
+def iter_aligned_batches(pred_path, ytrue_path, batch_size=1_000_000):
+    """Yield (preds DataFrame, y_true array) pairs covering the same rows;
+    the two files may have different row-group layouts, but must have the
+    same number of rows (checked up front from the footers, as exact mode
+    fails on a length mismatch)."""
+    pred_file, ytrue_file = pq.ParquetFile(pred_path), pq.ParquetFile(ytrue_path)
+    n_pred, n_true = pred_file.metadata.num_rows, ytrue_file.metadata.num_rows
+    if n_pred != n_true:
+        raise ValueError(f"{pred_path} has {n_pred} rows but {ytrue_path} has {n_true}.")
+    ytrue_iter = ytrue_file.iter_batches(batch_size=batch_size, columns=["y_true"])
+    buf = np.empty(0, dtype=np.int64)
+    for batch in pred_file.iter_batches(batch_size=batch_size):
+        while len(buf) < batch.num_rows:
+            nxt = next(ytrue_iter)
+            buf = np.concatenate([buf, nxt.column(0).to_numpy(zero_copy_only=False)])
+        yield batch.to_pandas(), buf[:batch.num_rows]
+        buf = buf[batch.num_rows:]
+
+def evaluate_stream(pred_path, ytrue_path, attributes=(), intersections=(), n_bins=10_000,
+                    batch_size=1_000_000) -> StreamingEvaluator:
+    ev = StreamingEvaluator(attributes, intersections, n_bins)
+    for preds, y in iter_aligned_batches(pred_path, ytrue_path, batch_size):
+        ev.update(preds, y)
+    return ev
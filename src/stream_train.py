@@ -0,0 +1,257 @@
+"""
+Out-of-core training: the train -> predict half of src.train without ever
+holding the dataset or the design matrix in memory.
+
+Rows are assigned to train/valid/test by hashing a row key (train.stream_key,
+encounter_id by default; the row position when the file has no such column),
+so no split is materialized and every pass sees the same assignment.
+
+- stats pass: over the train rows of each presets chunk, exact numeric
+  moments, category counts and class counts, plus a uniform row reservoir
+  (numeric medians, and the leakage scan).
+- the preprocessor is built from those statistics as a FrozenPreprocessor
+  (same matrix as basic_preprocess; medians come from the reservoir, means
+  and scales are exact).
+- train.stream_epochs passes of averaged SGDClassifier(log_loss).partial_fit
+  over the shuffled train rows of each chunk. Valid rows are scored before the chunk
+  is learned from (progressive validation), giving a valid AUROC per epoch.
+- a final pass scores valid (final valid AUROC) and test rows, appending
+  preds.parquet / y_true.parquet batch by batch like src.train writes them.
+
+Peak memory is a few chunks plus the reservoir, whatever the file size.
+"""
+import time
+import numpy as np
+import pandas as pd
+
+from .features import FrozenPipeline, FrozenPreprocessor, design_matrix_report, infer_column_types
+from .profiling import span
+from .utils import save_json
+
+TRAIN, VALID, TEST = 0, 1, 2
+
+def hash_split(keys, valid_size=0.2, test_size=0.2, seed=42) -> np.ndarray:
+    """TRAIN/VALID/TEST per row from a seeded 64-bit hash of its key; stable
+    across passes, chunk sizes and runs. hash_array ignores hash_key for
+    numeric arrays, so the seed is mixed into the key hashes and rehashed."""
+    salt = pd.util.hash_array(np.array([seed], dtype=np.uint64))[0]
+    h = pd.util.hash_array(pd.util.hash_array(np.asarray(keys)) ^ salt)
+    u = (h >> np.uint64(11)).astype(np.float64) / 2.0**53  # uniform in [0, 1)
+    return np.where(u < test_size, TEST, np.where(u < test_size + valid_size, VALID, TRAIN)).astype(np.int8)
+
+def iter_split_chunks(csv_path, kind, chunksize, key="encounter_id", target="target",
+                      valid_size=0.2, test_size=0.2, seed=42):
+    """Yield (X, y, split) per presets chunk; the key column is used for the
+    split only and never becomes a feature."""
+    from .presets import iter_dataset
+    offset = 0
+    for chunk in iter_dataset(csv_path, kind=kind, chunksize=chunksize, keep_cols=(key,)):
+        if key in chunk.columns:
+            keys = chunk.pop(key).to_numpy(dtype=np.int64) if pd.api.types.is_numeric_dtype(chunk[key]) \
+                else chunk.pop(key).astype(str).to_numpy()
+        else:
+            keys = np.arange(offset, offset + len(chunk), dtype=np.int64)
+        offset += len(chunk)
+        y = chunk.pop(target).to_numpy(dtype=np.int64)
+        yield chunk, y, hash_split(keys, valid_size, test_size, seed)
+
+class StreamingStats:
+    """One-pass preprocessing statistics (see the module docstring)."""
+    def __init__(self, sample_rows=200_000, seed=0):
+        self.sample_rows = sample_rows
+        self.rng = np.random.default_rng(seed)
+        self.num_cols = self.cat_cols = None
+        self.rows = 0
+        self.class_counts = np.zeros(2, dtype=np.int64)
+        self.sample, self._sample_keys = None, None
+
+    def _init(self, X):
+        self.num_cols, self.cat_cols = infer_column_types(X)
+        k = len(self.num_cols)
+        self.n, self.mean, self.m2 = np.zeros(k), np.zeros(k), np.zeros(k)
+        self.counts = {c: {} for c in self.cat_cols}
+        self.missing = {c: 0 for c in self.cat_cols}
+
+    def update(self, X: pd.DataFrame, y):
+        if self.num_cols is None:
+            self._init(X)
+        if not len(X):
+            return self
+        self.rows += len(X)
+        self.class_counts += np.bincount(np.asarray(y, dtype=np.int64), minlength=2)[:2]
+        if self.num_cols:
+            x = X[self.num_cols].to_numpy(dtype=float, na_value=np.nan)
+            n_b = np.sum(~np.isnan(x), axis=0).astype(float)
+            with np.errstate(invalid="ignore"):
+                mean_b = np.where(n_b > 0, np.nansum(x, axis=0) / np.maximum(n_b, 1), 0.0)
+                m2_b = np.nansum((x - mean_b) ** 2, axis=0)
+            n = self.n + n_b
+            delta = mean_b - self.mean
+            w = np.where(n > 0, self.n * n_b / np.where(n > 0, n, 1), 0.0)
+            self.mean = np.where(n > 0, self.mean + delta * n_b / np.where(n > 0, n, 1), 0.0)
+            self.m2 = self.m2 + m2_b + delta ** 2 * w
+            self.n = n
+        for col in self.cat_cols:
+            vc = X[col].value_counts(dropna=True)
+            counts = self.counts[col]
+            for value, c in zip(vc.index, vc.to_numpy()):
+                if c:
+                    counts[value] = counts.get(value, 0) + int(c)
+            self.missing[col] += int(X[col].isna().sum())
+        self._update_sample(X.assign(target=y))
+        return self
+
+    def _update_sample(self, frame):
+        keys = self.rng.random(len(frame))
+        if self.sample is not None:
+            frame = pd.concat([self.sample, frame], ignore_index=True)
+            keys = np.r_[self._sample_keys, keys]
+        keep = np.sort(np.argsort(keys)[:self.sample_rows])
+        self.sample, self._sample_keys = frame.iloc[keep].reset_index(drop=True), keys[keep]
+
+    def preprocessor(self, numeric_strategy="median", min_frequency=None, max_categories=None,
+                     exclude=()) -> FrozenPreprocessor:
+        """basic_preprocess-equivalent preprocessor from the statistics:
+        impute (median from the reservoir, or exact mean) then standardize
+        with the moments of the imputed column; most-frequent imputation and
+        one-hot for categoricals, folding rare categories like OneHotEncoder's
+        min_frequency/max_categories (missing values count toward the fill)."""
+        if numeric_strategy not in ("median", "mean"):
+            raise ValueError("Streaming mode supports numeric_strategy 'median' or 'mean'.")
+        keep = [i for i, c in enumerate(self.num_cols) if c not in exclude and self.n[i] > 0]
+        cols = [self.num_cols[i] for i in keep]
+        n_obs, mean, m2 = self.n[keep], self.mean[keep], self.m2[keep]
+        if numeric_strategy == "mean":
+            fill = mean
+        else:
+            sample = self.sample[cols].to_numpy(dtype=float, na_value=np.nan)
+            fill = np.where(np.isnan(sample).all(axis=0), mean, np.nanmedian(
+                np.where(np.isnan(sample).all(axis=0), 0.0, sample), axis=0))
+        # moments after imputation: n_miss copies of `fill` join each column
+        n_miss = self.rows - n_obs
+        delta = fill - mean
+        mean_imp = mean + delta * n_miss / self.rows
+        var = (m2 + delta ** 2 * n_obs * n_miss / self.rows) / self.rows
+        scale = np.where(var > 0, np.sqrt(var), 1.0)
+
+        capped = min_frequency is not None or max_categories is not None
+        categories = {}
+        for col in self.cat_cols:
+            counts = self.counts[col]
+            if col in exclude or not counts:
+                continue
+            try:
+                values = sorted(counts)
+            except TypeError:
+                values = sorted(counts, key=str)
+            fill_value = max(values, key=lambda v: counts[v])  # smallest of the tied, like SimpleImputer
+            total = np.array([counts[v] + (self.missing[col] if v == fill_value else 0) for v in values])
+            rare = set()
+            if min_frequency is not None:
+                cut = min_frequency * self.rows if isinstance(min_frequency, float) else min_frequency
+                rare = {v for v, t in zip(values, total) if t < cut}
+            # OneHotEncoder's rule: the cap counts the infrequent column even when empty
+            if max_categories is not None and max_categories < len(values) - len(rare) + 1:
+                keep_n = max_categories - 1
+                order = np.argsort(total, kind="mergesort")
+                rare |= set(values) if keep_n == 0 else {values[i] for i in order[:-keep_n]}
+            categories[col] = (fill_value, [v for v in values if v not in rare],
+                               [v for v in values if v in rare])
+        return FrozenPreprocessor.from_stats(cols, fill, mean_imp, scale, categories,
+                                             unknown_to_rare=capped)
+
+def _append(writers, key, frame, path):
+    import pyarrow as pa, pyarrow.parquet as pq
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if key not in writers:
+        writers[key] = pq.ParquetWriter(path, table.schema)
+    writers[key].write_table(table.cast(writers[key].schema))
+
+def train_streaming(csv_path, kind, cfg: dict, outdir, target="target"):
+    """Fit out of core and write leakage/column-drop reports, design_matrix.json,
+    preds.parquet and y_true.parquet to outdir. Returns (model, report,
+    schema_frame) where schema_frame is an empty frame with the feature dtypes."""
+    from sklearn.linear_model import SGDClassifier
+    from .stream_metrics import BinnedCurveAccumulator
+    from .train import screen_leakage
+    train_cfg = cfg.get("train", {}) or {}
+    feat_cfg = cfg.get("features", {}) or {}
+    if feat_cfg.get("encoding", "onehot") != "onehot":
+        raise ValueError("Streaming mode supports features.encoding='onehot' only.")
+    chunksize = int(train_cfg.get("stream_chunksize", 250_000))
+    key = train_cfg.get("stream_key", "encounter_id")
+    epochs = int(train_cfg.get("stream_epochs", 3))
+    split_params = {"valid_size": float(train_cfg.get("valid_size", 0.2)),
+                    "test_size": float(train_cfg.get("test_size", 0.2)), "seed": int(train_cfg.get("seed", 42))}
+
+    def chunks():
+        return iter_split_chunks(csv_path, kind, chunksize, key, target, **split_params)
+
+    with span("stats"):
+        stats = StreamingStats(sample_rows=int(train_cfg.get("stream_sample_rows", 200_000)))
+        sizes = np.zeros(3, dtype=np.int64)
+        for X, y, split in chunks():
+            sizes += np.bincount(split, minlength=3)
+            tr = split == TRAIN
+            stats.update(X[tr], y[tr])
+    with span("leakage"):  # on the reservoir sample of the train rows
+        screened = screen_leakage(stats.sample, target, cfg, outdir)
+        drops = [c for c in stats.sample.columns if c not in screened.columns]
+    pre = stats.preprocessor(feat_cfg.get("numeric_strategy", "median"), feat_cfg.get("min_frequency"),
+                             feat_cfg.get("max_categories"), exclude=drops)
+    features = [c for c in stats.num_cols + stats.cat_cols if c not in drops]
+
+    clf = SGDClassifier(loss="log_loss", alpha=float(train_cfg.get("stream_alpha", 1e-4)), average=True, random_state=0)
+    rng = np.random.default_rng(0)
+    history = []
+    for epoch in range(epochs):
+        with span(f"sgd_epoch_{epoch}"):
+            t0 = time.perf_counter()
+            curve = BinnedCurveAccumulator(n_bins=1000)
+            for X, y, split in chunks():
+                va, tr = split == VALID, np.flatnonzero(split == TRAIN)
+                if va.any() and hasattr(clf, "coef_"):  # progressive validation
+                    curve.update(y[va], clf.predict_proba(pre.transform(X[va]))[:, 1])
+                if len(tr):
+                    tr = rng.permutation(tr)  # files are often ordered by time
+                    clf.partial_fit(pre.transform(X.iloc[tr]), y[tr], classes=[0, 1])
+            history.append({"epoch": epoch, "seconds": round(time.perf_counter() - t0, 3),
+                            "progressive_valid_roc_auc": curve.result().get("auroc")})
+            print(f"✅ epoch {epoch}: progressive valid AUROC {history[-1]['progressive_valid_roc_auc']}")
+
+    eval_cfg = cfg.get("evaluate", {}) or {}
+    subgroups = [c for c in eval_cfg.get("subgroups", []) or [] if c in stats.sample.columns]
+    writers, design = {}, None
+    with span("score_write"):
+        final = BinnedCurveAccumulator(n_bins=1000)
+        try:
+            for X, y, split in chunks():
+                va, te = split == VALID, split == TEST
+                if va.any():
+                    final.update(y[va], clf.predict_proba(pre.transform(X[va]))[:, 1])
+                if not te.any():
+                    continue
+                X_test = X[te]
+                Xt = pre.transform(X_test)
+                if design is None:
+                    design = design_matrix_report(Xt)
+                dfp = {"y_pred": clf.predict(Xt), "y_prob": clf.predict_proba(Xt)[:, 1]}
+                for col in subgroups:
+                    dfp[col] = X_test[col].to_numpy(dtype=object)
+                _append(writers, "preds", pd.DataFrame(dfp), outdir / "preds.parquet")
+                _append(writers, "y_true", pd.DataFrame({"y_true": y[te]}), outdir / "y_true.parquet")
+        finally:
+            for w in writers.values():
+                w.close()
+    if design is not None:
+        design["est_train_mb"] = design["bytes_per_row"] * int(sizes[TRAIN]) / 2**20
+        design["encoding"] = "onehot"
+        design["mode"] = "streaming"
+        save_json(design, outdir / "design_matrix.json")
+
+    report = {"mode": "streaming", "split_key": key, "n_train": int(sizes[TRAIN]),
+              "n_valid": int(sizes[VALID]), "n_test": int(sizes[TEST]),
+              "epochs": history, "valid_roc_auc": final.result().get("auroc"),
+              "leakage_scan_rows": int(len(stats.sample))}
+    model = FrozenPipeline.from_parts(pre, clf)
+    return model, report, stats.sample[features].head(0)
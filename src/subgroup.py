@@ -1,16 +1,143 @@
+import warnings
+import numpy as np
 import pandas as pd
-from sklearn.metrics import accuracy_score, f1_score
+
+def _safe_div(num, den):
+    num = np.asarray(num, dtype=float); den = np.asarray(den, dtype=float)
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+def _group_codes(df: pd.DataFrame, cols):
+    """Integer group code per row (-1 where any attribute is missing) and
+    the group labels, for one attribute or an intersection of several."""
+    cols = [cols] if isinstance(cols, str) else list(cols)
+    codes, uniques = pd.MultiIndex.from_frame(df[cols]).factorize() if len(cols) > 1 \
+        else pd.factorize(df[cols[0]])
+    if len(cols) > 1:
+        missing = df[cols].isna().any(axis=1).to_numpy()
+        codes = np.where(missing, -1, codes)
+        labels = [" & ".join(str(v) for v in u) for u in uniques]
+    else:
+        labels = [str(u) for u in uniques]
+    return np.asarray(codes), labels
+
+def _confusion_counts(codes, y, yp, n_groups):
+    tp = np.bincount(codes, weights=y & yp, minlength=n_groups)
+    fp = np.bincount(codes, weights=~y & yp, minlength=n_groups)
+    fn = np.bincount(codes, weights=y & ~yp, minlength=n_groups)
+    tn = np.bincount(codes, weights=~y & ~yp, minlength=n_groups)
+    return np.stack([tp, fp, fn, tn], axis=-1)
+
+def _rates(counts):
+    """accuracy/f1/tpr/fpr from [..., (tp, fp, fn, tn)] counts; empty
+    denominators give 0 for f1 (sklearn's zero_division) and NaN otherwise."""
+    tp, fp, fn, tn = np.moveaxis(counts, -1, 0)
+    f1 = _safe_div(2 * tp, 2 * tp + fp + fn)
+    return {
+        "accuracy": _safe_div(tp + tn, tp + fp + fn + tn),
+        "f1": np.nan_to_num(f1, nan=0.0),
+        "tpr": _safe_div(tp, tp + fn),
+        "fpr": _safe_div(fp, fp + tn),
+    }
+
+def _grouped_auroc(codes, y, prob, n_groups):
+    """Rank-based (Mann-Whitney) AUROC for every group from one lexsort."""
+    order = np.lexsort((prob, codes))
+    g, p, yy = codes[order], prob[order], y[order]
+    n = g.size
+    new_run = np.r_[True, (g[1:] != g[:-1]) | (p[1:] != p[:-1])]
+    starts = np.flatnonzero(new_run)
+    ends = np.r_[starts[1:], n] - 1
+    run_id = np.cumsum(new_run) - 1
+    group_start = np.r_[0, np.cumsum(np.bincount(g, minlength=n_groups))][g]
+    rank = (starts[run_id] + ends[run_id]) / 2.0 - group_start + 1  # tie-averaged, 1-based
+    n_pos = np.bincount(g, weights=yy, minlength=n_groups)
+    n_neg = np.bincount(g, minlength=n_groups) - n_pos
+    rank_sum = np.bincount(g, weights=rank * yy, minlength=n_groups)
+    return _safe_div(rank_sum - n_pos * (n_pos + 1) / 2.0, n_pos * n_neg)
+
+def _bootstrap_ci(counts, n_boot, ci, seed, block=200):
+    """Percentile CIs by resampling each group's rows. The rate metrics only
+    depend on the (tp, fp, fn, tn) cell counts, so a resample is one
+    multinomial draw per group, done for all groups and replicates at once."""
+    rng = np.random.default_rng(seed)
+    n = counts.sum(axis=-1)
+    pvals = counts / np.maximum(n, 1)[:, None]
+    draws = {k: [] for k in ("accuracy", "f1", "tpr", "fpr")}
+    for start in range(0, n_boot, block):
+        b = min(block, n_boot - start)
+        sim = rng.multinomial(n.astype(np.int64), pvals, size=(b, len(n)))
+        for k, v in _rates(sim).items():
+            draws[k].append(v)
+    alpha = (1 - ci) / 2
+    out = {}
+    for k, chunks in draws.items():
+        arr = np.concatenate(chunks, axis=0)
+        with warnings.catch_warnings():  # groups without positives/negatives have no tpr/fpr
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lo, hi = np.nanquantile(arr, [alpha, 1 - alpha], axis=0)
+        out[f"{k}_lo"], out[f"{k}_hi"] = lo, hi
+    return out
+
+def subgroup_report(df: pd.DataFrame, y_true, y_pred, attributes, y_prob=None, intersections=(),
+                    min_size=10, n_boot=0, ci=0.95, seed=0) -> pd.DataFrame:
+    """Per-group metrics for many attributes and their intersections.
+
+    Every slice is one factorize + a few bincounts over all rows, so
+    thousands of intersectional groups cost about as much as one.
+    - attributes: columns of df to slice on one at a time
+    - intersections: iterables of columns, e.g. [("race", "gender")]
+    - y_prob adds a per-group AUROC (NaN for single-class groups)
+    - n_boot > 0 adds percentile CIs for accuracy/f1/tpr/fpr
+    Groups smaller than min_size are dropped. Returns one row per group.
+    """
+    y = np.asarray(y_true) == 1
+    yp = np.asarray(y_pred) == 1
+    prob = None if y_prob is None else np.asarray(y_prob, dtype=float)
+    slices = [(a,) for a in attributes] + [tuple(t) for t in intersections]
+    frames = []
+    for cols in slices:
+        if any(c not in df.columns for c in cols):
+            continue
+        codes, labels = _group_codes(df, cols if len(cols) > 1 else cols[0])
+        valid = codes >= 0
+        c, n_groups = codes[valid], len(labels)
+        counts = _confusion_counts(c, y[valid], yp[valid], n_groups)
+        table = {"slice": " & ".join(cols), "group": labels,
+                 "n": counts.sum(axis=1).astype(int), **_rates(counts)}
+        if prob is not None:
+            table["auroc"] = _grouped_auroc(c, y[valid], prob[valid], n_groups)
+        if n_boot:
+            table.update(_bootstrap_ci(counts, n_boot, ci, seed))
+        frames.append(pd.DataFrame(table))
+    if not frames:
+        return pd.DataFrame(columns=["slice", "group", "n"])
+    out = pd.concat(frames, ignore_index=True)
+    return out[out["n"] >= min_size].sort_values(["slice", "group"], ignore_index=True)
+
+def report_to_dict(report: pd.DataFrame) -> dict:
+    """{slice: {group: {metric: value}}} for JSON reports."""
+    out = {}
+    for slice_name, part in report.groupby("slice", sort=False):
+        rows = part.drop(columns=["slice"]).set_index("group")
+        out[slice_name] = {g: {k: (None if pd.isna(v) else (int(v) if k == "n" else float(v)))
+                               for k, v in r.items()} for g, r in rows.iterrows()}
+    return out
 
 def subgroup_metrics(df: pd.DataFrame, y_true, y_pred, col: str):
     """Return accuracy/F1 per subgroup value for a categorical column."""
     if col not in df.columns:
         return {}
+    rows = subgroup_report(df, y_true, y_pred, [col]).set_index("group")
+    values = list(df[col].dropna().unique())
+    try:  # value order (5 before 15), as before; labels only for mixed types
+        values = sorted(values)
+    except TypeError:
+        values = sorted(values, key=str)
     results = {}
-    for val in sorted(df[col].dropna().unique()):
-        mask = df[col] == val
-        if mask.sum() < 10:
-            continue
-        acc = accuracy_score(y_true[mask], y_pred[mask])
-        f1 = f1_score(y_true[mask], y_pred[mask], average="binary")
-        results[str(val)] = {"n": int(mask.sum()), "accuracy": acc, "f1": f1}
+    for label in dict.fromkeys(str(v) for v in values):
+        if label in rows.index:
+            r = rows.loc[label]
+            results[label] = {"n": int(r["n"]), "accuracy": float(r["accuracy"]), "f1": float(r["f1"])}
     return results
@@ -1,26 +1,86 @@
 import numpy as np
-from sklearn.metrics import f1_score, accuracy_score, precision_score, recall_score, roc_auc_score
-
-def find_best_threshold(y_true, y_prob, metric="f1", step=0.01):
-    """Grid search thresholds for binary probs to maximize a metric."""
-    best_thr, best_score = 0.5, -1
-    for thr in np.arange(0, 1+step, step):
-        y_pred = (y_prob >= thr).astype(int)
-        if metric == "f1":
-            score = f1_score(y_true, y_pred)
-        elif metric == "accuracy":
-            score = accuracy_score(y_true, y_pred)
-        elif metric == "precision":
-            score = precision_score(y_true, y_pred)
-        elif metric == "recall":
-            score = recall_score(y_true, y_pred)
-        elif metric == "roc_auc":
-            try:
-                score = roc_auc_score(y_true, y_prob)
-            except Exception:
-                score = -1
-        else:
-            raise ValueError(f"Unsupported metric: {metric}")
-        if score > best_score:
-            best_thr, best_score = thr, score
+
+CURVE_METRICS = ("f1", "accuracy", "precision", "recall", "youden", "cost")
+
+def _safe_div(num, den):
+    num = np.asarray(num, dtype=float); den = np.asarray(den, dtype=float)
+    out = np.zeros_like(num)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+def threshold_curve(y_true, y_prob, thresholds=None, cost_fp=1.0, cost_fn=1.0):
+    """Confusion counts and metrics at every threshold (predict 1 when prob >= thr).
+
+    Sorts the probabilities once and reads the counts for each cut from a
+    cumulative sum, so the whole curve costs O(n log n).
+    - thresholds=None uses every distinct probability plus one cut above the max
+      (predict all negative), which contains the exact optimum of every metric.
+    - 'cost' is the negated mean misclassification cost, so higher is better.
+    Returns a dict of equal-length NumPy arrays, thresholds ascending.
+    """
+    y = np.asarray(y_true) == 1
+    p = np.asarray(y_prob, dtype=float)
+    order = np.argsort(p, kind="mergesort")
+    p_sorted, y_sorted = p[order], y[order]
+    n = p.size
+    n_pos = int(y.sum()); n_neg = n - n_pos
+
+    if thresholds is None:
+        uniq = np.unique(p_sorted)
+        top = np.nextafter(uniq[-1], np.inf) if uniq.size else 1.0
+        thresholds = np.r_[uniq, top]
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    # pos_from[k] = number of positives among p_sorted[k:]
+    pos_from = np.r_[np.cumsum(y_sorted[::-1])[::-1], 0]
+    k = np.searchsorted(p_sorted, thresholds, side="left")
+    tp = pos_from[k]
+    fp = (n - k) - tp
+    fn = n_pos - tp
+    tn = n_neg - fp
+
+    recall = _safe_div(tp, n_pos)
+    fpr = _safe_div(fp, n_neg)
+    return {
+        "threshold": thresholds,
+        "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+        "precision": _safe_div(tp, tp + fp),
+        "recall": recall,
+        "fpr": fpr,
+        "f1": _safe_div(2 * tp, 2 * tp + fp + fn),
+        "accuracy": _safe_div(tp + tn, n),
+        "youden": recall - fpr,
+        "cost": -_safe_div(cost_fp * fp + cost_fn * fn, n),
+    }
+
+def find_best_threshold(y_true, y_prob, metric="f1", step=0.01, mode="exact",
+                        return_curve=False, cost_fp=1.0, cost_fn=1.0):
+    """Search thresholds for binary probs to maximize a metric.
+    - mode='exact' scans every distinct probability (exact optimum)
+    - mode='grid' scans np.arange(0, 1+step, step) like the original search
+    - metric: f1 | accuracy | precision | recall | youden | cost | roc_auc
+    Ties resolve to the lowest threshold. With return_curve=True the full
+    curve from threshold_curve is returned as a third element.
+    """
+    if mode not in ("exact", "grid"):
+        raise ValueError(f"Unsupported mode: {mode}")
+    if metric == "roc_auc":
+        # threshold-free: report it against the lowest threshold, as before
+        from sklearn.metrics import roc_auc_score
+        try:
+            score = float(roc_auc_score(y_true, y_prob))
+        except Exception:
+            score = -1.0
+        if return_curve:
+            return 0.0, score, threshold_curve(y_true, y_prob, cost_fp=cost_fp, cost_fn=cost_fn)
+        return 0.0, score
+    if metric not in CURVE_METRICS:
+        raise ValueError(f"Unsupported metric: {metric}")
+
+    grid = np.arange(0, 1+step, step) if mode == "grid" else None
+    curve = threshold_curve(y_true, y_prob, thresholds=grid, cost_fp=cost_fp, cost_fn=cost_fn)
+    best = int(np.argmax(curve[metric]))
+    best_thr, best_score = float(curve["threshold"][best]), float(curve[metric][best])
+    if return_curve:
+        return best_thr, best_score, curve
     return best_thr, best_score
@@ -1,22 +1,11 @@
 import argparse
 from pathlib import Path
-import pandas as pd
-import yaml
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import cross_val_score
-import pyarrow as pa, pyarrow.parquet as pq
-
-from .presets import load_dataset
-from .data import train_valid_test_split
-from .features import basic_preprocess
-from .utils import save_json
-from .leakage import detect_leakage
-
-import sys
-# allow importing paths.py from project root: src/ -> project root
-sys.path.append(str(Path(__file__).resolve().parents[1]))
-from paths import report_path  # safe top-level path helper
+
+# CLI modules import pandas/sklearn/pyarrow inside the functions that use
+# them, so `--help` stays fast (tests/test_startup.py checks this)
+from .utils import save_json, load_config
+from .io_utils import report_path  # safe top-level path helper
+from .profiling import RunProfile, span
 
 def _resolve_outdir(arg_output_dir: str) -> Path:
     """
@@ -33,48 +22,43 @@ def _resolve_outdir(arg_output_dir: str) -> Path:
     return target
 # --- end of new block ---
 
-def parse_args():
-    p = argparse.ArgumentParser()
-    p.add_argument("--csv_path", type=str, required=True, help="Path to input CSV.")
-    p.add_argument("--kind", type=str, default=None, choices=["uci_hospitals","pima"], help="Dataset kind (overrides config).")
-    p.add_argument("--output_dir", type=str, default="models/run_001", help="Where to write predictions and artifacts.")
-    p.add_argument("--config", type=str, default="config.yaml", help="Path to YAML config.")
-    return p.parse_args()
-
-def parse_args():
+def parse_args(argv=None):
     p = argparse.ArgumentParser()
     p.add_argument("--csv_path", type=str, required=True, help="Path to input CSV.")
     p.add_argument("--kind", type=str, default=None, choices=["uci_hospitals","pima"], help="Dataset kind (overrides config).")
     p.add_argument("--output_dir", type=str, default="output", help="Where to write predictions and artifacts.")
     p.add_argument("--config", type=str, default="config.yaml", help="Path to YAML config.")
-    return p.parse_args()
-
-def load_config(path: str):
-    p = Path(path)
-    if not p.exists():
-        return {}
-    with p.open("r") as f:
-        return yaml.safe_load(f) or {}
-
-def main():
-    args = parse_args()
-    cfg = load_config(args.config)
-
-    # Resolve dataset kind: CLI arg wins, else config, else default
-    kind = args.kind or cfg.get("dataset", {}).get("kind", "uci_hospitals")
-
-    df = load_dataset(args.csv_path, kind=kind)
+    p.add_argument("--mode", type=str, default=None, choices=["auto", "exact", "streaming"],
+                   help="streaming = out-of-core SGD over chunks (overrides config).")
+    p.add_argument("--profile", action="store_true",
+                   help="Trace allocations and dump cProfile stats for the slowest stage (slower).")
+    return p.parse_args(argv)
+
+def load_frame(csv_path: str, kind, cfg: dict):
+    """Load and clean the dataset per the dataset/data config sections."""
+    from .presets import load_dataset
+    kind = kind or cfg.get("dataset", {}).get("kind", "uci_hospitals")
+    data_cfg = cfg.get("data", {}) or {}
+    df = load_dataset(csv_path, kind=kind,
+                      chunksize=data_cfg.get("chunksize"),
+                      cache=bool(data_cfg.get("cache", False)))
     target = "target"
     if target not in df.columns:
         raise ValueError(f"Target '{target}' not found after loading. Columns include: {list(df.columns)[:10]} ...")
-
-    outdir = Path(args.output_dir)
-    outdir.mkdir(parents=True, exist_ok=True)
-
-    # ---- Leakage detection BEFORE splitting ----
-    id_thr = cfg.get("leakage", {}).get("id_threshold", 0.90)
-    corr_thr = cfg.get("leakage", {}).get("corr_threshold", 0.95)
-    leaks = detect_leakage(df.copy(), target=target, id_threshold=id_thr, corr_threshold=corr_thr)
+    return df, target
+
+def screen_leakage(df, target: str, cfg: dict, outdir: Path):
+    """Leakage scan + configured drops; writes leakage_report.json and
+    column_drop_report.json to outdir. Returns the screened frame."""
+    from .leakage import detect_leakage
+    leak_cfg = cfg.get("leakage", {}) or {}
+    leaks = detect_leakage(
+        df, target=target,
+        id_threshold=leak_cfg.get("id_threshold", 0.90),
+        corr_threshold=leak_cfg.get("corr_threshold", 0.95),
+        purity_threshold=leak_cfg.get("purity_threshold", 0.95),
+        approx_unique=leak_cfg.get("approx_unique", False),
+    )
     leak_report = [{"column": c, "reason": r} for (c, r) in leaks]
     save_json({"suspected_leaks": leak_report}, outdir/"leakage_report.json")
 
@@ -100,38 +84,149 @@ def main():
         "auto_drop": auto_drop,
         "allowlist": list(allowlist)
     }, outdir/"column_drop_report.json")
+    return df
 
-    # ---- Split and fit ----
-    (X_train, y_train), (X_valid, y_valid), (X_test, y_test) = train_valid_test_split(df, target=target)
-    full = pd.concat([X_train, X_valid, X_test], axis=0)
+def prepare_frame(csv_path: str, kind, cfg: dict, output_dir):
+    """Load, clean and leakage-screen the dataset; writes the leakage and
+    column-drop reports to output_dir. Returns (df, target, outdir)."""
+    df, target = load_frame(csv_path, kind, cfg)
+    outdir = Path(output_dir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    # ---- Leakage detection BEFORE splitting ----
+    df = screen_leakage(df, target, cfg, outdir)
+    return df, target, outdir
+
+def split_rows(df, target: str, cfg: dict) -> dict:
+    """Train/valid/test row indices for df, reused from data/cache/splits
+    when the same target column was split before (data.split_cache)."""
+    from .data import cached_split
+    train_cfg = cfg.get("train", {}) or {}
+    cdir = None
+    if (cfg.get("data", {}) or {}).get("split_cache", True):
+        from .preset_cache import cache_dir
+        cdir = cache_dir()
+    return cached_split(df[target].to_numpy(), seed=int(train_cfg.get("seed", 42)),
+                        valid_size=float(train_cfg.get("valid_size", 0.2)),
+                        test_size=float(train_cfg.get("test_size", 0.2)), cache_dir=cdir)
+
+def fit_pipeline(X_train, y_train, cfg: dict):
+    """Build preprocess + classifier from the features/train sections, run
+    CV and the final fit together. Returns (pipeline, cv_report)."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from .features import basic_preprocess
+    from .cv import cross_validate_and_fit
+    feat_cfg = cfg.get("features", {}) or {}
+    train_cfg = cfg.get("train", {}) or {}
+    memory = None
+    if train_cfg.get("transformer_cache", False):
+        # fitted preprocessors are memoized on disk, keyed by params + data,
+        # so re-runs on the same split skip refitting them
+        from joblib import Memory
+        from .preset_cache import cache_dir
+        memory = Memory(cache_dir() / "transformers", verbose=0)
     pipeline = Pipeline([
-        ("pre", basic_preprocess(full)),
+        # column types come from X_train's dtypes; all splits share them
+        ("pre", basic_preprocess(X_train, **feat_cfg)),
         ("clf", LogisticRegression(max_iter=200))
-    ])
-
-    # CV sanity
-    try:
-        cv = cross_val_score(pipeline, X_train, y_train, cv=3, scoring="roc_auc")
-        cv_scores = {"cv_roc_auc_mean": float(cv.mean()), "cv_roc_auc_std": float(cv.std())}
-    except Exception:
-        cv_scores = {}
-
-    pipeline.fit(X_train, y_train)
-
-    # Predict
-    y_pred = pipeline.predict(X_test)
-    try:
-        y_prob = pipeline.predict_proba(X_test)[:, 1]
-    except Exception:
-        y_prob = None
+    ], memory=memory)
+
+    # CV sanity + final fit, run together in one process pool
+    return cross_validate_and_fit(
+        pipeline, X_train, y_train,
+        cv=int(train_cfg.get("cv_folds", 3)), scoring="roc_auc",
+        n_jobs=train_cfg.get("n_jobs", 1),
+    )
+
+def write_predictions(pipeline, X_test, y_test, n_train: int, cfg: dict, outdir: Path, split_fingerprint=None):
+    """Score the test split; writes preds.parquet (plus the evaluate.subgroups
+    columns, and split_fingerprint in its metadata), y_true.parquet and
+    design_matrix.json."""
+    import pandas as pd
+    import pyarrow as pa, pyarrow.parquet as pq
+    from .data import SPLIT_META_KEY
+    from .features import design_matrix_report
+    feat_cfg = cfg.get("features", {}) or {}
+    # Predict: transform X_test once, reuse it for labels, probs and the size report
+    with span("predict"):
+        Xt_test = pipeline.named_steps["pre"].transform(X_test)
+        clf = pipeline.named_steps["clf"]
+        y_pred = clf.predict(Xt_test)
+        try:
+            y_prob = clf.predict_proba(Xt_test)[:, 1]
+        except Exception:
+            y_prob = None
+    design = design_matrix_report(Xt_test)
+    design["est_train_mb"] = design["bytes_per_row"] * n_train / 2**20
+    design["encoding"] = feat_cfg.get("encoding", "onehot")
+    save_json(design, outdir/"design_matrix.json")
 
     # Save outputs
-    pq.write_table(pa.Table.from_pandas(pd.DataFrame({"y_true": y_test})), outdir/"y_true.parquet")
-    dfp = {"y_pred": y_pred}
-    if y_prob is not None:
-        dfp["y_prob"] = y_prob
-    pq.write_table(pa.Table.from_pandas(pd.DataFrame(dfp)), outdir/"preds.parquet")
-    save_json(cv_scores, outdir/"cv_scores.json")
+    with span("write_parquet"):
+        pq.write_table(pa.Table.from_pandas(pd.DataFrame({"y_true": y_test})), outdir/"y_true.parquet")
+        dfp = {"y_pred": y_pred}
+        if y_prob is not None:
+            dfp["y_prob"] = y_prob
+        # subgroup attributes ride along so evaluate can slice without the raw data
+        eval_cfg = cfg.get("evaluate", {}) or {}
+        for col in eval_cfg.get("subgroups", []) or []:
+            if col in X_test.columns:
+                dfp[col] = X_test[col].to_numpy()
+        table = pa.Table.from_pandas(pd.DataFrame(dfp))
+        if split_fingerprint:  # lets evaluate tie the preds to the split.npz they came from
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                   SPLIT_META_KEY: split_fingerprint.encode()})
+        pq.write_table(table, outdir/"preds.parquet")
+
+def main(argv=None):
+    args = parse_args(argv)
+    from .data import save_split, split_xy
+    from .model_io import save_model
+    cfg = load_config(args.config)
+    kind = args.kind or cfg.get("dataset", {}).get("kind", "uci_hospitals")
+    outdir = Path(args.output_dir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    train_cfg = cfg.get("train", {}) or {}
+    mode = args.mode or train_cfg.get("mode", "exact")
+    if mode == "auto":
+        size_mb = Path(args.csv_path).stat().st_size / 2**20
+        mode = "streaming" if size_mb > float(train_cfg.get("stream_above_mb", 4096)) else "exact"
+    if mode == "streaming":
+        from .stream_train import train_streaming
+        # rows are hash-split, not index-split: a split.npz from an earlier
+        # exact run in this outdir would not describe these predictions
+        (outdir/"split.npz").unlink(missing_ok=True)
+        with RunProfile(profile=args.profile) as prof:
+            model, report, schema = train_streaming(args.csv_path, kind, cfg, outdir)
+            save_json(report, outdir/"cv_scores.json")
+            save_model(model, outdir, schema, kind=kind, target="target",
+                       extra={"n_train": report["n_train"], "mode": "streaming"})
+        prof.write(outdir, "train")
+        return
+
+    # spans land in run_profile.json next to cv_scores.json
+    with RunProfile(profile=args.profile) as prof:
+        with span("load"):
+            df, target = load_frame(args.csv_path, kind, cfg)
+        with span("leakage"):  # BEFORE splitting
+            df = screen_leakage(df, target, cfg, outdir)
+
+        # ---- Split and fit ----
+        with span("split"):  # indices only; rows are taken per split as needed
+            idx = split_rows(df, target, cfg)
+            save_split(idx, outdir/"split.npz", idx["fingerprint"])
+            X_train, y_train = split_xy(df, idx["train"], target)
+            X_test, y_test = split_xy(df, idx["test"], target)
+            del df
+        with span("cv_fit"):  # CV folds and the final fit share one process pool
+            pipeline, cv_scores = fit_pipeline(X_train, y_train, cfg)  # cv_roc_auc_mean/std plus per-fold scores and timings
+        with span("predict_write"):
+            write_predictions(pipeline, X_test, y_test, len(X_train), cfg, outdir, idx["fingerprint"])
+        save_json(cv_scores, outdir/"cv_scores.json")
+        with span("save_model"):
+            save_model(pipeline, outdir, X_train, kind=kind, target=target,
+                       extra={"split_fingerprint": idx["fingerprint"]})
+    prof.write(outdir, "train")
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,15 @@
 import json
 from pathlib import Path
 
+def load_config(path: str):
+    """YAML config as a dict ({} if the file is missing)."""
+    import yaml
+    p = Path(path)
+    if not p.exists():
+        return {}
+    with p.open("r") as f:
+        return yaml.safe_load(f) or {}
+
 def save_json(obj, path):
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -16,10 +25,14 @@ def _parse_args_quick():
 
 def _plot_metrics(metrics, out_path):
     import matplotlib.pyplot as plt
-    keys = list(metrics.keys())
+    metrics = metrics.get("metrics", metrics)  # evaluate's metrics.json nests them
+    ci = metrics.get("ci", {})
+    keys = [k for k, v in metrics.items() if isinstance(v, float)]
     vals = [metrics[k] for k in keys]
+    err = [[v - ci[k][0] if k in ci else 0 for k, v in zip(keys, vals)],
+           [ci[k][1] - v if k in ci else 0 for k, v in zip(keys, vals)]]
     plt.figure()
-    plt.bar(keys, vals)
+    plt.bar(keys, vals, yerr=err if ci else None, capsize=3)
     plt.title("Baseline Metrics")
     plt.ylabel("Score")
     plt.xticks(rotation=45, ha="right")
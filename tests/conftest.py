@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def mixed_frame():
+    """500 rows of numeric (num_a with NaNs), all-NaN, categorical (cat_a with
+    None) columns and a binary target driven by num_a."""
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        "num_a": rng.normal(size=n),
+        "num_b": rng.integers(0, 50, n).astype(float),
+        "empty": np.nan,
+        "cat_a": rng.choice(["x", "y", "z", None], n),
+        "cat_b": rng.choice(["lo", "mid", "hi"], n),
+    })
+    df["target"] = (df["num_a"] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    df.loc[::7, "num_a"] = np.nan
+    return df
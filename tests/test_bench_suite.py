@@ -0,0 +1,21 @@
+from benchmarks.suite import compare, run_cases
+from benchmarks.synth import write_dataset
+
+def _res(case, wall, rows=10_000):
+    return {"kind": "pima", "rows": rows, "case": case, "wall_s": wall}
+
+def test_compare_flags_only_real_slowdowns():
+    base = {"results": [_res("fit", 1.0), _res("tiny", 0.01), _res("steady", 2.0)]}
+    now = {"results": [_res("fit", 1.5), _res("tiny", 0.03), _res("steady", 2.2), _res("new", 9.0)]}
+    slow = compare(now, base, tolerance=0.25)
+    assert [s["case"] for s in slow] == ["fit"] and slow[0]["ratio"] == 1.5
+
+def test_run_cases_records_each_case(tmp_path, monkeypatch):
+    monkeypatch.setenv("DIABETES_CACHE_DIR", str(tmp_path / "cache"))  # train_main caches its split
+    csv = write_dataset(tmp_path / "pima.csv", 2000, "pima")
+    cases = ["load_dataset", "detect_leakage", "preprocess_fit", "train_main",
+             "find_best_threshold", "subgroup_metrics"]
+    records = run_cases("pima", 2000, csv, tmp_path, cases=cases)
+    assert [r["case"] for r in records] == cases
+    assert all(r["wall_s"] >= 0 and r["peak_rss_mb"] > 0 for r in records)
+    assert {"load", "cv_fit"} <= set(records[3]["stages"])
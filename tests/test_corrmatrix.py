@@ -46,3 +46,22 @@ def test_quick_corr_plot(tmp_path):
     # Expected output files
     assert (tmp_path / "tiny_corr_pearson.csv").exists()
     assert (tmp_path / "tiny_scatter_matrix_pearson.png").exists()
+
+def test_large_frame_uses_density_panels():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=30_000)
+    df = pd.DataFrame({"x": x, "y": 0.7 * x + rng.normal(size=x.size), "z": rng.normal(size=x.size)})
+    corr, fig = scatter_matrix_with_corr(df, show=False, show_colorbar=False)
+    assert np.allclose(corr.to_numpy(), df.corr().to_numpy())
+    from matplotlib.collections import QuadMesh
+    panel = fig.axes[3]  # row 1, col 0
+    assert isinstance(panel.collections[0], QuadMesh)
+    assert panel.collections[0].get_rasterized()
+
+def test_stratified_sample_keeps_class_share():
+    import numpy as np
+    from ds_viz.corrmatrix import _sample_index
+    strata = np.r_[np.zeros(9000), np.ones(1000)]
+    idx = _sample_index(np.ones(10_000, bool), 500, np.random.default_rng(0), strata)
+    assert len(idx) == 500 and (strata[idx] == 1).sum() == 50
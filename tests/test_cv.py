@@ -0,0 +1,16 @@
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import cross_val_score
+from src.cv import cross_validate_and_fit
+
+def test_matches_cross_val_score_and_reports_folds():
+    X, y = make_classification(n_samples=300, n_features=8, random_state=0)
+    clf = LogisticRegression(max_iter=200)
+    ref = cross_val_score(clf, X, y, cv=3, scoring="roc_auc")
+    for n_jobs in (1, 2):
+        fitted, report = cross_validate_and_fit(clf, X, y, cv=3, n_jobs=n_jobs)
+        assert np.isclose(report["cv_roc_auc_mean"], ref.mean())
+        assert [f["fold"] for f in report["folds"]] == [0, 1, 2]
+        assert all(f["fit_s"] > 0 for f in report["folds"])
+        np.testing.assert_allclose(fitted.coef_, clf.fit(X, y).coef_)
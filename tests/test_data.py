@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from src.data import cached_split, load_split, save_split, split_indices, split_xy, train_valid_test_split
+
+def test_indices_match_frame_split(mixed_frame):
+    df = mixed_frame.set_axis(np.random.default_rng(1).permutation(500) + 1000)  # positions, not labels
+    X, y = df.drop(columns=["target"]), df["target"]
+    X_temp, X_test, y_temp, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train, X_valid, _, _ = train_test_split(X_temp, y_temp, test_size=0.25, random_state=42, stratify=y_temp)
+    idx = split_indices(df["target"].to_numpy())
+    assert idx["train"].dtype == np.int32
+    for name, ref in [("train", X_train), ("valid", X_valid), ("test", X_test)]:
+        pd.testing.assert_frame_equal(split_xy(df, idx[name], "target")[0], ref)
+    (Xt, yt), _, _ = train_valid_test_split(df, target="target")
+    pd.testing.assert_frame_equal(Xt, X_train)
+    assert "target" not in Xt.columns and yt.name == "target"
+
+def test_indices_partition_rows(mixed_frame):
+    idx = split_indices(mixed_frame["target"].to_numpy())
+    allrows = np.concatenate([idx["train"], idx["valid"], idx["test"]])
+    assert np.array_equal(np.sort(allrows), np.arange(500))
+
+def test_cached_split_round_trip(tmp_path, mixed_frame):
+    y = mixed_frame["target"].to_numpy()
+    first = cached_split(y, cache_dir=tmp_path)
+    cached = list((tmp_path / "splits").glob("*.npz"))
+    assert [p.stem for p in cached] == [first["fingerprint"]]
+    again = cached_split(y, cache_dir=tmp_path)
+    for k in ("train", "valid", "test"):
+        assert np.array_equal(first[k], again[k])
+    assert again["fingerprint"] == first["fingerprint"]
+    assert cached_split(y, seed=1)["fingerprint"] != first["fingerprint"]
+    loaded = load_split(save_split(first, tmp_path / "split.npz", first["fingerprint"]))
+    assert loaded["fingerprint"] == first["fingerprint"]
+
+def test_evaluate_ties_preds_to_split_by_fingerprint(tmp_path, monkeypatch, mixed_frame):
+    import pyarrow as pa, pyarrow.parquet as pq
+    import pytest
+    from src import evaluate
+    from src.data import SPLIT_META_KEY
+    from src.evaluate import _split_provenance
+    idx = cached_split(mixed_frame["target"].to_numpy())
+    save_split(idx, tmp_path / "split.npz", idx["fingerprint"])
+    preds = pa.table({"y_prob": np.zeros(len(idx["test"]))})
+
+    def provenance(table):
+        pq.write_table(table, tmp_path / "preds.parquet")
+        return _split_provenance(tmp_path / "preds.parquet", pq.ParquetFile(tmp_path / "preds.parquet"))
+    assert provenance(preds) is None  # e.g. a streaming run: not written from this split
+    tagged = preds.replace_schema_metadata({SPLIT_META_KEY: idx["fingerprint"].encode()})
+    assert provenance(tagged) == {"fingerprint": idx["fingerprint"], "n_train": 300, "n_valid": 100, "n_test": 100}
+    with pytest.raises(ValueError, match="different runs"):
+        provenance(preds.replace_schema_metadata({SPLIT_META_KEY: b"0" * 20}))
+
+    def never(*a):
+        raise AssertionError("evaluated before the split check")
+    monkeypatch.setattr(evaluate, "evaluate_exact", never)
+    with pytest.raises(ValueError, match="different runs"):  # stale split.npz fails up front
+        evaluate.run_evaluate(tmp_path / "preds.parquet", tmp_path / "y.parquet", tmp_path / "m.json", {})
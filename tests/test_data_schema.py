@@ -1,3 +1,38 @@
-def test_placeholder():
-    # Replace with real schema tests after adding your CSV
-    assert 1 + 1 == 2
+from pathlib import Path
+import pandas as pd
+import pytest
+from benchmarks.synth import AGE_BRACKETS, make_pima_frame, make_uci_frame, write_dataset
+from src.presets import PIMA_SCHEMA, UCI_SCHEMA, load_dataset
+
+RAW = Path(__file__).resolve().parents[1] / "data" / "raw" / "diabetes.csv"
+
+def test_synthetic_frames_match_schemas():
+    uci, pima = make_uci_frame(5000), make_pima_frame(5000)
+    assert set(uci.columns) == set(UCI_SCHEMA)
+    assert set(pima.columns) == set(PIMA_SCHEMA)
+    assert set(uci["age"]) <= set(AGE_BRACKETS)
+    assert (uci[["race", "payer_code", "medical_specialty", "diag_1"]] == "?").any().all()
+    assert uci["medical_specialty"].nunique() > 50 and uci["diag_1"].nunique() > 500
+    assert uci["patient_nbr"].nunique() < len(uci)  # repeat encounters
+    assert set(pima["Outcome"]) == {0, 1}
+    assert (pima[["Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI"]] == 0).any().all()
+
+@pytest.mark.parametrize("kind", ["uci_hospitals", "pima"])
+def test_written_files_load_through_presets(tmp_path, kind):
+    csv = write_dataset(tmp_path / f"{kind}.csv", 3000, kind, chunk_rows=1000)
+    pq_path = write_dataset(tmp_path / f"{kind}.parquet", 3000, kind, chunk_rows=1000)
+    raw = pd.read_csv(csv, keep_default_na=False)  # "None" is a value in max_glu_serum
+    pd.testing.assert_frame_equal(pd.read_parquet(pq_path), raw, check_dtype=False)
+    df = load_dataset(csv, kind=kind, chunksize=1000)  # typed schema parses every column
+    assert len(df) == 3000 and set(df["target"].unique()) <= {0, 1}
+    if kind == "pima":
+        assert df["Insulin"].isna().any() and not (df["Insulin"] == 0).any()
+    else:
+        assert {"age_mid", "target"} <= set(df.columns) and df["race"].isna().any()
+
+@pytest.mark.skipif(not RAW.exists(), reason="no data/raw/diabetes.csv")
+def test_raw_extract_matches_uci_schema():
+    head = pd.read_csv(RAW, nrows=1000)
+    assert {"readmitted", "age", "diag_1"} <= set(head.columns)
+    assert set(head.columns) <= set(UCI_SCHEMA)
+    assert load_dataset(RAW, chunksize=100_000)["target"].isin([0, 1]).all()
@@ -0,0 +1,48 @@
+import threading
+from benchmarks.synth import write_uci_csv
+from proj import db
+
+def test_ingest_indexes_and_chunked_reads(tmp_path):
+    csv = tmp_path / "uci.csv"
+    write_uci_csv(csv, 2500)
+    path = tmp_path / "t.db"
+    assert db.ingest_dataset(csv, db_name=path, chunksize=1000, verbose=False) == 2500
+    conn = db.get_pool(path).get()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM uci_hospitals WHERE patient_nbr = 1").fetchall()
+    assert "idx_uci_hospitals_patient_nbr" in plan[0][-1]
+    chunks = list(db.iter_sql("SELECT * FROM uci_hospitals", db_name=path, chunksize=1000))
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    df = db.read_sql("SELECT target, race FROM uci_hospitals", db_name=path)
+    assert len(df) == 2500 and df["race"].dtype == "category"
+
+def test_pool_is_per_thread(tmp_path):
+    pool = db.get_pool(tmp_path / "p.db")
+    assert pool.get() is pool.get()
+    other = []
+    t = threading.Thread(target=lambda: other.append(pool.get()))
+    t.start(); t.join()
+    assert other[0] is not pool.get()
+    pool.close_all()
+
+def test_read_sql_types_are_stable_across_chunks(tmp_path):
+    import pandas as pd
+    path = tmp_path / "types.db"
+    df = pd.DataFrame({"x": [None, None, None, 1.5, 2.0, None, 3.0],
+                       "s": [None, None, None, "a", "b", "a", None], "i": range(7)})
+    db.write_frames([df], "t", db_name=path)
+    out = db.read_sql("SELECT * FROM t", db_name=path, chunksize=3)
+    assert out["x"].dtype == "float64" and out["x"].isna().sum() == 4
+    assert isinstance(out["s"].dtype, pd.CategoricalDtype)
+    assert list(out["s"].cat.categories) == ["a", "b"]
+    empty = db.read_sql("SELECT * FROM t WHERE i > 100", db_name=path)
+    assert empty.columns.tolist() == ["x", "s", "i"] and len(empty) == 0
+    assert empty["x"].dtype == "float64" and empty["i"].dtype == "int64"
+
+    # expressions in a parameterised query have no declared type: one probe scan types them all
+    stmts = []
+    db.get_pool(path).get().set_trace_callback(stmts.append)
+    expr = db.read_sql("SELECT x * 1 AS xx, s || '' AS ss FROM t WHERE i >= ?", (0,), db_name=path, chunksize=3)
+    db.get_pool(path).get().set_trace_callback(None)
+    assert expr["xx"].dtype == "float64" and isinstance(expr["ss"].dtype, pd.CategoricalDtype)
+    assert sum(s.startswith("WITH _q") for s in stmts) == 1
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import kendalltau
+
+from ds_viz.fastcorr import corr_matrices, kendall_tau_b, _count_inversions, _tau_b_from_dense, _ranks
+from ds_viz import quick_corr_plot
+
+def test_kendall_paths_match_scipy():
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 20, 4000).astype(float)
+    y = np.round(x + rng.normal(0, 5, x.size))
+    ref = kendalltau(x, y)[0]
+    assert np.isclose(kendall_tau_b(x, y), ref)  # contingency-table path
+    rx, ry = _ranks(x)[0], _ranks(y)[0]
+    assert np.isclose(_tau_b_from_dense(rx, ry, max_cells=0), ref)  # Knight sort + NumPy inversion count
+    r = rng.integers(0, 40, 1500)
+    assert _count_inversions(r) == sum(int((r[:i] > r[i]).sum()) for i in range(r.size))
+
+def test_corr_matrices_match_pandas_with_missing():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.integers(0, 30, (2000, 4)).astype(float), columns=list("abcd"))
+    df["b"] = df["a"] + rng.normal(0, 3, len(df))
+    df.loc[::9, "c"] = np.nan
+    got = corr_matrices(df, n_jobs=2)
+    for m, table in got.items():
+        assert np.allclose(table.to_numpy(), df.corr(method=m).to_numpy())
+
+def test_quick_corr_plot_all_methods(tmp_path):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({"Glucose": rng.normal(120, 30, 300), "Age": rng.integers(21, 80, 300)})
+    df["Outcome"] = (df["Glucose"] + rng.normal(0, 30, 300) > 130).astype(int)
+    df.to_csv(tmp_path / "diabetes.csv", index=False)
+    out = quick_corr_plot(str(tmp_path / "diabetes.csv"), target="Outcome", method="all", show=False)
+    for m in ("pearson", "spearman", "kendall"):
+        saved = pd.read_csv(tmp_path / f"diabetes_corr_{m}_Outcome.csv", index_col=0)
+        assert np.allclose(saved.to_numpy(), df[saved.columns].corr(method=m).to_numpy(), atol=1e-6)
+        assert out[m][0].shape == saved.shape
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from src.features import basic_preprocess, freeze_pipeline, FrozenPreprocessor, FrozenPipeline
+
+def test_frozen_preprocessor_matches_sklearn(mixed_frame):
+    df = mixed_frame.drop(columns=["target"])
+    train, test = df.iloc[:300], df.iloc[300:].copy()
+    test.loc[::5, "cat_b"] = "never_seen"
+    pre = basic_preprocess(train).fit(train)
+    frozen = FrozenPreprocessor(pre)
+    for X in (test, test.head(3), test.astype({"cat_a": "category", "cat_b": "category"})):
+        expected = pre.transform(X)
+        expected = expected.toarray() if hasattr(expected, "toarray") else expected
+        got = frozen.transform(X)
+        assert got.format == "csr"
+        np.testing.assert_allclose(got.toarray(), expected, rtol=0, atol=1e-12)
+
+def test_freeze_pipeline_predicts_like_pipeline(mixed_frame):
+    train = mixed_frame.drop(columns=["target"])
+    y = (train["num_b"] > 25).astype(int)
+    pipe = Pipeline([("pre", basic_preprocess(train)), ("clf", LogisticRegression())]).fit(train, y)
+    frozen = freeze_pipeline(pipe)
+    assert isinstance(frozen, FrozenPipeline)
+    np.testing.assert_allclose(frozen.predict_proba(train), pipe.predict_proba(train), rtol=1e-12)
+
+def test_frozen_matches_sklearn_with_infrequent_categories():
+    rng = np.random.default_rng(3)
+    train = pd.DataFrame({"num": rng.normal(size=400),
+                          "code": rng.choice([f"c{i}" for i in range(40)], 400, p=np.r_[[0.5], np.full(39, 0.5 / 39)])})
+    test = train.head(50).copy()
+    test.loc[::4, "code"] = "unseen"
+    for kw in ({"min_frequency": 10}, {"max_categories": 5}):
+        pre = basic_preprocess(train, **kw).fit(train)
+        expected = pre.transform(test)
+        expected = expected.toarray() if hasattr(expected, "toarray") else expected
+        np.testing.assert_allclose(FrozenPreprocessor(pre).transform(test).toarray(), expected, atol=1e-12)
+        assert expected.shape[1] < 41
+
+def test_hashed_encoding_and_schema_inference(mixed_frame):
+    df = mixed_frame.drop(columns=["empty", "target"])
+    pre = basic_preprocess(schema={"num_a": "float64", "num_b": "float64", "cat_a": "object", "cat_b": "category"},
+                           encoding="hashed", n_hash_features=64).fit(df)
+    Xt = pre.transform(df)
+    assert Xt.shape == (len(df), 2 + 64)
+    assert np.allclose(Xt[:, 2:].sum(axis=1), 2)  # one token per categorical column
+    assert isinstance(freeze_pipeline(Pipeline([("pre", pre), ("clf", LogisticRegression())])), Pipeline)
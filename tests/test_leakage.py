@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.leakage import detect_leakage, _hll_count
+
+def test_flags_ids_correlation_and_categorical_leaks():
+    rng = np.random.default_rng(0)
+    n = 5000
+    y = rng.integers(0, 2, n)
+    df = pd.DataFrame({
+        "encounter_id": np.arange(n),
+        "noise": rng.normal(size=n),
+        "copy_of_y": np.where(rng.random(n) < 0.01, np.nan, y + rng.normal(0, 0.01, n)),
+        "small_int": rng.integers(0, 5, n).astype("int8"),
+        "status": pd.Categorical(np.where(y == 1, "<30", rng.choice(["NO", ">30"], n))),
+        "gender": pd.Series(rng.choice(["F", "M"], n)).astype(object),
+        "target": y,
+    })
+    before = df.copy()
+    leaks = dict(detect_leakage(df, "target"))
+    assert set(leaks) == {"encounter_id", "noise", "copy_of_y", "status"}
+    assert leaks["copy_of_y"].startswith("high correlation")
+    assert leaks["status"].startswith("target purity 1.00")
+    pd.testing.assert_frame_equal(df, before)
+
+def test_target_correlation_matches_pandas():
+    from src.leakage import _target_correlations
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 2000)
+    df = pd.DataFrame({"a": rng.normal(size=2000), "b": np.where(rng.random(2000) < 0.05, np.nan, y + rng.normal(size=2000)),
+                       "small_int": rng.integers(0, 5, 2000).astype("int8"), "target": y})
+    num = df.select_dtypes(include="number")
+    ref = num.corr()["target"].drop("target")
+    got = _target_correlations(df, list(ref.index), df["target"].to_numpy(dtype=float))
+    assert np.allclose([got[c] for c in ref.index], ref.to_numpy())
+
+def test_hll_estimate_close():
+    x = np.random.default_rng(1).integers(0, 10**9, 200_000)
+    assert abs(_hll_count(x) / len(np.unique(x)) - 1) < 0.03
+    assert round(_hll_count(np.arange(50))) == 50
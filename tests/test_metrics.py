@@ -7,3 +7,31 @@ def test_metrics_shapes():
     y_prob = np.array([0.1,0.8,0.4,0.2])
     m = classification_metrics(y_true, y_pred, y_prob)
     assert "accuracy" in m and "f1" in m
+
+def test_bootstrap_replicates_match_sklearn():
+    from sklearn.metrics import roc_auc_score, average_precision_score, f1_score
+    from src.capstone.metrics import _weighted_block, _replicate_weights
+    rng = np.random.default_rng(0)
+    n = 500
+    y = rng.integers(0, 2, n)
+    p = np.round(rng.random(n) * 0.7 + 0.3 * y, 2)  # ties
+    yp = (p >= 0.5).astype(int)
+    order = np.argsort(p, kind="mergesort")
+    y, yp, p = y[order], yp[order], p[order]
+    levels = np.flatnonzero(np.r_[True, p[1:] != p[:-1]])
+    W = _replicate_weights(rng, n, 3, "multinomial")
+    out = _weighted_block(y, yp, levels, W)
+    for i in range(3):
+        idx = np.repeat(np.arange(n), W[i].astype(int))
+        assert np.isclose(out["f1"][i], f1_score(y[idx], yp[idx]), atol=1e-5)
+        assert np.isclose(out["auroc"][i], roc_auc_score(y[idx], p[idx]), atol=1e-5)
+        assert np.isclose(out["auprc"][i], average_precision_score(y[idx], p[idx]), atol=1e-5)
+
+def test_ci_brackets_point_estimate():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 2000)
+    p = rng.random(2000) * 0.6 + 0.4 * y
+    m = classification_metrics(y, (p > 0.5).astype(int), p, n_boot=200, seed=3)
+    for k in ("accuracy", "f1", "auroc", "auprc"):
+        lo, hi = m["ci"][k]
+        assert lo <= m[k] <= hi
@@ -0,0 +1,37 @@
+from benchmarks.synth import write_uci_csv
+from src.pipeline import run_pipeline, publish
+
+CFG = {"dataset": {"kind": "uci_hospitals"}, "data": {"cache": False},
+       "features": {"numeric_strategy": "median"}, "train": {"n_jobs": 1, "cv_folds": 2},
+       "evaluate": {"subgroups": ["gender"], "n_boot": 0, "threshold_metric": "f1"},
+       "leakage": {"auto_drop": True}}
+
+def test_threshold_change_reuses_fit(tmp_path, monkeypatch):
+    monkeypatch.setenv("DIABETES_CACHE_DIR", str(tmp_path / "cache"))
+    csv = tmp_path / "uci.csv"
+    write_uci_csv(csv, 1500)
+    first = run_pipeline(csv, CFG, tmp_path / "stages")
+    assert {r["status"] for r in first.values()} == {"ran"}
+    again = run_pipeline(csv, CFG, tmp_path / "stages")
+    assert {r["status"] for r in again.values()} == {"cached"}
+
+    cfg = {**CFG, "evaluate": {**CFG["evaluate"], "threshold_metric": "youden"}}
+    changed = run_pipeline(csv, cfg, tmp_path / "stages")
+    ran = {k for k, r in changed.items() if r["status"] == "ran"}
+    assert ran == {"evaluate", "plot"}
+    assert changed["fit"]["fingerprint"] == first["fit"]["fingerprint"]
+    out = publish(changed, tmp_path / "out")
+    assert (out / "model.pkl").exists() and (out / "baseline_metrics.png").exists()
+    assert "best_thr_youden" in (out / "metrics.json").read_text()
+
+def test_stage_code_covers_called_helpers():
+    from src.pipeline import STAGES, _code_refs
+    stages = {s.name: s for s in STAGES}
+    predict = _code_refs(stages["predict"])
+    for ref in ("src.features:design_matrix_report", "src.data:split_xy", "src.data:load_split",
+                "src.train:write_predictions", "src.pipeline:_split_parts"):
+        assert ref in predict
+    fit = _code_refs(stages["fit"])
+    assert {"src.model_io:save_model", "src.cv:cross_validate_and_fit", "src.data:split_xy"} <= set(fit)
+    assert "src.evaluate:run_evaluate" not in fit
+    assert "src.presets:_map_categories" in _code_refs(stages["load"])
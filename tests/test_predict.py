@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from src.features import basic_preprocess
+from src.model_io import save_model, load_model
+from src.predict import predict_file
+from src.presets import load_dataset
+from benchmarks.synth import make_uci_frame
+
+def test_batch_scores_match_in_memory_pipeline(tmp_path):
+    csv = tmp_path / "uci.csv"
+    raw = make_uci_frame(700, seed=5)
+    raw.to_csv(csv, index=False)
+    df = load_dataset(csv)
+    X = df.drop(columns=["target", "readmitted"])
+    pipe = Pipeline([("pre", basic_preprocess(X)), ("clf", LogisticRegression(max_iter=200))])
+    pipe.fit(X, df["target"])
+    save_model(pipe, tmp_path / "model", X, kind="uci_hospitals")
+    loaded, manifest = load_model(tmp_path / "model")
+    assert [f["name"] for f in manifest["features"]] == list(X.columns)
+
+    expected = pipe.predict_proba(X)[:, 1]
+    raw.to_parquet(tmp_path / "uci.parquet")
+    raw.drop(columns=["readmitted"]).to_csv(tmp_path / "unlabeled.csv", index=False)  # a live feed has no label
+    for src in ("uci.csv", "uci.parquet", "unlabeled.csv"):
+        out = tmp_path / f"{src}.scores.parquet"
+        stats = predict_file(tmp_path / "model", tmp_path / src, out, batch_size=256, verbose=False)
+        assert [b["rows"] for b in stats["batches"]] == [256, 256, 188]
+        scored = pq.read_table(out).to_pandas()
+        np.testing.assert_allclose(scored["y_prob"], expected, rtol=1e-9)
+        assert (scored["encounter_id"].to_numpy() == raw["encounter_id"].to_numpy()).all()
@@ -0,0 +1,55 @@
+import pandas as pd
+from src import preset_cache
+from src.presets import load_dataset
+from benchmarks.synth import make_uci_frame
+
+def test_cache_roundtrip_and_invalidation(tmp_path):
+    csv = tmp_path / "uci.csv"
+    cdir = tmp_path / "cache"
+    make_uci_frame(500, seed=1).to_csv(csv, index=False)
+
+    first = load_dataset(csv, cache=True, cache_dir=cdir)
+    assert len(preset_cache.list_entries(cdir)) == 1
+    second = load_dataset(csv, cache=True, cache_dir=cdir)
+    pd.testing.assert_frame_equal(first, second)
+    assert isinstance(second["race"].dtype, pd.CategoricalDtype)
+
+    make_uci_frame(400, seed=2).to_csv(csv, index=False)
+    third = load_dataset(csv, cache=True, cache_dir=cdir)
+    assert len(third) == 400
+    assert len(preset_cache.list_entries(cdir)) == 2
+
+    assert len(preset_cache.evict(max_mb=0, path=cdir)) == 2
+    load_dataset(csv, cache=True, cache_dir=cdir)
+    assert preset_cache.clear(cdir) and not preset_cache.list_entries(cdir)
+
+def test_fingerprint_covers_module_level_helpers(monkeypatch):
+    import inspect
+    from src import presets
+    source = inspect.getsource(presets)
+    before = preset_cache.cleaning_fingerprint()
+    edited = source.replace("NA_VALUES = ", "NA_VALUES =  ", 1)
+    assert edited != source
+    monkeypatch.setattr(preset_cache.inspect, "getsource", lambda obj: edited)
+    assert preset_cache.cleaning_fingerprint() != before
+
+def test_source_hash_index_survives_concurrent_writers(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    csvs = []
+    for i in range(8):
+        csvs.append(tmp_path / f"{i}.csv")
+        csvs[-1].write_text(f"a\n{i}\n")
+    with ThreadPoolExecutor(8) as pool:
+        hashes = list(pool.map(lambda p: preset_cache.source_hash(p, tmp_path), csvs))
+    assert len(set(hashes)) == 8
+    assert preset_cache._load_index(tmp_path)  # still valid JSON
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_cached_frame_does_not_depend_on_chunksize(tmp_path):
+    csv = tmp_path / "uci.csv"
+    make_uci_frame(600, seed=3).to_csv(csv, index=False)
+    typed = load_dataset(csv, chunksize=250)
+    first = load_dataset(csv, cache=True, cache_dir=tmp_path / "a")  # filled without a chunksize
+    second = load_dataset(csv, chunksize=100, cache=True, cache_dir=tmp_path / "b")
+    pd.testing.assert_frame_equal(first, second)
+    assert first.dtypes.to_dict() == typed.dtypes.to_dict()
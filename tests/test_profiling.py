@@ -0,0 +1,39 @@
+import json
+from src.profiling import RunProfile, span
+
+def test_spans_nest_and_merge_by_command(tmp_path):
+    with span("ignored") as rec:  # no active profile: no-op
+        assert rec is None
+    with RunProfile() as prof:
+        with span("load"):
+            with span("parse"):
+                sum(range(10_000))
+        with span("fit"):
+            sum(range(200_000))
+    prof.write(tmp_path, "train")
+    with RunProfile() as prof2:
+        with span("metrics"):
+            pass
+    prof2.write(tmp_path, "evaluate")
+
+    data = json.loads((tmp_path / "run_profile.json").read_text())
+    assert set(data) == {"train", "evaluate"}
+    names = [s["name"] for s in data["train"]["spans"]]
+    assert names == ["load", "load/parse", "fit"]
+    assert data["train"]["slowest"] == "fit"
+    assert all(s["wall_s"] >= 0 and s["cpu_s"] >= 0 for s in data["train"]["spans"])
+
+def test_profile_dumps_slowest_stage(tmp_path):
+    with RunProfile(profile=True) as prof:
+        with span("quick"):
+            pass
+        with span("alloc"):
+            keep = [bytearray(1024) for _ in range(2000)]
+    prof.write(tmp_path, "train")
+    data = json.loads((tmp_path / "run_profile.json").read_text())["train"]
+    assert data["cprofile"] == "profile_train_alloc.prof"
+    assert (tmp_path / "profile_train_alloc.prof").exists()
+    alloc = data["spans"][1]
+    assert alloc["traced_kept_mb"] >= 1.9 and alloc["top_allocators"]
+    assert "test_profiling.py" in alloc["top_allocators"][0]["where"]
+    del keep
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from proj import db, queries
+
+def _load(tmp_path, n=2000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Glucose": rng.integers(50, 200, n).astype(float),
+                       "Age": rng.integers(21, 80, n), "Outcome": rng.integers(0, 2, n)})
+    df.loc[::10, "Glucose"] = np.nan
+    path = tmp_path / "q.db"
+    db.write_frames([df.iloc[:1000], df.iloc[1000:]], "patients", db_name=path)
+    return df, path
+
+def test_summaries_match_pandas(tmp_path):
+    df, path = _load(tmp_path)
+    bal = queries.class_balance("patients", "Outcome", db_name=path)
+    assert bal.set_index("Outcome")["n"].to_dict() == df["Outcome"].value_counts().to_dict()
+    miss = queries.missingness("patients", db_name=path).set_index("column")["n_missing"]
+    assert miss.to_dict() == df.isna().sum().to_dict()
+    rates = queries.group_rates("patients", "Age", "Outcome", db_name=path).set_index("Age")
+    assert np.allclose(rates["target_rate"], df.groupby("Age")["Outcome"].mean())
+    hist = queries.histogram("patients", "Glucose", bins=10, db_name=path)
+    assert hist["n"].tolist() == np.histogram(df["Glucose"].dropna(), bins=10)[0].tolist()
+
+def test_cache_invalidated_by_table_change(tmp_path):
+    df, path = _load(tmp_path)
+    assert queries.row_count("patients", db_name=path).iloc[0, 0] == len(df)
+    conn = db.get_pool(path).get()
+    with conn:
+        conn.execute("DELETE FROM patients WHERE Age < 30")
+    assert queries.row_count("patients", db_name=path).iloc[0, 0] == (df["Age"] >= 30).sum()
+    out = queries.write_sql_reports("patients", "Outcome", groups=["Age"], db_name=path, outdir=tmp_path / "sql")
+    assert pd.read_csv(out["outcome_counts"]).columns.tolist() == ["Outcome", "n"]
+
+def test_cache_invalidated_by_table_replaced_outside_write_frames(tmp_path):
+    df, path = _load(tmp_path)
+    assert queries.row_count("patients", db_name=path).iloc[0, 0] == len(df)
+    conn = db.get_pool(path).get()
+    df.head(15).to_sql("patients", conn, if_exists="replace", index=False)  # drops the triggers
+    assert queries.row_count("patients", db_name=path).iloc[0, 0] == 15
+    with conn:
+        conn.execute("DELETE FROM patients WHERE rowid <= 5")  # triggers are back
+    assert queries.row_count("patients", db_name=path).iloc[0, 0] == 10
@@ -0,0 +1,26 @@
+from src import search
+
+def test_build_candidates_grid_and_sampling():
+    cfg = {"preprocess": {"numeric_strategy": ["median", "mean"]},
+           "classifiers": [{"type": "logistic_regression", "params": {"C": [0.1, 1.0, 10.0]}}]}
+    assert len(search.build_candidates(cfg)) == 6
+    sampled = search.build_candidates({**cfg, "n_candidates": 4})
+    assert [c["id"] for c in sampled] == [0, 1, 2, 3]
+
+def test_halving_shares_preprocessor_and_shrinks(monkeypatch, mixed_frame):
+    X, y = mixed_frame.drop(columns=["target", "empty"]), mixed_frame["target"]
+    fits = []
+    real = search.basic_preprocess
+    monkeypatch.setattr(search, "basic_preprocess",
+                        lambda df, **kw: fits.append(kw) or real(df, **kw))
+    cands = search.build_candidates({
+        "preprocess": {"numeric_strategy": ["median"]},
+        "classifiers": [{"type": "logistic_regression", "params": {"C": [0.01, 0.1, 1.0, 10.0]}},
+                        {"type": "sgd", "params": {"loss": ["log_loss"], "alpha": [0.001, 0.01]}}],
+    })
+    board = search.successive_halving(cands, X.iloc[:400], y.iloc[:400], X.iloc[400:], y.iloc[400:],
+                                      min_resources=50, factor=3, n_jobs=1)
+    per_rung = board.groupby("rung").size().sort_index().tolist()
+    assert per_rung == [6, 2, 1]
+    assert len(fits) == 3  # one preprocessor fit per rung, not per candidate
+    assert board.loc[0, "rung"] == 2 and board.loc[0, "n_rows"] == 400
@@ -0,0 +1,66 @@
+import json, threading, urllib.error, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.serve import MicroBatcher, build_server
+from src.model_io import save_model
+from src.presets import load_dataset
+from src.features import basic_preprocess
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from benchmarks.synth import make_uci_frame
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    seen = []
+    def score(records):
+        seen.append(len(records))
+        return [r["x"] * 2 for r in records]
+    batcher = MicroBatcher(score, max_batch=16, max_wait_ms=50)
+    futures = [batcher.submit({"x": i}) for i in range(40)]
+    assert [f.result(timeout=5) for f in futures] == [2.0 * i for i in range(40)]
+    assert max(seen) == 16 and sum(seen) == 40
+    assert batcher.metrics.snapshot()["batch_size_hist"]["16"] >= 2
+
+def test_bad_record_fails_only_its_own_request():
+    def score(records):
+        if any("bad" in r for r in records):
+            raise ValueError("malformed record")
+        return [r["x"] * 2 for r in records]
+    batcher = MicroBatcher(score, max_batch=16, max_wait_ms=50)
+    records = [{"x": i} for i in range(6)]
+    records.insert(3, {"bad": 1})
+    futures = [batcher.submit(r) for r in records]
+    assert isinstance(futures[3].exception(timeout=5), ValueError)
+    assert [f.result(timeout=5) for i, f in enumerate(futures) if i != 3] == [2.0 * i for i in range(6)]
+
+def test_server_scores_and_reports_metrics(tmp_path):
+    raw = make_uci_frame(400, seed=2)
+    raw.to_csv(tmp_path / "uci.csv", index=False)
+    df = load_dataset(tmp_path / "uci.csv")
+    X = df.drop(columns=["target", "readmitted"])
+    pipe = Pipeline([("pre", basic_preprocess(X)), ("clf", LogisticRegression(max_iter=200))]).fit(X, df["target"])
+    save_model(pipe, tmp_path / "model", X, kind="uci_hospitals")
+
+    server = build_server(tmp_path / "model", port=0, max_wait_ms=20)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    rows = raw.drop(columns=["readmitted"]).head(24).astype(str).to_dict(orient="records")
+
+    def post(row):
+        req = urllib.request.Request(f"{url}/predict", data=json.dumps(row).encode())
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return json.loads(resp.read())["y_prob"]
+        except urllib.error.HTTPError as e:
+            return e.code
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            probs = list(pool.map(post, rows[:12] + [["not", "a", "record"]] + rows[12:]))
+        assert probs.pop(12) == 400
+        expected = pipe.predict_proba(X.head(24))[:, 1]
+        np.testing.assert_allclose(probs, expected, rtol=1e-6)
+        with urllib.request.urlopen(f"{url}/metrics", timeout=10) as resp:
+            m = json.loads(resp.read())
+        assert m["requests"] == 25 and m["errors"] == 1
+        assert {"p50", "p95", "p99"} <= set(m["latency_ms"])
+    finally:
+        server.shutdown(); server.server_close()
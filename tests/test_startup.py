@@ -0,0 +1,33 @@
+import re, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Interpreter-side import budget for CLI --help; evaluate needed ~2.4s before
+# imports were made lazy and ~0.05s after.
+IMPORT_BUDGET_S = 0.5
+HEAVY = ("pandas", "sklearn", "scipy", "matplotlib", "pyarrow", "yaml")
+
+def _importtime(*args):
+    """(total seconds of top-level imports, set of imported module names)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    total, mods = 0, set()
+    for line in out.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if m:
+            mods.add(m.group(3))
+            if m.group(2) == " ":  # depth 0
+                total += int(m.group(1))
+    return total / 1e6, mods
+
+def test_evaluate_help_starts_fast():
+    total, mods = _importtime("-m", "src.evaluate", "--help")
+    assert not [m for m in mods if m.split(".")[0] in HEAVY]
+    assert total < IMPORT_BUDGET_S
+
+def test_cli_help_avoids_heavy_imports():
+    for mod in ("src.train", "src.predict", "src.serve"):
+        _, mods = _importtime("-m", mod, "--help")
+        assert not [m for m in mods if m.split(".")[0] in HEAVY], mod
+    _, mods = _importtime("-c", "import ds_viz, ds_viz.fastcorr")
+    assert "matplotlib" not in mods and "pandas" not in mods
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa, pyarrow.parquet as pq
+from sklearn.metrics import roc_auc_score, average_precision_score, accuracy_score, f1_score
+
+from src.stream_metrics import StreamingEvaluator, evaluate_stream
+from src.subgroup import subgroup_report
+
+def _data(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    prob = np.clip(rng.normal(0.4 + 0.2 * y, 0.2), 0, 1)
+    preds = pd.DataFrame({"y_pred": (prob >= 0.5).astype(int), "y_prob": prob,
+                          "gender": rng.choice(["F", "M"], n), "race": rng.choice(["A", "B", None], n)})
+    return preds, y
+
+def test_binned_auroc_within_reported_bound():
+    preds, y = _data()
+    m = StreamingEvaluator().update(preds, y).metrics()
+    assert np.isclose(m["accuracy"], accuracy_score(y, preds["y_pred"]))
+    assert np.isclose(m["f1"], f1_score(y, preds["y_pred"]))
+    assert abs(m["auroc"] - roc_auc_score(y, preds["y_prob"])) <= m["auroc_error_bound"] + 1e-12
+    assert abs(m["auprc"] - average_precision_score(y, preds["y_prob"])) < 1e-3
+
+def test_sharded_merge_matches_single_pass(tmp_path):
+    preds, y = _data()
+    whole = StreamingEvaluator(["race"], [("race", "gender")]).update(preds, y)
+    a = StreamingEvaluator(["race"], [("race", "gender")]).update(preds.iloc[:7000], y[:7000])
+    b = StreamingEvaluator(["race"], [("race", "gender")]).update(preds.iloc[7000:], y[7000:])
+    assert a.merge(b).metrics() == whole.metrics()
+
+    # files with different row-group layouts stream in step
+    pq.write_table(pa.Table.from_pandas(preds), tmp_path / "p.parquet", row_group_size=3000)
+    pq.write_table(pa.table({"y_true": y}), tmp_path / "y.parquet", row_group_size=7000)
+    ev = evaluate_stream(tmp_path / "p.parquet", tmp_path / "y.parquet", ["race"],
+                         [("race", "gender")], batch_size=2500)
+    assert ev.metrics() == whole.metrics()
+    got = ev.subgroups.result()
+    ref = subgroup_report(preds, y, preds["y_pred"], ["race"], intersections=[("race", "gender")])
+    pd.testing.assert_frame_equal(got, ref, check_dtype=False)
+
+def test_row_count_mismatch_raises(tmp_path):
+    import pytest
+    preds, y = _data(1000)
+    pq.write_table(pa.Table.from_pandas(preds), tmp_path / "p.parquet")
+    for n in (900, 1100):  # too few and too many labels
+        pq.write_table(pa.table({"y_true": np.resize(y, n)}), tmp_path / "y.parquet")
+        with pytest.raises(ValueError, match="rows"):
+            evaluate_stream(tmp_path / "p.parquet", tmp_path / "y.parquet")
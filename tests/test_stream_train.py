@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import yaml
+from benchmarks.synth import write_dataset
+from src.features import basic_preprocess
+from src.presets import _concat_chunks
+from src.stream_train import TRAIN, StreamingStats, hash_split, iter_split_chunks
+
+def test_hash_split_is_stable_and_proportional():
+    keys = np.arange(100_000)
+    split = hash_split(keys)
+    assert np.array_equal(split, np.concatenate([hash_split(keys[:30_000]), hash_split(keys[30_000:])]))
+    assert np.allclose(np.bincount(split) / len(keys), [0.6, 0.2, 0.2], atol=0.01)
+
+def test_streaming_stats_match_basic_preprocess(tmp_path):
+    csv = write_dataset(tmp_path / "uci.csv", 6000, "uci_hospitals")
+    stats, parts = StreamingStats(sample_rows=10**6), []
+    for X, y, split in iter_split_chunks(csv, "uci_hospitals", chunksize=1000):
+        stats.update(X[split == TRAIN], y[split == TRAIN])
+        parts.append(X[split == TRAIN])
+    X_train = _concat_chunks(parts)
+    for opts in [{}, {"min_frequency": 20, "max_categories": 6}]:
+        frozen = stats.preprocessor("median", **opts)
+        ref = basic_preprocess(X_train, numeric_strategy="median", **opts).fit(X_train).transform(X_train)
+        ref = ref.toarray() if hasattr(ref, "toarray") else ref
+        assert np.allclose(frozen.transform(X_train).toarray(), ref)
+
+def test_train_streaming_mode_end_to_end(tmp_path):
+    from src.predict import predict_file
+    from src.train import main
+    csv = write_dataset(tmp_path / "pima.csv", 4000, "pima")
+    cfg = {"data": {"cache": False}, "columns": {"drop": ["Outcome"]}, "evaluate": {"subgroups": ["Age"]},
+           "train": {"mode": "streaming", "stream_chunksize": 700, "stream_epochs": 2}}
+    (tmp_path / "cfg.yaml").write_text(yaml.safe_dump(cfg))
+    out = tmp_path / "out"
+    main(["--csv_path", str(csv), "--kind", "pima", "--output_dir", str(out), "--config", str(tmp_path / "cfg.yaml")])
+    preds, y_true = pd.read_parquet(out / "preds.parquet"), pd.read_parquet(out / "y_true.parquet")
+    assert len(preds) == len(y_true) > 500 and {"y_prob", "y_pred", "Age"} <= set(preds.columns)
+    report = yaml.safe_load((out / "cv_scores.json").read_text())
+    assert report["mode"] == "streaming" and report["valid_roc_auc"] > 0.7
+    assert report["n_train"] + report["n_valid"] + report["n_test"] == 4000
+    stats = predict_file(out, csv, tmp_path / "scores.parquet", verbose=False)
+    assert stats["rows"] == 4000
+
+def test_hash_split_is_seeded_for_numeric_keys():
+    keys = np.arange(20_000, dtype=np.int64)
+    a = hash_split(keys, seed=1)
+    assert np.array_equal(a, hash_split(keys, seed=1))
+    assert (a != hash_split(keys, seed=2)).mean() > 0.3
+    assert abs((hash_split(keys, valid_size=0.1, test_size=0.3) == 2).mean() - 0.3) < 0.02
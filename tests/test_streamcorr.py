@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from ds_viz.streamcorr import StreamingCorr, streaming_corr
+
+def test_chunked_matches_pandas_on_discrete_columns(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"age": rng.integers(0, 10, 6000), "visits": rng.poisson(3, 6000).astype(float)})
+    df["stay"] = df["age"] + rng.integers(0, 5, 6000) + 1e6  # large offset: no cancellation allowed
+    df.loc[::7, "visits"] = np.nan
+    path = tmp_path / "d.csv"
+    df.to_csv(path, index=False)
+    acc = streaming_corr(str(path), chunksize=1000)
+    for m in ("pearson", "spearman", "kendall"):  # bins are exact for <= n_bins distinct values
+        assert np.allclose(acc.corr(m).to_numpy(), df.corr(m).to_numpy(), atol=1e-9)
+    assert np.allclose(acc.variance(), df.var())
+    assert len(acc.sample) <= acc.sample_rows
+
+def test_merge_equals_single_pass():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"a": rng.integers(0, 10, 4000), "b": rng.normal(size=4000)})
+    df["c"] = df["a"] + rng.integers(0, 5, 4000)
+    first = StreamingCorr().update(df.iloc[:2000])
+    other = StreamingCorr(columns=first.columns, edges=first.edges).update(df.iloc[2000:])
+    whole = StreamingCorr().update(df.iloc[:2000]).update(df.iloc[2000:])
+    first.merge(other)
+    for m in ("pearson", "spearman", "kendall"):
+        assert np.allclose(first.corr(m), whole.corr(m))
+
+def test_bins_cover_sorted_file_and_late_columns(tmp_path):
+    rng = np.random.default_rng(2)
+    x = np.sort(rng.normal(size=6000))  # first chunk holds only the lowest values
+    df = pd.DataFrame({"x": x, "y": x + rng.normal(scale=0.5, size=x.size), "late": rng.integers(0, 8, x.size).astype(float)})
+    df["late"] += (df["x"] > 0)
+    df.loc[:1999, "late"] = np.nan  # all-NaN in the first chunk
+    df.to_csv(tmp_path / "sorted.csv", index=False)
+    acc = streaming_corr(str(tmp_path / "sorted.csv"), chunksize=1000, n_bins=64)
+    assert len(acc.edges[0]) == 63 and acc.edges[0][-1] > 0
+    for m in ("spearman", "kendall"):
+        assert np.allclose(acc.corr(m).to_numpy(), df.corr(m).to_numpy(), atol=0.02)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, recall_score, roc_auc_score
+
+from src.subgroup import subgroup_report, subgroup_metrics
+
+def test_matches_per_group_sklearn_loop(mixed_frame):
+    df = mixed_frame.rename(columns={"cat_a": "race", "cat_b": "gender"})
+    y = df["target"].to_numpy()
+    prob = np.round(np.clip(0.3 * y + np.random.default_rng(0).random(len(y)) * 0.7, 0, 1), 2)  # rounding forces ties
+    yp = (prob >= 0.5).astype(int)
+    rep = subgroup_report(df, y, yp, ["race"], y_prob=prob, intersections=[("race", "gender")])
+    for _, r in rep.iterrows():
+        if r["slice"] == "race":
+            mask = (df["race"] == r["group"]).to_numpy()
+        else:
+            race, gender = r["group"].split(" & ")
+            mask = ((df["race"] == race) & (df["gender"] == gender)).to_numpy()
+        assert r["n"] == mask.sum()
+        assert np.isclose(r["accuracy"], accuracy_score(y[mask], yp[mask]))
+        assert np.isclose(r["f1"], f1_score(y[mask], yp[mask]))
+        assert np.isclose(r["tpr"], recall_score(y[mask], yp[mask]))
+        assert np.isclose(r["fpr"], 1 - recall_score(1 - y[mask], 1 - yp[mask]))
+        assert np.isclose(r["auroc"], roc_auc_score(y[mask], prob[mask]))
+    assert set(rep["slice"]) == {"race", "race & gender"}
+    assert not rep["group"].str.contains("None").any()
+
+def test_bootstrap_ci_brackets_estimate(mixed_frame):
+    y = mixed_frame["target"].to_numpy()
+    yp = (mixed_frame["num_b"] > 20).to_numpy().astype(int)
+    rep = subgroup_report(mixed_frame, y, yp, ["cat_b"], n_boot=300, seed=1)
+    assert (rep["accuracy_lo"] <= rep["accuracy"]).all() and (rep["accuracy"] <= rep["accuracy_hi"]).all()
+    assert (rep["f1_hi"] - rep["f1_lo"] > 0).all()
+
+def test_subgroup_metrics_keeps_min_size():
+    df = pd.DataFrame({"g": ["a"] * 20 + ["b"] * 5})
+    y = np.r_[np.ones(10), np.zeros(15)].astype(int)
+    out = subgroup_metrics(df, y, y, "g")
+    assert list(out) == ["a"] and out["a"]["n"] == 20 and out["a"]["accuracy"] == 1.0
+
+def test_subgroup_metrics_orders_numeric_groups_by_value():
+    df = pd.DataFrame({"Pregnancies": [5] * 12 + [15] * 12 + [2] * 12})
+    y = np.tile([0, 1], 18)
+    assert list(subgroup_metrics(df, y, y, "Pregnancies")) == ["2", "5", "15"]
+    mixed = pd.DataFrame({"g": ["b"] * 12 + [1] * 12}, dtype=object)
+    assert list(subgroup_metrics(mixed, y[:24], y[:24], "g")) == ["1", "b"]
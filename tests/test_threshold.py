@@ -0,0 +1,41 @@
+import numpy as np
+from sklearn.metrics import f1_score, precision_score, accuracy_score
+from src.threshold import find_best_threshold, threshold_curve
+
+def _loop_best(y, p, metric_fn, thresholds):
+    scores = [metric_fn(y, (p >= t).astype(int)) for t in thresholds]
+    i = int(np.argmax(scores))
+    return thresholds[i], scores[i]
+
+def test_grid_matches_sklearn_loop():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 500)
+    p = np.clip(0.3 * y + rng.random(500) * 0.7, 0, 1)
+    grid = np.arange(0, 1.01, 0.01)
+    for metric, fn in [("f1", f1_score), ("accuracy", accuracy_score),
+                       ("precision", lambda a, b: precision_score(a, b, zero_division=0))]:
+        thr, score = find_best_threshold(y, p, metric=metric, mode="grid")
+        ref_thr, ref_score = _loop_best(y, p, fn, grid)
+        assert abs(thr - ref_thr) < 1e-12
+        assert abs(score - ref_score) < 1e-12
+
+def test_exact_is_at_least_grid_and_returns_curve():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 300)
+    p = rng.random(300)
+    exact_thr, exact, curve = find_best_threshold(y, p, metric="f1", return_curve=True)
+    _, grid = find_best_threshold(y, p, metric="f1", mode="grid")
+    assert exact >= grid
+    assert abs(f1_score(y, (p >= exact_thr).astype(int)) - exact) < 1e-12
+    assert len(curve["threshold"]) == len(np.unique(p)) + 1
+    assert curve["tp"][-1] == 0 and curve["fp"][-1] == 0
+
+def test_youden_and_cost():
+    y = np.array([0, 0, 1, 1])
+    p = np.array([0.1, 0.4, 0.35, 0.8])
+    curve = threshold_curve(y, p, cost_fp=1.0, cost_fn=5.0)
+    thr, score = find_best_threshold(y, p, metric="youden")
+    assert thr == 0.35  # ties with 0.8; lowest threshold wins
+    assert score == curve["youden"].max()
+    thr, _ = find_best_threshold(y, p, metric="cost", cost_fp=1.0, cost_fn=5.0)
+    assert thr == 0.35